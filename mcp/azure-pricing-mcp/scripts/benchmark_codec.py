@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the JSON backends in azure_pricing_mcp.codec.
+
+Times each installed backend on a synthetic 1000-item Retail Prices API page:
+decoding the page, re-encoding it for the cache, rendering indented tool
+output and building a cache key.
+
+Usage:
+    python scripts/benchmark_codec.py [--items 1000] [--repeat 20]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from azure_pricing_mcp import codec
+from azure_pricing_mcp.models import compact_page
+
+REGIONS = ["eastus", "eastus2", "westus2", "westeurope", "northeurope", "swedencentral", "uksouth", "japaneast"]
+PARAMS = {
+    "api-version": "2023-01-01-preview",
+    "currencyCode": "USD",
+    "$filter": "serviceName eq 'Virtual Machines' and armRegionName eq 'eastus' and contains(skuName, 'D4s')",
+}
+
+
+def make_page(count: int) -> dict:
+    """A page shaped like a Virtual Machines response."""
+    rng = random.Random(42)
+    items = []
+    for i in range(count):
+        size = rng.choice([2, 4, 8, 16, 32, 64])
+        region = rng.choice(REGIONS)
+        price = round(rng.uniform(0.01, 5.0), 4)
+        items.append(
+            {
+                "currencyCode": "USD",
+                "tierMinimumUnits": 0.0,
+                "retailPrice": price,
+                "unitPrice": price,
+                "armRegionName": region,
+                "location": region.upper(),
+                "effectiveStartDate": "2024-01-01T00:00:00Z",
+                "meterId": f"{i:08x}-0000-4000-8000-{rng.getrandbits(48):012x}",
+                "meterName": f"D{size}s v5",
+                "productId": "DZH318Z0BQ4L",
+                "skuId": f"DZH318Z0BQ4L/{size:03d}",
+                "productName": "Virtual Machines Dsv5 Series",
+                "skuName": f"D{size}s v5",
+                "serviceName": "Virtual Machines",
+                "serviceId": "DZH313Z7MMC8",
+                "serviceFamily": "Compute",
+                "unitOfMeasure": "1 Hour",
+                "type": "Consumption",
+                "isPrimaryMeterRegion": True,
+                "armSkuName": f"Standard_D{size}s_v5",
+                "savingsPlan": [
+                    {"unitPrice": round(price * 0.7, 4), "retailPrice": round(price * 0.7, 4), "term": "1 Year"},
+                    {"unitPrice": round(price * 0.5, 4), "retailPrice": round(price * 0.5, 4), "term": "3 Years"},
+                ],
+            }
+        )
+    return {"BillingCurrency": "USD", "CustomerEntityId": "Default", "Items": items, "NextPageLink": None}
+
+
+def best_of(repeat: int, func) -> float:
+    """Fastest of `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="Items in the synthetic page (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement; the fastest is kept")
+    args = parser.parse_args()
+
+    page = make_page(args.items)
+    body = codec.dumps_bytes(page)
+    compact = compact_page(codec.loads(body))
+    print(f"{args.items}-item page, {len(body) / 1024:.0f} KiB\n")
+    print(f"{'backend':<10}{'decode':>10}{'encode':>10}{'encode*':>10}{'indent':>10}{'key (us)':>10}")
+
+    for name in codec.BACKENDS:
+        try:
+            codec.use_backend(name)
+        except ValueError:
+            print(f"{name:<10}{'not installed':>20}")
+            continue
+        decode = best_of(args.repeat, lambda: codec.loads(body))
+        encode = best_of(args.repeat, lambda: codec.dumps_bytes(page))
+        encode_compact = best_of(args.repeat, lambda: codec.dumps_bytes(compact))
+        indent = best_of(args.repeat, lambda: codec.dumps(page["Items"], indent=True))
+        key = best_of(args.repeat * 50, lambda: codec.dumps(PARAMS, sort_keys=True)) * 1000
+        print(f"{name:<10}{decode:>8.2f}ms{encode:>8.2f}ms{encode_compact:>8.2f}ms{indent:>8.2f}ms{key:>10.1f}")
+
+    print("\nencode* = encoding the same page held as PriceItems (cache compression path)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
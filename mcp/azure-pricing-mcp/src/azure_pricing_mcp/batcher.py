@@ -0,0 +1,207 @@
+"""Merge compatible first-page requests that arrive close together into one upstream query."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .odata import ODataParseError, Predicate, compile_filter
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+DEFAULT_BATCH_WINDOW = 0.005  # seconds a batch stays open for more requests
+DEFAULT_BATCH_MAX_SIZE = 16  # requests merged into one query at most
+DEFAULT_BATCH_MAX_FILTER_LENGTH = 1500  # characters in the merged $filter
+DEFAULT_BATCH_MAX_PAGES = 5  # pages followed for a merged query
+DEFAULT_BATCH_MAX_ITEMS = 5000  # merged results beyond this fall back to individual requests
+
+FetchPage = Callable[[str, dict[str, Any] | None], Awaitable[dict[str, Any]]]
+
+# Parameters that differ per caller; everything else must match to share a batch
+_PER_REQUEST_PARAMS = {"$filter", "$top"}
+
+
+class _Waiter:
+    __slots__ = ("filter_text", "predicate", "top", "future")
+
+    def __init__(
+        self, filter_text: str, predicate: Predicate, top: int, future: "asyncio.Future[dict[str, Any] | None]"
+    ):
+        self.filter_text = filter_text
+        self.predicate = predicate
+        self.top = top
+        self.future = future
+
+
+class _Batch:
+    __slots__ = ("params", "waiters", "filter_length", "timer")
+
+    def __init__(self, params: dict[str, Any]):
+        self.params = params
+        self.waiters: list[_Waiter] = []
+        self.filter_length = 0
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class MicroBatcher:
+    """
+    Short batching window in front of the Retail Prices API.
+
+    Requests with the same non-filter parameters (API version, currency) that
+    arrive within `window` seconds of the first are merged into one query
+    whose filter ORs theirs together and whose $top is the largest of theirs.
+    Every caller gets the items matching its own filter (evaluated locally,
+    see odata.py), cut to its own $top, as a single page.
+
+    Only requests with a $top are batched: without one, a broad filter in the
+    batch would make the merged query page through everything it matches.
+
+    submit() returns None when a request cannot be batched, ended up alone
+    in its batch, the merged query failed, was too large to complete or
+    reached the merged $top (so items may be missing), or the caller's own
+    $top cuts its matches (its own request would link to a next page); the
+    caller then issues its own request as usual.
+    """
+
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        base_url: str,
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_BATCH_MAX_SIZE,
+        max_filter_length: int = DEFAULT_BATCH_MAX_FILTER_LENGTH,
+        max_pages: int = DEFAULT_BATCH_MAX_PAGES,
+        max_items: int = DEFAULT_BATCH_MAX_ITEMS,
+    ):
+        self._fetch_page = fetch_page
+        self.base_url = base_url
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_filter_length = max_filter_length
+        self.max_pages = max_pages
+        self.max_items = max_items
+
+        self._pending: dict[tuple[tuple[str, str], ...], _Batch] = {}
+        self._running: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.merged_requests = 0
+        self.solo_requests = 0
+        self.fallback_requests = 0
+
+    async def submit(self, params: dict[str, Any]) -> dict[str, Any] | None:
+        """Add a first-page request to a batch and wait for its page, or None if it must be fetched directly."""
+        filter_text = params.get("$filter")
+        if not filter_text or "$skip" in params or "$top" not in params:
+            return None
+        try:
+            predicate = compile_filter(filter_text)
+            top = int(params["$top"])
+        except (ODataParseError, ValueError):
+            return None
+        if top <= 0:
+            return None
+
+        key = tuple(sorted((k, str(v)) for k, v in params.items() if k not in _PER_REQUEST_PARAMS))
+        batch = self._pending.get(key)
+        if batch is not None and batch.filter_length + len(filter_text) + 6 > self.max_filter_length:
+            self._flush(key)
+            batch = None
+        loop = asyncio.get_running_loop()
+        if batch is None:
+            batch = _Batch({k: v for k, v in params.items() if k not in _PER_REQUEST_PARAMS})
+            batch.timer = loop.call_later(self.window, self._flush, key)
+            self._pending[key] = batch
+
+        future: asyncio.Future[dict[str, Any] | None] = loop.create_future()
+        batch.waiters.append(_Waiter(filter_text, predicate, top, future))
+        batch.filter_length += len(filter_text) + 6  # "(...) or "
+        if len(batch.waiters) >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: tuple[tuple[str, str], ...]) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        waiters = batch.waiters
+        if len(waiters) == 1:
+            self.solo_requests += 1
+            _resolve(waiters[0], None)
+            return
+
+        filters = list(dict.fromkeys(waiter.filter_text for waiter in waiters))
+        top = max(waiter.top for waiter in waiters)
+        params = {**batch.params, "$filter": " or ".join(f"({text})" for text in filters), "$top": str(top)}
+        try:
+            items = await self._fetch_all(params, top)
+        except Exception as e:
+            logger.warning(f"Merged request for {len(waiters)} lookups failed, sending them individually: {e}")
+            items = None
+
+        if items is None:
+            self.fallback_requests += len(waiters)
+            for waiter in waiters:
+                _resolve(waiter, None)
+            return
+
+        # The merged result is complete, so a caller whose matches fit its $top
+        # has no further page; anyone with more is sent on its own to get one
+        answered = 0
+        for waiter in waiters:
+            matched = [item for item in items if waiter.predicate(item)]
+            if len(matched) > waiter.top:
+                self.fallback_requests += 1
+                _resolve(waiter, None)
+                continue
+            answered += 1
+            _resolve(waiter, {"Items": matched, "NextPageLink": None, "Count": len(matched)})
+        if answered:
+            self.batches += 1
+            self.merged_requests += answered
+            logger.debug(f"Answered {answered} lookups with one merged request ({len(items)} items)")
+
+    async def _fetch_all(self, params: dict[str, Any], top: int) -> list[dict[str, Any]] | None:
+        """
+        Every item of the merged query, or None if it may be incomplete.
+
+        That is the case when the items exceed max_pages or max_items, or
+        reach `top`, where the merged $top may have cut some off.
+        """
+        items: list[dict[str, Any]] = []
+        url = self.base_url
+        page_params: dict[str, Any] | None = params
+        for _ in range(self.max_pages):
+            page = await self._fetch_page(url, page_params)
+            items.extend(page.get("Items", []))
+            if len(items) >= top or len(items) > self.max_items:
+                return None
+            next_url = page.get("NextPageLink")
+            if not next_url:
+                return items
+            url, page_params = next_url, None
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        """Return batching counters."""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "merged_requests": self.merged_requests,
+            "upstream_requests_saved": self.merged_requests - self.batches,
+            "solo_requests": self.solo_requests,
+            "fallback_requests": self.fallback_requests,
+        }
+
+
+def _resolve(waiter: _Waiter, result: dict[str, Any] | None) -> None:
+    if not waiter.future.done():
+        waiter.future.set_result(result)
@@ -0,0 +1,594 @@
+"""
+Scan Bicep templates for billable resources and turn them into price lookups.
+
+This is a lightweight reader of the declarations that decide what a template
+costs, not a Bicep compiler. It handles `param`, `var`, `resource` and
+`module` declarations and `using` in .bicepparam files. Expressions are
+resolved when they are literals, `${}` interpolations of known names or
+references to params and vars; anything else (function calls, ternaries,
+resource properties) is left unresolved. Module calls are followed with the
+caller's param values, so a SKU or location passed down from main.bicep or a
+.bicepparam file reaches the resource that uses it.
+
+Files are parsed independently, in worker processes when a scan covers many
+of them, and parsed files are cached by modification time and size, so a
+rescan only re-reads what changed.
+"""
+
+import os
+import re
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Any
+
+BICEP_SUFFIXES = (".bicep", ".bicepparam")
+PARALLEL_SCAN_MIN_FILES = 16  # scans of fewer files are parsed in-process
+MAX_MODULE_DEPTH = 32  # module nesting followed at most
+DEFAULT_MAX_CACHED_FILES = 4096  # parsed files kept for rescans
+_SKIPPED_DIRS = frozenset({".git", "node_modules", ".venv", "bin", "obj"})
+
+# Strings (multi-line, then single-line with \' escapes), comments, brackets and entry separators
+_TOKEN_RE = re.compile(r"'''.*?'''|'(?:\\.|[^'\\])*'|//[^\n]*|/\*.*?\*/|[{}\[\]()]|,|\n", re.S)
+_COMMENT_RE = re.compile(r"'''.*?'''|'(?:\\.|[^'\\])*'|(//[^\n]*|/\*.*?\*/)", re.S)
+_PARAM_RE = re.compile(r"^[ \t]*param[ \t]+(\w+)(?:[ \t]+[\w.]+(?:\[\])?)?[ \t]*(?:=[ \t]*(.*?))?[ \t]*$", re.M)
+_VAR_RE = re.compile(r"^[ \t]*var[ \t]+(\w+)[ \t]*=[ \t]*(.*?)[ \t]*$", re.M)
+_USING_RE = re.compile(r"^[ \t]*using[ \t]+'([^']+)'", re.M)
+_RESOURCE_RE = re.compile(
+    r"^[ \t]*resource[ \t]+(\w+)[ \t]+'([\w.]+/[^'@]+)@([^']*)'[ \t]*(existing[ \t]*)?=[ \t]*", re.M
+)
+_MODULE_RE = re.compile(r"^[ \t]*module[ \t]+(\w+)[ \t]+'([^']+)'[ \t]*=[ \t]*", re.M)
+_RANGE_LOOP_RE = re.compile(r"\[\s*for\s+.*?\s+in\s+range\(\s*(\d+)\s*,\s*(\d+)\s*\)", re.S)
+_KEY_RE = re.compile(r"^(\w+|'[^']*')\s*:\s*(.*)$", re.S)
+_STRING_RE = re.compile(r"'((?:\\.|[^'\\])*)'")
+_INTERPOLATION_RE = re.compile(r"\$\{\s*(\w+)\s*\}")
+_INT_RE = re.compile(r"-?\d+")
+_NAME_RE = re.compile(r"[A-Za-z_]\w*")
+
+
+# Normalise an ARM SKU name to the Retail Prices API's skuName
+def _vm_size(sku: str) -> str:
+    """Drop the tier prefix and underscores: Standard_D4s_v5 -> D4s v5."""
+    return re.sub(r"^(Standard|Basic)_", "", sku).replace("_", " ")
+
+
+def _app_service_plan(sku: str) -> str:
+    """Space out the generation suffix: P1v3 -> P1 v3."""
+    return re.sub(r"(\d)(v\d+)$", r"\1 \2", sku)
+
+
+def _storage_account(sku: str) -> str:
+    """Standard_LRS -> Hot LRS (the default access tier), Premium_ZRS -> Premium ZRS."""
+    tier, _, redundancy = sku.partition("_")
+    return f"Hot {redundancy}" if tier.lower() == "standard" else f"{tier} {redundancy}"
+
+
+def _log_analytics(sku: str) -> str:
+    """PerGB2018 -> Pay-as-you-go."""
+    return "Pay-as-you-go" if sku.lower() == "pergb2018" else sku
+
+
+def _title(sku: str) -> str:
+    """Capitalise: standard -> Standard."""
+    return sku[:1].upper() + sku[1:]
+
+
+@dataclass(frozen=True)
+class ServiceMapping:
+    """How a resource type is priced: its Retail Prices service and where its SKU is declared."""
+
+    service_name: str
+    sku_paths: tuple[tuple[str, ...], ...] = (("sku", "name"), ("sku",))
+    normalise: Callable[[str], str] | None = None
+    quantity_path: tuple[str, ...] | None = None
+    # ARM SKU names with no pay-as-you-go price, or billed through another resource
+    free_skus: frozenset[str] = frozenset()
+    note: str | None = None
+    # Billed per unit of usage (e.g. GB ingested) that a template does not declare
+    usage_unit: str | None = None
+
+
+# ARM resource type (lowercase) -> pricing; service names are those the Retail Prices API returns
+RESOURCE_PRICING: dict[str, ServiceMapping] = {
+    "microsoft.compute/virtualmachines": ServiceMapping(
+        "Virtual Machines", (("properties", "hardwareProfile", "vmSize"),), _vm_size
+    ),
+    "microsoft.compute/virtualmachinescalesets": ServiceMapping(
+        "Virtual Machines", (("sku", "name"),), _vm_size, quantity_path=("sku", "capacity")
+    ),
+    "microsoft.web/serverfarms": ServiceMapping(
+        "Azure App Service", (("sku", "name"),), _app_service_plan, quantity_path=("sku", "capacity")
+    ),
+    "microsoft.web/staticsites": ServiceMapping("Static Web Apps", free_skus=frozenset({"free"})),
+    "microsoft.operationalinsights/workspaces": ServiceMapping(
+        "Log Analytics",
+        (("properties", "sku", "name"),),
+        _log_analytics,
+        free_skus=frozenset({"free"}),
+        usage_unit="GB ingested",
+    ),
+    "microsoft.insights/components": ServiceMapping(
+        "Application Insights", (), note="workspace-based; ingestion is billed by its Log Analytics workspace"
+    ),
+    "microsoft.storage/storageaccounts": ServiceMapping(
+        "Storage", (("sku", "name"),), _storage_account, usage_unit="GB stored and operations"
+    ),
+    "microsoft.sql/servers/databases": ServiceMapping("SQL Database", (("sku", "name"),)),
+    "microsoft.keyvault/vaults": ServiceMapping(
+        "Key Vault", (("properties", "sku", "name"),), _title, usage_unit="10K operations"
+    ),
+    "microsoft.containerregistry/registries": ServiceMapping("Container Registry", (("sku", "name"),)),
+    "microsoft.apimanagement/service": ServiceMapping(
+        "API Management", (("sku", "name"),), quantity_path=("sku", "capacity")
+    ),
+    "microsoft.network/applicationgateways": ServiceMapping(
+        "Application Gateway", (("properties", "sku", "name"),), _vm_size
+    ),
+    "microsoft.network/publicipaddresses": ServiceMapping("Virtual Network", (("sku", "name"),)),
+}
+
+
+@dataclass
+class _Declaration:
+    """A resource or module declaration as written."""
+
+    symbol: str
+    target: str  # resource type, or module source path
+    body: str  # text between the braces of the declared object
+    count: int | None = 1  # instances; None for a loop whose length is unknown
+    conditional: bool = False
+    existing: bool = False
+
+
+@dataclass
+class BicepFile:
+    """The declarations of one .bicep or .bicepparam file."""
+
+    path: str
+    params: dict[str, str | None] = field(default_factory=dict)  # name -> default (or .bicepparam value)
+    variables: dict[str, str] = field(default_factory=dict)
+    resources: list[_Declaration] = field(default_factory=list)
+    modules: list[_Declaration] = field(default_factory=list)
+    using: str | None = None  # template a .bicepparam file supplies values for
+
+    def module_path(self, source: str) -> str | None:
+        """Local file a module source or `using` path refers to, or None for a registry module."""
+        if source.startswith(("br:", "br/", "ts:", "ts/")):
+            return None
+        return os.path.normpath(os.path.join(os.path.dirname(self.path), source))
+
+
+@dataclass(frozen=True)
+class BicepResource:
+    """A resource a deployment creates, with its SKU and location resolved where possible."""
+
+    deployment: str  # entry file: a .bicepparam file, or a template not used as a module
+    file: str
+    symbol: str
+    resource_type: str
+    location: str | None
+    sku: str | None
+    count: int | None = 1
+    conditional: bool = False
+    quantity: float | None = None
+
+
+@dataclass
+class BicepScan:
+    """Result of scanning a set of files."""
+
+    files: list[str] = field(default_factory=list)
+    resources: list[BicepResource] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def _strip_comments(text: str) -> str:
+    return _COMMENT_RE.sub(lambda match: " " if match.group(1) else match.group(0), text)
+
+
+def _closing(text: str, start: int) -> int:
+    """Index of the bracket closing the one at `start`, skipping strings; -1 if it is never closed."""
+    depth = 0
+    for match in _TOKEN_RE.finditer(text, start):
+        token = match.group(0)
+        if token in "{[(":
+            depth += 1
+        elif token in "}])":
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return -1
+
+
+def _declaration(text: str, match: re.Match[str], target: str, existing: bool = False) -> _Declaration | None:
+    """Read the object body (and any condition or loop) following a declaration's `=`."""
+    rest = match.end()
+    conditional = text.startswith("if", rest)
+    count: int | None = 1
+    if text.startswith("[", rest):
+        loop = _RANGE_LOOP_RE.match(text, rest)
+        count = int(loop.group(2)) if loop else None
+    start = text.find("{", rest)
+    end = _closing(text, start) if start >= 0 else -1
+    if end < 0:
+        return None
+    return _Declaration(match.group(1), target, text[start + 1 : end], count, conditional, existing)
+
+
+def parse_file(path: str) -> BicepFile:
+    """
+    Read the declarations of one .bicep or .bicepparam file.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, encoding="utf-8-sig") as f:
+        text = _strip_comments(f.read())
+
+    parsed = BicepFile(path)
+    using = _USING_RE.search(text)
+    if using:
+        parsed.using = using.group(1)
+    for match in _PARAM_RE.finditer(text):
+        parsed.params[match.group(1)] = match.group(2) or None
+    for match in _VAR_RE.finditer(text):
+        parsed.variables[match.group(1)] = match.group(2)
+    for match in _RESOURCE_RE.finditer(text):
+        resource = _declaration(text, match, match.group(2), existing=bool(match.group(4)))
+        if resource is not None:
+            parsed.resources.append(resource)
+    for match in _MODULE_RE.finditer(text):
+        module = _declaration(text, match, match.group(2))
+        if module is not None:
+            parsed.modules.append(module)
+    return parsed
+
+
+def _properties(body: str) -> dict[str, str]:
+    """Top-level `key: value` entries of an object body, values as unevaluated text."""
+    entries: list[str] = []
+    depth = 0
+    start = 0
+    for match in _TOKEN_RE.finditer(body):
+        token = match.group(0)
+        if token in "{[(":
+            depth += 1
+        elif token in "}])":
+            depth -= 1
+        elif depth == 0 and token in ",\n":
+            entries.append(body[start : match.start()])
+            start = match.end()
+    entries.append(body[start:])
+
+    properties: dict[str, str] = {}
+    for entry in entries:
+        key = _KEY_RE.match(entry.strip())
+        if key:
+            properties[key.group(1).strip("'")] = key.group(2).strip()
+    return properties
+
+
+def _lookup(body: str, path: tuple[str, ...]) -> str | None:
+    """Unevaluated value at a property path such as ("properties", "sku", "name")."""
+    value: str | None = None
+    for key in path:
+        if value is not None:
+            if not (value.startswith("{") and value.endswith("}")):
+                return None
+            body = value[1:-1]
+        value = _properties(body).get(key)
+        if value is None:
+            return None
+    return value
+
+
+def evaluate(expr: str | None, scope: Mapping[str, Any]) -> Any:
+    """
+    Value of a simple Bicep expression, or None if it cannot be resolved statically.
+
+    Handles string, integer and boolean literals, `${name}` interpolation and
+    references to names in `scope` (params and vars).
+    """
+    if expr is None:
+        return None
+    expr = expr.strip()
+    string = _STRING_RE.fullmatch(expr)
+    if string:
+        unresolved = False
+
+        def substitute(match: re.Match[str]) -> str:
+            nonlocal unresolved
+            value = scope.get(match.group(1))
+            if value is None:
+                unresolved = True
+                return ""
+            return str(value)
+
+        value = _INTERPOLATION_RE.sub(substitute, string.group(1))
+        if unresolved or "${" in value:
+            return None
+        return value.replace("\\'", "'").replace("\\\\", "\\")
+    if _INT_RE.fullmatch(expr):
+        return int(expr)
+    if expr in ("true", "false"):
+        return expr == "true"
+    if _NAME_RE.fullmatch(expr):
+        return scope.get(expr)
+    return None
+
+
+def is_within(root: str, path: str) -> bool:
+    """Whether `path` is `root` or lies under it, once both are resolved (symlinks included)."""
+    root = os.path.realpath(root)
+    return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+
+def discover_files(paths: Iterable[str]) -> list[str]:
+    """Bicep files named in `paths` or found under the directories among them, in a stable order."""
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if name not in _SKIPPED_DIRS)
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(BICEP_SUFFIXES))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(os.path.normpath(path) for path in files))
+
+
+class BicepScanner:
+    """
+    Resolves the resources a set of Bicep files deploys.
+
+    Entry points are the .bicepparam files and the templates that no scanned
+    file uses as a module or parameter target; each is expanded through its
+    module calls, so a template with several parameter files is reported once
+    per parameter file.
+    """
+
+    def __init__(self, max_cached_files: int = DEFAULT_MAX_CACHED_FILES):
+        self.max_cached_files = max_cached_files
+        # path -> ((mtime_ns, size), parsed file)
+        self._parsed: dict[str, tuple[tuple[int, int], BicepFile]] = {}
+        self.files_parsed = 0
+
+    def clear(self) -> None:
+        self._parsed.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return parse cache size and the number of files parsed so far."""
+        return {"cached_files": len(self._parsed), "files_parsed": self.files_parsed}
+
+    def scan(self, paths: Iterable[str], max_workers: int | None = None, root: str | None = None) -> BicepScan:
+        """
+        Scan files and directories for the resources they deploy.
+
+        Args:
+            paths: .bicep/.bicepparam files, or directories to search for them
+            max_workers: Parser processes for large scans (1 parses in-process)
+            root: If given, files outside this directory (after resolving
+                symlinks), including referenced modules, are not read
+        """
+        result = BicepScan()
+
+        def readable(candidates: Iterable[str]) -> list[str]:
+            if root is None:
+                return list(candidates)
+            inside = []
+            for path in candidates:
+                if is_within(root, path):
+                    inside.append(path)
+                else:
+                    result.warnings.append(f"{path}: outside {root}, not read")
+            return inside
+
+        files = self._parse(readable(discover_files(paths)), max_workers, result.warnings)
+        # Follow module sources and `using` targets outside the scanned paths
+        pending = list(files.values())
+        while pending:
+            references = [parsed.module_path(module.target) for parsed in pending for module in parsed.modules]
+            references += [parsed.module_path(parsed.using) for parsed in pending if parsed.using]
+            missing = [path for path in dict.fromkeys(references) if path is not None and path not in files]
+            found = self._parse(readable(missing), max_workers, result.warnings)
+            files.update(found)
+            pending = list(found.values())
+        result.files = list(files)
+
+        used: set[str | None] = set()
+        for parsed in files.values():
+            used.update(parsed.module_path(module.target) for module in parsed.modules)
+            if parsed.using:
+                used.add(parsed.module_path(parsed.using))
+        for path, parsed in files.items():
+            if parsed.using:
+                target = files.get(parsed.module_path(parsed.using) or "")
+                if target is None:
+                    result.warnings.append(f"{path}: template {parsed.using} not found")
+                    continue
+                scope: dict[str, Any] = {}
+                for name, expr in parsed.variables.items():
+                    scope[name] = evaluate(expr, scope)
+                args = {name: evaluate(expr, scope) for name, expr in parsed.params.items()}
+                self._expand(path, target, args, files, result, 1, False, (target.path,))
+            elif path.endswith(".bicep") and path not in used:
+                self._expand(path, parsed, {}, files, result, 1, False, (path,))
+        return result
+
+    def _parse(self, paths: list[str], max_workers: int | None, warnings: list[str]) -> dict[str, BicepFile]:
+        """Parse files, reusing cached results for those unchanged since they were last parsed."""
+        parsed: dict[str, BicepFile] = {}
+        stale: list[tuple[str, tuple[int, int]]] = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                warnings.append(f"{path}: {e.strerror or e}")
+                continue
+            version = (stat.st_mtime_ns, stat.st_size)
+            cached = self._parsed.get(path)
+            if cached is not None and cached[0] == version:
+                parsed[path] = cached[1]
+            else:
+                stale.append((path, version))
+
+        names = [path for path, _ in stale]
+        if len(stale) >= PARALLEL_SCAN_MIN_FILES and max_workers != 1:
+            # Parsing is CPU-bound, so large scans use processes rather than threads
+            cpus = os.cpu_count() or 1
+            workers = min(max_workers or cpus, cpus)
+            with ProcessPoolExecutor(workers, mp_context=get_context("spawn")) as pool:
+                results = list(pool.map(_parse_or_error, names, chunksize=8))
+        else:
+            results = [_parse_or_error(path) for path in names]
+
+        for (path, version), outcome in zip(stale, results, strict=True):
+            if isinstance(outcome, str):
+                warnings.append(f"{path}: {outcome}")
+                continue
+            parsed[path] = outcome
+            self._parsed[path] = (version, outcome)
+            self.files_parsed += 1
+        while len(self._parsed) > self.max_cached_files:
+            del self._parsed[next(iter(self._parsed))]
+        return {path: parsed[path] for path in paths if path in parsed}
+
+    def _expand(
+        self,
+        deployment: str,
+        parsed: BicepFile,
+        args: Mapping[str, Any],
+        files: Mapping[str, BicepFile],
+        result: BicepScan,
+        count: int | None,
+        conditional: bool,
+        stack: tuple[str, ...],
+    ) -> None:
+        """Add the resources `parsed` deploys when called with `args`, following its modules."""
+        scope: dict[str, Any] = {}
+        for name, default in parsed.params.items():
+            scope[name] = args[name] if args.get(name) is not None else evaluate(default, scope)
+        for name, expr in parsed.variables.items():
+            scope[name] = evaluate(expr, scope)
+
+        for resource in parsed.resources:
+            if resource.existing:
+                continue
+            mapping = RESOURCE_PRICING.get(resource.target.lower())
+            sku = None
+            for sku_path in mapping.sku_paths if mapping else ():
+                sku = evaluate(_lookup(resource.body, sku_path), scope)
+                if sku is not None:
+                    break
+            quantity = None
+            if mapping and mapping.quantity_path:
+                quantity = evaluate(_lookup(resource.body, mapping.quantity_path), scope)
+            result.resources.append(
+                BicepResource(
+                    deployment=deployment,
+                    file=parsed.path,
+                    symbol=resource.symbol,
+                    resource_type=resource.target,
+                    location=evaluate(_properties(resource.body).get("location"), scope),
+                    sku=None if sku is None else str(sku),
+                    count=_multiply(count, resource.count),
+                    conditional=conditional or resource.conditional,
+                    quantity=float(quantity) if isinstance(quantity, int) and not isinstance(quantity, bool) else None,
+                )
+            )
+
+        for module in parsed.modules:
+            path = parsed.module_path(module.target)
+            if path is None:
+                result.warnings.append(f"{parsed.path}: module {module.symbol} uses registry module {module.target}")
+                continue
+            child = files.get(path)
+            if child is None:
+                result.warnings.append(f"{parsed.path}: module {module.symbol} file {module.target} not found")
+                continue
+            if path in stack or len(stack) >= MAX_MODULE_DEPTH:
+                result.warnings.append(f"{parsed.path}: module {module.symbol} is nested too deeply or recursive")
+                continue
+            params = _lookup(module.body, ("params",)) or "{}"
+            child_args = {name: evaluate(expr, scope) for name, expr in _properties(params.strip("{}")).items()}
+            self._expand(
+                deployment,
+                child,
+                child_args,
+                files,
+                result,
+                _multiply(count, module.count),
+                conditional or module.conditional,
+                (*stack, path),
+            )
+
+
+def _multiply(outer: int | None, inner: int | None) -> int | None:
+    return None if outer is None or inner is None else outer * inner
+
+
+def _parse_or_error(path: str) -> BicepFile | str:
+    """parse_file for a worker process: errors come back as their message rather than as an exception."""
+    try:
+        return parse_file(path)
+    except (OSError, UnicodeDecodeError) as e:
+        return str(e)
+
+
+def line_items(
+    resources: Iterable[BicepResource], default_region: str | None = None
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Batch estimate line items for scanned resources (see AzurePricingServer.estimate_costs_batch).
+
+    Returns:
+        Tuple of (line_items, skipped); each skipped entry names the resource and why it is not priced
+    """
+    lines: list[dict[str, Any]] = []
+    skipped: list[dict[str, Any]] = []
+    for resource in resources:
+        label = f"{os.path.basename(resource.file)}:{resource.symbol}"
+
+        def skip(reason: str, label: str = label, resource: BicepResource = resource) -> None:
+            skipped.append({"resource": label, "resource_type": resource.resource_type, "reason": reason})
+
+        mapping = RESOURCE_PRICING.get(resource.resource_type.lower())
+        if mapping is None:
+            skip("no pricing mapping for this resource type")
+            continue
+        if mapping.note:
+            skip(mapping.note)
+            continue
+        if resource.sku is None:
+            skip("SKU could not be resolved statically")
+            continue
+        if resource.sku.lower() in mapping.free_skus:
+            skip(f"{resource.sku} SKU has no charge")
+            continue
+        region = resource.location or default_region
+        if not region:
+            skip("location could not be resolved statically; pass default_region")
+            continue
+        sku_name = mapping.normalise(resource.sku) if mapping.normalise else resource.sku
+        if mapping.usage_unit:
+            # One unit's price would read as a flat monthly cost
+            skip(
+                f"needs usage quantity: {mapping.service_name} {sku_name} in {region} is billed per "
+                f"{mapping.usage_unit}; price the expected monthly usage with azure_cost_estimate_batch"
+            )
+            continue
+
+        if resource.conditional:
+            label += " (conditional)"
+        if resource.count is None:
+            label += " (loop length unknown, priced once)"
+        lines.append(
+            {
+                "service_name": mapping.service_name,
+                "sku_name": sku_name,
+                "region": region,
+                "quantity": (resource.quantity or 1) * (resource.count or 1),
+                "description": label,
+            }
+        )
+    return lines, skipped
@@ -0,0 +1,241 @@
+"""Byte-bounded in-memory response cache with LRU/TTL eviction and cold-entry compression."""
+
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from . import codec
+
+DEFAULT_CACHE_TTL = 3600  # seconds
+DEFAULT_CACHE_MAX_BYTES = 128 * 1024 * 1024
+# Share of the budget kept as ready-to-use objects; older entries are compressed
+DEFAULT_HOT_FRACTION = 0.25
+# Lists longer than this are sized from an evenly spaced sample
+_SIZE_SAMPLE = 16
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the resident size in bytes of a decoded JSON value.
+
+    Walks dicts and lists summing sys.getsizeof, but only visits a sample of
+    long lists and extrapolates, so sizing a 1000-item page stays cheap.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple)):
+        count = len(value)
+        if count > _SIZE_SAMPLE * 2:
+            step = count / _SIZE_SAMPLE
+            sampled = sum(estimate_size(value[int(i * step)]) for i in range(_SIZE_SAMPLE))
+            size += sampled * count // _SIZE_SAMPLE
+        else:
+            size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "blob", "size", "raw_size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value = value
+        self.blob: bytes | None = None
+        self.size = size  # bytes currently charged to the budget
+        self.raw_size = size  # estimated size when decompressed
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    Cache of API responses bounded by estimated memory rather than entry count.
+
+    Entries expire after `ttl` seconds and the least recently used entries are
+    evicted once the total exceeds `max_bytes`. When compression is enabled,
+    only the most recently used `hot_bytes` are held as live objects; colder
+    entries are kept as zlib-compressed JSON (typically 10-20x smaller) and
+    decoded again on their next hit, passed through `restore` if given. Many small lookups can therefore stay
+    cached alongside a few multi-megabyte pages.
+
+    Supports the subset of the mapping interface used by AzurePricingServer
+    (`in`, `[]`, `[]=`, `get`, `pop`, `len`, `clear`).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        compress: bool = True,
+        hot_bytes: int | None = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+        restore: Callable[[Any], Any] | None = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress = compress
+        self.hot_bytes = hot_bytes if hot_bytes is not None else int(max_bytes * DEFAULT_HOT_FRACTION)
+        self._sizeof = sizeof
+        self._restore = restore
+        self._timer = timer
+
+        # Both ordered least recently used first
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._hot: OrderedDict[str, None] = OrderedDict()
+        self.currsize = 0
+        self._hot_size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[call-overload]
+        if entry is None:
+            return False
+        if entry.expires_at <= self._timer():
+            self._remove(key)  # type: ignore[arg-type]
+            return False
+        return True
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value for `key`, marking it most recently used."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= self._timer():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        if entry.blob is not None:
+            self._decompress(key, entry)
+        else:
+            self._hot.move_to_end(key)
+        self._compact()
+        return entry.value
+
+    def set(self, key: str, value: Any, size: int | None = None) -> None:
+        """Store `value`, evicting older entries to stay within budget."""
+        if key in self._entries:
+            self._remove(key)
+
+        size = size if size is not None else self._sizeof(value)
+        if size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+
+        self._entries[key] = _Entry(value, size, self._timer() + self.ttl)
+        self._hot[key] = None
+        self.currsize += size
+        self._hot_size += size
+        self._compact()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        """Remove `key` and return its value."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self._remove(key)
+        return value
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._entries.clear()
+        self._hot.clear()
+        self.currsize = 0
+        self._hot_size = 0
+
+    def expire(self) -> int:
+        """Drop every expired entry and return how many were removed."""
+        now = self._timer()
+        expired = [key for key, entry in self._entries.items() if entry.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        return len(expired)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.currsize -= entry.size
+        if entry.blob is None:
+            del self._hot[key]
+            self._hot_size -= entry.size
+
+    def _decompress(self, key: str, entry: _Entry) -> None:
+        assert entry.blob is not None
+        entry.value = codec.loads(zlib.decompress(entry.blob))
+        if self._restore is not None:
+            entry.value = self._restore(entry.value)
+        entry.blob = None
+        self.currsize += entry.raw_size - entry.size
+        entry.size = entry.raw_size
+        self._hot[key] = None
+        self._hot_size += entry.size
+
+    def _compress(self, key: str, entry: _Entry) -> None:
+        try:
+            blob = zlib.compress(codec.dumps_bytes(entry.value), 1)
+        except (TypeError, ValueError):
+            # Not JSON-serialisable; leave it uncompressed
+            return
+        del self._hot[key]
+        self._hot_size -= entry.size
+        self.currsize += len(blob) - entry.size
+        entry.value = None
+        entry.blob = blob
+        entry.size = len(blob)
+
+    def _compact(self) -> None:
+        """Compress cold entries, then evict least recently used ones until within budget."""
+        if self.compress:
+            # Skip the most recent entry so a fresh insert is never compressed immediately
+            while self._hot_size > self.hot_bytes and len(self._hot) > 1:
+                key = next(iter(self._hot))
+                entry = self._entries[key]
+                before = len(self._hot)
+                self._compress(key, entry)
+                if len(self._hot) == before:
+                    # Could not compress; treat it as recently used and stop
+                    self._hot.move_to_end(key)
+                    break
+
+        while self.currsize > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit-rate counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.currsize,
+            "max_bytes": self.max_bytes,
+            "hot_entries": len(self._hot),
+            "hot_bytes": self._hot_size,
+            "compressed_entries": len(self._entries) - len(self._hot),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
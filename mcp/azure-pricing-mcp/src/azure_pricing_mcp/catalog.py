@@ -0,0 +1,670 @@
+"""
+Local offline copy of the Azure Retail Prices dataset.
+
+The catalog stores price items column by column: string fields are
+dictionary-encoded into uint32 code arrays, numeric fields are float64
+arrays. A $filter term on a string column is tested once per distinct
+value, and the matching codes resolve through per-column postings lists
+(code -> row ids), so typical service/region/SKU lookups touch only the
+matching rows.
+
+Prices change a little at a time, so after the first download an
+incremental sync fetches only items whose effectiveStartDate is at or past
+the catalog's watermark and merges them in place.
+
+Usage:
+    python -m azure_pricing_mcp catalog sync --service "Virtual Machines" --currency USD
+    python -m azure_pricing_mcp catalog sync --incremental
+    python -m azure_pricing_mcp catalog info
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .odata import BoolOp, Expr, ODataParseError, Term, compile_expr, fold, parse_filter
+
+if TYPE_CHECKING:
+    from .server import AzurePricingServer
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+CATALOG_FORMAT_VERSION = 1
+DEFAULT_CATALOG_PATH = Path.home() / ".cache" / "azure-pricing-mcp" / "catalog"
+DEFAULT_SYNC_CONCURRENCY = 4  # pages requested at once during a sync
+PAGE_SIZE = 1000  # items per Retail Prices API page
+
+# Dictionary-encoded text fields
+STRING_COLUMNS = (
+    "currencyCode",
+    "armRegionName",
+    "location",
+    "effectiveStartDate",
+    "meterId",
+    "meterName",
+    "productId",
+    "skuId",
+    "productName",
+    "skuName",
+    "serviceName",
+    "serviceId",
+    "serviceFamily",
+    "unitOfMeasure",
+    "type",
+    "armSkuName",
+    "reservationTerm",
+)
+NUMERIC_COLUMNS = ("retailPrice", "unitPrice", "tierMinimumUnits")
+FLAG_COLUMNS = ("isPrimaryMeterRegion",)
+# Identify the same price across syncs. A meterId alone is shared by its
+# reservation terms and price tiers, so those are part of the key too.
+MERGE_KEY_COLUMNS = ("meterId", "skuId", "type", "reservationTerm")
+
+_NAN = float("nan")
+
+
+class PriceCatalog:
+    """
+    Columnar, dictionary-encoded store of price items.
+
+    Code 0 in every string column means "field absent"; NaN marks an absent
+    number and -1 an absent flag. savingsPlan lists are kept sparsely by row.
+    """
+
+    def __init__(self, currency: str = "USD", services: list[str] | None = None):
+        self.currency = currency
+        self.services = sorted(services) if services else None
+        self.synced_at: str | None = None
+
+        self._values: dict[str, list[str]] = {column: [""] for column in STRING_COLUMNS}
+        self._value_codes: dict[str, dict[str, int]] = {column: {"": 0} for column in STRING_COLUMNS}
+        self._codes: dict[str, array] = {column: array("I") for column in STRING_COLUMNS}
+        self._numbers: dict[str, array] = {column: array("d") for column in NUMERIC_COLUMNS}
+        self._flags: dict[str, array] = {column: array("b") for column in FLAG_COLUMNS}
+        self._savings_plans: dict[int, list[dict[str, Any]]] = {}
+        self._postings: dict[str, dict[int, array]] = {}
+        # Casefolded value -> codes of a string column, for case-insensitive eq/in
+        self._folded_codes: dict[str, dict[str, set[int]]] = {}
+        self._row_keys: dict[tuple[Any, ...], int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._codes["skuName"])
+
+    # -- building ----------------------------------------------------------------
+
+    def _encode(self, column: str, value: Any) -> int:
+        if value is None or value == "":
+            return 0
+        value = str(value)
+        codes = self._value_codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = len(self._values[column])
+            codes[value] = code
+            self._values[column].append(value)
+            folded = self._folded_codes.get(column)
+            if folded is not None:
+                folded.setdefault(value.casefold(), set()).add(code)
+        return code
+
+    def append(self, item: dict[str, Any]) -> int:
+        """Add a price item and return its row id."""
+        row = len(self)
+        for column in STRING_COLUMNS:
+            self._codes[column].append(self._encode(column, item.get(column)))
+        for column in NUMERIC_COLUMNS:
+            number = item.get(column)
+            self._numbers[column].append(float(number) if isinstance(number, (int, float)) else _NAN)
+        for column in FLAG_COLUMNS:
+            flag = item.get(column)
+            self._flags[column].append(-1 if flag is None else int(bool(flag)))
+        if item.get("savingsPlan"):
+            self._savings_plans[row] = item["savingsPlan"]
+        self._postings.clear()
+        if self._row_keys is not None:
+            self._row_keys[self._merge_key(item)] = row
+        return row
+
+    def extend(self, items: list[dict[str, Any]]) -> None:
+        """Add several price items."""
+        for item in items:
+            self.append(item)
+
+    def replace(self, row: int, item: dict[str, Any]) -> None:
+        """Overwrite an existing row with a new version of the price item."""
+        for column in STRING_COLUMNS:
+            self._codes[column][row] = self._encode(column, item.get(column))
+        for column in NUMERIC_COLUMNS:
+            number = item.get(column)
+            self._numbers[column][row] = float(number) if isinstance(number, (int, float)) else _NAN
+        for column in FLAG_COLUMNS:
+            flag = item.get(column)
+            self._flags[column][row] = -1 if flag is None else int(bool(flag))
+        if item.get("savingsPlan"):
+            self._savings_plans[row] = item["savingsPlan"]
+        else:
+            self._savings_plans.pop(row, None)
+        self._postings.clear()
+
+    @staticmethod
+    def _merge_key(item: dict[str, Any]) -> tuple[Any, ...]:
+        tier = item.get("tierMinimumUnits")
+        return (
+            *(str(item.get(column) or "") for column in MERGE_KEY_COLUMNS),
+            float(tier) if isinstance(tier, (int, float)) else None,
+        )
+
+    def merge(self, items: list[dict[str, Any]]) -> dict[str, int]:
+        """
+        Fold newer versions of price items into the catalog.
+
+        Items are matched to existing rows by meterId, skuId, type,
+        reservationTerm and tier. A match is replaced when the item differs and
+        is not older than the stored row; anything without a match is appended.
+
+        Returns:
+            Counts of rows added, changed and unchanged
+        """
+        if self._row_keys is None:
+            self._row_keys = {self._merge_key(self.row(row)): row for row in range(len(self))}
+
+        counts = {"added": 0, "changed": 0, "unchanged": 0}
+        for item in items:
+            row = self._row_keys.get(self._merge_key(item))
+            if row is None:
+                self.append(item)
+                counts["added"] += 1
+                continue
+            current = self.row(row)
+            if _stored_fields(item) == current or str(item.get("effectiveStartDate") or "") < current.get(
+                "effectiveStartDate", ""
+            ):
+                counts["unchanged"] += 1
+            else:
+                self.replace(row, item)
+                counts["changed"] += 1
+        return counts
+
+    # -- reading -----------------------------------------------------------------
+
+    def row(self, row: int) -> dict[str, Any]:
+        """Materialise a row as an API-shaped price item."""
+        item: dict[str, Any] = {}
+        for column in STRING_COLUMNS:
+            code = self._codes[column][row]
+            if code:
+                item[column] = self._values[column][code]
+        for column in NUMERIC_COLUMNS:
+            number = self._numbers[column][row]
+            if number == number:  # not NaN
+                item[column] = number
+        for column in FLAG_COLUMNS:
+            flag = self._flags[column][row]
+            if flag >= 0:
+                item[column] = bool(flag)
+        if row in self._savings_plans:
+            item["savingsPlan"] = [dict(plan) for plan in self._savings_plans[row]]
+        return item
+
+    def values(self, column: str) -> list[str]:
+        """Distinct values of a string column (excluding the absent marker)."""
+        return self._values[column][1:]
+
+    def codes(self, column: str) -> array:
+        """Per-row codes of a string column; code n is values(column)[n - 1], 0 means absent."""
+        return self._codes[column]
+
+    def first_rows(self, *columns: str) -> dict[tuple[str, ...], int]:
+        """First row id for each distinct combination of values of the given string columns."""
+        first: dict[tuple[int, ...], int] = {}
+        for row, codes in enumerate(zip(*(self._codes[column] for column in columns), strict=True)):
+            if codes not in first:
+                first[codes] = row
+        return {
+            tuple(self._values[column][code] for column, code in zip(columns, codes, strict=True)): row
+            for codes, row in first.items()
+        }
+
+    @property
+    def watermark(self) -> str | None:
+        """Latest effectiveStartDate in the catalog; incremental syncs fetch from here."""
+        dates = self.values("effectiveStartDate")
+        return max(dates) if dates else None
+
+    def postings(self, column: str) -> dict[int, array]:
+        """Row ids for each code of a string column, built on first use."""
+        index = self._postings.get(column)
+        if index is None:
+            index = {}
+            for row, code in enumerate(self._codes[column]):
+                rows = index.get(code)
+                if rows is None:
+                    rows = index[code] = array("I")
+                rows.append(row)
+            self._postings[column] = index
+        return index
+
+    def _folded(self, column: str) -> dict[str, set[int]]:
+        folded = self._folded_codes.get(column)
+        if folded is None:
+            folded = self._folded_codes[column] = {}
+            for code, value in enumerate(self._values[column]):
+                if code:
+                    folded.setdefault(value.casefold(), set()).add(code)
+        return folded
+
+    def _matching_codes(self, term: Term) -> set[int]:
+        """Dictionary codes of a string column whose value satisfies `term`, testing each distinct value once."""
+        if term.op in ("eq", "in"):
+            folded = self._folded(term.field)
+            wanted = term.value if term.op == "in" else (term.value,)
+            codes: set[int] = set()
+            for value in wanted:
+                # null selects the absent marker; non-string literals never equal a stored string
+                if value is None:
+                    codes.add(0)
+                elif isinstance(value, str):
+                    codes.update(folded.get(value.casefold(), ()))
+            return codes
+        # Code 0 stands for an absent field, which ne matches and the string functions do not
+        return {
+            code
+            for code, value in enumerate(self._values[term.field])
+            if term.matches({term.field: value if code else None})
+        }
+
+    def _column_value(self, column: str, row: int) -> Any:
+        if column in self._numbers:
+            number = self._numbers[column][row]
+            return number if number == number else None
+        flag = self._flags[column][row]
+        return bool(flag) if flag >= 0 else None
+
+    def _estimate(self, expr: Expr) -> float:
+        """Rough number of rows an expression matches, to order the terms of a conjunction."""
+        if isinstance(expr, Term) and expr.field in self._value_codes:
+            postings = self.postings(expr.field)
+            return sum(len(postings.get(code, ())) for code in self._matching_codes(expr))
+        return float("inf")
+
+    def _select(self, expr: Expr, candidates: list[int] | None) -> list[int]:
+        """Rows (ascending) matching `expr`, restricted to `candidates` when given."""
+        if isinstance(expr, BoolOp):
+            if expr.op == "and":
+                # Narrow by the most selective indexed term first, then test the rest per candidate row
+                for operand in sorted(expr.operands, key=self._estimate):
+                    candidates = self._select(operand, candidates)
+                    if not candidates:
+                        break
+                return candidates or []
+            matched: set[int] = set()
+            for operand in expr.operands:
+                matched.update(self._select(operand, candidates))
+            return sorted(matched)
+
+        if expr.field in self._value_codes:
+            codes = self._matching_codes(expr)
+            if not codes:
+                return []
+            if candidates is None:
+                postings = self.postings(expr.field)
+                return sorted(row for code in codes for row in postings.get(code, ()))
+            column_codes = self._codes[expr.field]
+            return [row for row in candidates if column_codes[row] in codes]
+
+        rows = candidates if candidates is not None else range(len(self))
+        predicate = compile_expr(expr)
+        if expr.field in self._numbers or expr.field in self._flags:
+            field = expr.field
+            return [row for row in rows if predicate({field: self._column_value(field, row)})]
+        # Not stored in columns (e.g. savingsPlan): evaluate on the materialised row
+        return [row for row in rows if predicate(self.row(row))]
+
+    def select(self, where: Expr | tuple[Term, ...] | None) -> list[int]:
+        """Row ids matching a filter expression (or a conjunction of terms), in insertion order."""
+        if isinstance(where, tuple):
+            where = BoolOp("and", where) if len(where) > 1 else (where[0] if where else None)
+        if where is None:
+            return list(range(len(self)))
+        return self._select(where, None)
+
+    def query(self, where: Expr | tuple[Term, ...] | None, limit: int | None = None) -> list[dict[str, Any]]:
+        """Price items matching a filter expression (or a conjunction of terms), decoding at most `limit` rows."""
+        return [self.row(row) for row in self.select(where)[:limit]]
+
+    def lookup(self, params: dict[str, Any] | None) -> list[dict[str, Any]] | None:
+        """
+        Answer an API query from the catalog.
+
+        Returns None if the catalog cannot answer it: a different currency, a
+        service outside the synced scope, or a filter (or $top) it cannot evaluate.
+        """
+        params = params or {}
+        if params.get("currencyCode", "USD") != self.currency:
+            return None
+        try:
+            top = int(params["$top"]) if params.get("$top") is not None else None
+        except (TypeError, ValueError):
+            return None
+        if top is not None and top < 0:
+            return None
+        try:
+            where = parse_filter(params["$filter"]) if params.get("$filter") else None
+        except ODataParseError:
+            return None
+        if self.services is not None:
+            services = _required_services(where) if where is not None else None
+            if services is None or not set(map(fold, services)) <= set(map(fold, self.services)):
+                return None
+        return self.query(where, limit=top)
+
+    # -- persistence -------------------------------------------------------------
+
+    def save(self, path: str | Path) -> None:
+        """
+        Write the catalog to a directory, replacing any previous catalog there.
+
+        The files are written to a sibling temporary directory, which is then
+        renamed into place, so a save that fails part-way (or a refresh that
+        crashes mid-write) leaves the previous catalog as it was.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        try:
+            self._write_files(staging)
+            if not path.exists():
+                os.replace(staging, path)
+                return
+            # A directory can only be renamed over an empty one, so move the old catalog aside first
+            previous = staging.with_name(f"{staging.name}.old")
+            os.replace(path, previous)
+            try:
+                os.replace(staging, path)
+            except OSError:
+                os.replace(previous, path)
+                raise
+            shutil.rmtree(previous, ignore_errors=True)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging, ignore_errors=True)
+
+    def _write_files(self, path: Path) -> None:
+        for column, codes in self._codes.items():
+            (path / f"{column}.codes").write_bytes(codes.tobytes())
+        for column, numbers in self._numbers.items():
+            (path / f"{column}.f64").write_bytes(numbers.tobytes())
+        for column, flags in self._flags.items():
+            (path / f"{column}.flags").write_bytes(flags.tobytes())
+        (path / "dictionaries.json").write_text(json.dumps(self._values))
+        (path / "savings_plans.json").write_text(json.dumps({str(k): v for k, v in self._savings_plans.items()}))
+        (path / "manifest.json").write_text(json.dumps(self._manifest(), indent=2))
+
+    def _manifest(self) -> dict[str, Any]:
+        return {
+            "format_version": CATALOG_FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(self),
+            "currency": self.currency,
+            "services": self.services,
+            "synced_at": self.synced_at,
+            "watermark": self.watermark,
+        }
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PriceCatalog":
+        """Read a catalog written by save()."""
+        path = Path(path)
+        manifest = json.loads((path / "manifest.json").read_text())
+        if manifest.get("format_version") != CATALOG_FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog format in {path}: {manifest.get('format_version')}")
+
+        catalog = cls(currency=manifest["currency"], services=manifest.get("services"))
+        catalog.synced_at = manifest.get("synced_at")
+        swap = manifest.get("byteorder", sys.byteorder) != sys.byteorder
+
+        def read(filename: str, typecode: str) -> array:
+            data = array(typecode)
+            data.frombytes((path / filename).read_bytes())
+            if swap:
+                data.byteswap()
+            return data
+
+        catalog._values = json.loads((path / "dictionaries.json").read_text())
+        catalog._value_codes = {
+            column: {value: code for code, value in enumerate(values)} for column, values in catalog._values.items()
+        }
+        catalog._codes = {column: read(f"{column}.codes", "I") for column in STRING_COLUMNS}
+        catalog._numbers = {column: read(f"{column}.f64", "d") for column in NUMERIC_COLUMNS}
+        catalog._flags = {column: read(f"{column}.flags", "b") for column in FLAG_COLUMNS}
+        savings = json.loads((path / "savings_plans.json").read_text())
+        catalog._savings_plans = {int(row): plans for row, plans in savings.items()}
+
+        if any(len(codes) != manifest["rows"] for codes in catalog._codes.values()):
+            raise ValueError(f"Catalog in {path} is inconsistent with its manifest")
+        return catalog
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and scope information."""
+        return {
+            "rows": len(self),
+            "currency": self.currency,
+            "services": self.services or "all",
+            "synced_at": self.synced_at,
+            "watermark": self.watermark,
+            "distinct_services": len(self._values["serviceName"]) - 1,
+            "distinct_skus": len(self._values["skuName"]) - 1,
+            "distinct_regions": len(self._values["armRegionName"]) - 1,
+        }
+
+
+def _required_services(expr: Expr) -> set[str] | None:
+    """Service names an expression restricts results to, or None if it does not restrict them."""
+    if isinstance(expr, Term):
+        if expr.field != "serviceName":
+            return None
+        if expr.op == "eq":
+            return {expr.value}
+        if expr.op == "in":
+            return set(expr.value)
+        return None
+    scopes = [_required_services(operand) for operand in expr.operands]
+    if expr.op == "and":
+        bounded = [scope for scope in scopes if scope is not None]
+        return set.intersection(*bounded) if bounded else None
+    if any(scope is None for scope in scopes):
+        return None
+    return set().union(*scopes)  # type: ignore[arg-type]
+
+
+def _stored_fields(item: dict[str, Any]) -> dict[str, Any]:
+    """The part of a price item the catalog keeps, shaped as PriceCatalog.row() returns it."""
+    stored: dict[str, Any] = {}
+    for column in STRING_COLUMNS:
+        value = item.get(column)
+        if value is not None and value != "":
+            stored[column] = str(value)
+    for column in NUMERIC_COLUMNS:
+        number = item.get(column)
+        if isinstance(number, (int, float)):
+            stored[column] = float(number)
+    for column in FLAG_COLUMNS:
+        if item.get(column) is not None:
+            stored[column] = bool(item[column])
+    if item.get("savingsPlan"):
+        stored["savingsPlan"] = item["savingsPlan"]
+    return stored
+
+
+def _scoped_params(currency: str, services: list[str] | None, extra_filter: str | None = None) -> list[dict[str, Any]]:
+    """One query per synced service (or a single unscoped query), with `extra_filter` ANDed in."""
+    from .server import DEFAULT_API_VERSION
+
+    base_params = {"api-version": DEFAULT_API_VERSION, "currencyCode": currency}
+    scoped_filters = [f"serviceName eq '{service}'" for service in services] if services else [None]
+    queries = []
+    for service_filter in scoped_filters:
+        params = dict(base_params)
+        clauses = [clause for clause in (service_filter, extra_filter) if clause]
+        if clauses:
+            params["$filter"] = " and ".join(clauses)
+        queries.append(params)
+    return queries
+
+
+async def fetch_all_items(
+    server: "AzurePricingServer",
+    params: dict[str, Any],
+    concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+) -> list[dict[str, Any]]:
+    """
+    Download every item for a query by requesting `concurrency` pages at a time.
+
+    Pages are addressed with $skip (the same mechanism NextPageLink uses), so a
+    whole wave is requested in parallel. Responses bypass the response caches,
+    and the shared rate limiter still applies.
+    """
+    from .server import AZURE_PRICING_BASE_URL
+
+    items: list[dict[str, Any]] = []
+    skip = 0
+    while True:
+        offsets = [skip + i * PAGE_SIZE for i in range(concurrency)]
+        pages = await asyncio.gather(
+            *(server.fetch_uncached(AZURE_PRICING_BASE_URL, {**params, "$skip": str(offset)}) for offset in offsets)
+        )
+        for page in pages:
+            page_items = page.get("Items", [])
+            items.extend(page_items)
+            if len(page_items) < PAGE_SIZE or not page.get("NextPageLink"):
+                return items
+        skip += concurrency * PAGE_SIZE
+        logger.info(f"Catalog sync: {len(items)} items downloaded")
+
+
+async def sync_catalog(
+    server: "AzurePricingServer",
+    path: str | Path,
+    services: list[str] | None = None,
+    currency: str = "USD",
+    concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+) -> dict[str, Any]:
+    """
+    Download the Retail Prices dataset (optionally limited to some services) into a local catalog.
+
+    Returns:
+        Catalog statistics plus the sync duration
+    """
+    started = time.monotonic()
+    catalog = PriceCatalog(currency=currency, services=services)
+    for params in _scoped_params(currency, services):
+        catalog.extend(await fetch_all_items(server, params, concurrency))
+
+    catalog.synced_at = datetime.now(timezone.utc).isoformat()
+    catalog.save(path)
+    return {**catalog.stats(), "path": str(path), "duration_seconds": round(time.monotonic() - started, 1)}
+
+
+async def refresh_catalog(
+    server: "AzurePricingServer",
+    path: str | Path,
+    concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+) -> dict[str, Any]:
+    """
+    Bring an existing catalog up to date by downloading only recently effective prices.
+
+    Fetches items with effectiveStartDate at or after the catalog's watermark
+    (inclusive, since more prices can appear for the watermark date itself),
+    for the catalog's own currency and services, and merges them in.
+
+    Returns:
+        Catalog statistics, the added/changed/unchanged counts and the sync duration
+
+    Raises:
+        ValueError: If the catalog has no effectiveStartDate to start from
+    """
+    started = time.monotonic()
+    catalog = PriceCatalog.load(path)
+    watermark = catalog.watermark
+    if watermark is None:
+        raise ValueError(f"Catalog in {path} has no effectiveStartDate watermark; run a full sync")
+
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+    for params in _scoped_params(catalog.currency, catalog.services, f"effectiveStartDate ge {watermark}"):
+        for key, count in catalog.merge(await fetch_all_items(server, params, concurrency)).items():
+            counts[key] += count
+
+    catalog.synced_at = datetime.now(timezone.utc).isoformat()
+    catalog.save(path)
+    logger.info(
+        f"Catalog refresh from {watermark}: {counts['added']} added, {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged"
+    )
+    return {
+        **catalog.stats(),
+        **counts,
+        "previous_watermark": watermark,
+        "path": str(path),
+        "duration_seconds": round(time.monotonic() - started, 1),
+    }
+
+
+async def catalog_main(argv: list[str]) -> int:
+    """Command-line entry point for `azure-pricing-mcp catalog ...`."""
+    from .server import AzurePricingServer
+
+    parser = argparse.ArgumentParser(prog="azure-pricing-mcp catalog", description="Manage the offline price catalog")
+    parser.add_argument(
+        "--path",
+        default=os.environ.get("AZURE_PRICING_CATALOG", str(DEFAULT_CATALOG_PATH)),
+        help="Catalog directory (env: AZURE_PRICING_CATALOG)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser("sync", help="Download prices into the catalog")
+    sync_parser.add_argument(
+        "--service", action="append", dest="services", help="Only sync this serviceName (repeatable)"
+    )
+    sync_parser.add_argument("--currency", default="USD", help="Currency code (default: USD)")
+    sync_parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_SYNC_CONCURRENCY, help="Pages fetched in parallel"
+    )
+    sync_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch prices effective since the last sync and merge them (uses the catalog's own scope)",
+    )
+
+    commands.add_parser("info", help="Show catalog statistics")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        print(json.dumps(PriceCatalog.load(args.path).stats(), indent=2))
+        return 0
+
+    incremental = args.incremental and (Path(args.path) / "manifest.json").exists()
+    if args.incremental and not incremental:
+        logger.info(f"No catalog at {args.path} yet; running a full sync")
+
+    try:
+        if incremental:
+            result = await refresh_catalog(AzurePricingServer(), args.path, concurrency=args.concurrency)
+        else:
+            result = await sync_catalog(
+                AzurePricingServer(), args.path, args.services, currency=args.currency, concurrency=args.concurrency
+            )
+    finally:
+        await AzurePricingServer.close_session()
+    print(json.dumps(result, indent=2))
+    return 0
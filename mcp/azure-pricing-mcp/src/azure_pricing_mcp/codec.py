@@ -0,0 +1,162 @@
+"""
+JSON encoding and decoding with a pluggable backend.
+
+orjson or msgspec is used when installed (`pip install azure-pricing-mcp[fast]`),
+otherwise the standard library. Backends are configured to agree on the output
+format: compact separators unless indented, UTF-8 rather than \\u escapes, and
+PriceItems encoded as their dicts. Cache keys, built from string parameters,
+therefore do not depend on which backend is active.
+
+Set AZURE_PRICING_JSON_CODEC to "json", "orjson" or "msgspec" to pick one
+explicitly, or call use_backend().
+"""
+
+import json
+import logging
+import os
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from .models import PriceItem, compact_page, json_default
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+BACKENDS = ("orjson", "msgspec", "json")  # in order of preference
+
+Loads = Callable[[bytes | str], Any]
+Dumps = Callable[[Any, bool, bool], bytes | str]
+
+
+def _stdlib() -> tuple[Loads, Dumps]:
+    def dumps(value: Any, indent: bool, sort_keys: bool) -> str:
+        if indent:
+            return json.dumps(value, indent=2, sort_keys=sort_keys, ensure_ascii=False, default=json_default)
+        return json.dumps(value, separators=(",", ":"), sort_keys=sort_keys, ensure_ascii=False, default=json_default)
+
+    return json.loads, dumps
+
+
+def _orjson() -> tuple[Loads, Dumps]:
+    import orjson
+
+    def dumps(value: Any, indent: bool, sort_keys: bool) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(value, default=json_default, option=option)
+
+    return orjson.loads, dumps
+
+
+def _msgspec() -> tuple[Loads, Dumps]:
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=json_default)
+    sorted_encoder = msgspec.json.Encoder(enc_hook=json_default, order="sorted")
+
+    def dumps(value: Any, indent: bool, sort_keys: bool) -> bytes:
+        data: bytes = (sorted_encoder if sort_keys else encoder).encode(value)
+        if indent:
+            data = msgspec.json.format(data, indent=2)
+        return data
+
+    return msgspec.json.decode, dumps
+
+
+_FACTORIES: dict[str, Callable[[], tuple[Loads, Dumps]]] = {
+    "orjson": _orjson,
+    "msgspec": _msgspec,
+    "json": _stdlib,
+}
+
+_backend = "json"
+_loads, _dumps = _stdlib()
+
+
+def use_backend(name: str | None = None) -> str:
+    """
+    Switch to a JSON backend, or with name=None to the fastest one installed.
+
+    Raises:
+        ValueError: If the named backend is unknown or not installed
+    """
+    global _backend, _loads, _dumps
+    for candidate in [name] if name else BACKENDS:
+        factory = _FACTORIES.get(candidate)
+        if factory is None:
+            raise ValueError(f"Unknown JSON backend {candidate!r}; expected one of {', '.join(BACKENDS)}")
+        try:
+            _loads, _dumps = factory()
+        except ImportError as e:
+            if name:
+                raise ValueError(f"JSON backend {name!r} is not installed") from e
+            continue
+        _backend = candidate
+        return candidate
+    raise AssertionError("the stdlib backend is always available")
+
+
+def backend() -> str:
+    """Name of the active backend."""
+    return _backend
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode JSON text or UTF-8 bytes."""
+    return _loads(data)
+
+
+def loads_page(data: bytes | str, fields: frozenset[str] | None = None) -> dict[str, Any]:
+    """
+    Decode a Retail Prices API page with its Items as PriceItems, keeping only `fields` of each item if given.
+
+    With msgspec the projection happens while parsing, so skipped fields are
+    never materialised; other backends decode the whole page and drop them.
+    """
+    if fields is None or _backend != "msgspec":
+        return compact_page(_loads(data), fields)
+
+    import msgspec
+
+    page = _projected_decoder(fields).decode(data)
+    names = sorted(fields)
+    items = []
+    for struct in page.Items:
+        values = {name: getattr(struct, name) for name in names}
+        items.append(PriceItem.from_dict({name: value for name, value in values.items() if value is not msgspec.UNSET}))
+    return {"Items": items, "NextPageLink": page.NextPageLink, "Count": page.Count}
+
+
+@lru_cache(maxsize=16)
+def _projected_decoder(fields: frozenset[str]) -> Any:
+    """msgspec decoder for pages whose items have only `fields` (absent ones left UNSET)."""
+    import msgspec
+
+    item_type = msgspec.defstruct("ProjectedPriceItem", [(name, Any, msgspec.UNSET) for name in sorted(fields)])
+    page_type = msgspec.defstruct(
+        "ProjectedPricePage",
+        [("Items", list[item_type], []), ("NextPageLink", str | None, None), ("Count", int | None, None)],  # type: ignore[valid-type]
+    )
+    return msgspec.json.Decoder(page_type)
+
+
+def dumps(value: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Encode a value as JSON text, compact or indented by two spaces."""
+    encoded = _dumps(value, indent, sort_keys)
+    return encoded.decode() if isinstance(encoded, bytes) else encoded
+
+
+def dumps_bytes(value: Any, sort_keys: bool = False) -> bytes:
+    """Encode a value as compact UTF-8 JSON."""
+    encoded = _dumps(value, False, sort_keys)
+    return encoded if isinstance(encoded, bytes) else encoded.encode()
+
+
+try:
+    use_backend(os.environ.get("AZURE_PRICING_JSON_CODEC") or None)
+except ValueError as e:
+    logger.warning(f"{e}; using the fastest installed JSON backend instead")
+    use_backend()
@@ -0,0 +1,147 @@
+"""SQLite-backed persistent cache for Azure Retail Prices API responses."""
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+from . import codec
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+DEFAULT_DISK_CACHE_TTL = 24 * 3600  # seconds; retail prices change at most daily
+DEFAULT_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024  # compressed bytes kept on disk
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class DiskCache:
+    """
+    Persistent L2 cache stored in a SQLite database in WAL mode.
+
+    Values are JSON-encoded and zlib-compressed. Entries expire after `ttl`
+    seconds and the least recently used entries are evicted once the
+    database holds more than `max_bytes` of compressed data.
+
+    All methods are blocking; async callers should run them in a worker
+    thread (asyncio.to_thread). A single connection is shared behind a lock.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl: float = DEFAULT_DISK_CACHE_TTL,
+        max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        return zlib.compress(codec.dumps_bytes(value), 1)
+
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return codec.loads(zlib.decompress(blob))
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+        try:
+            return self._decode(row[0])
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Dropping unreadable disk cache entry {key}: {e}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key` and evict entries beyond the size cap."""
+        blob = self._encode(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now + self.ttl, now),
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            victims.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def load_recent(self, limit: int) -> list[tuple[str, Any]]:
+        """Return up to `limit` unexpired entries, most recently used first (for warming memory caches)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM responses WHERE expires_at > ? ORDER BY accessed_at DESC LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+
+        entries = []
+        for key, blob in rows:
+            try:
+                entries.append((key, self._decode(blob)))
+            except (zlib.error, ValueError):
+                continue
+        return entries
+
+    def stats(self) -> dict[str, Any]:
+        """Return entry count and stored size."""
+        with self._lock:
+            count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"path": str(self.path), "entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
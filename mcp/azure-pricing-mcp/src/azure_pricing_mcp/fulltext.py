@@ -0,0 +1,238 @@
+"""Inverted index over the text fields of price items, ranked with BM25."""
+
+import heapq
+import math
+import re
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator, Mapping
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any
+
+from .models import FULLTEXT_FIELDS, PriceItem
+
+if TYPE_CHECKING:
+    from .catalog import PriceCatalog
+
+TEXT_FIELDS = ("productName", "meterName", "skuName")
+DEFAULT_FULLTEXT_MAX_BYTES = 64 * 1024 * 1024  # estimated size of documents and postings
+BM25_K1 = 1.2  # term frequency saturation
+BM25_B = 0.75  # document length normalisation
+_CANDIDATE_FACTOR = 4  # best-scored documents examined per requested result before sorting the rest
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Identify one price: a meter is listed once per SKU, price type, reservation term and tier
+_KEY_FIELDS = ("currencyCode", "armRegionName", "meterId", "skuId", "type", "reservationTerm", "tierMinimumUnits")
+# Per-document bookkeeping beyond the stored item: list slot, length and key-set entry
+_DOCUMENT_OVERHEAD = 8 + 4 + sys.getsizeof(tuple(_KEY_FIELDS)) + 16
+_POSTING_SIZE = 4  # one array("I") entry per token
+
+
+def normalise_token(token: str) -> str:
+    """Fold simple plurals ("disks" -> "disk"), leaving SKU-like tokens such as "d4s" alone."""
+    if len(token) > 3 and token.isalpha() and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, normalised alphanumeric tokens; "Standard_D4s_v5 Disks" -> ["standard", "d4s", "v5", "disk"]."""
+    return [normalise_token(token) for token in _TOKEN_RE.findall(text.lower())]
+
+
+def _document_key(item: Mapping[str, Any]) -> tuple[Any, ...]:
+    return tuple(item.get(field) for field in _KEY_FIELDS)
+
+
+class FullTextIndex:
+    """
+    Price items searchable by the words in their product, meter and SKU names.
+
+    Fed from every price page the server fetches and from the offline catalog
+    (catalog rows are referenced by row id rather than copied). Fetched items
+    are stored projected to FULLTEXT_FIELDS, so the index does not keep the
+    response cache's pages alive. Postings hold one document id per token
+    occurrence, so a term's frequency in a document is the number of times its
+    id repeats. Queries are scored with Okapi BM25 over the combined text fields.
+
+    Indexing stops once the estimated size of documents and postings reaches
+    `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_FULLTEXT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.currsize = 0
+        # A projected price item, or a row of self._catalog
+        self._documents: list[PriceItem | int] = []
+        self._lengths = array("I")
+        self._total_length = 0
+        self._postings: dict[str, array] = {}
+        self._document_frequency: Counter[str] = Counter()
+        self._services: Counter[str] = Counter()
+        self._keys: set[tuple[Any, ...]] = set()
+        self._catalog: PriceCatalog | None = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _add_document(self, document: PriceItem | int, tokens: list[str], service_name: str) -> None:
+        doc_id = len(self._documents)
+        self.currsize += _DOCUMENT_OVERHEAD + _POSTING_SIZE * len(tokens)
+        if not isinstance(document, int):
+            self.currsize += sys.getsizeof(document)
+        self._documents.append(document)
+        self._lengths.append(len(tokens))
+        self._total_length += len(tokens)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array("I")
+            postings.append(doc_id)
+        self._document_frequency.update(set(tokens))
+        self._services[service_name.casefold()] += 1
+
+    def add(self, item: dict[str, Any]) -> None:
+        """Index a price item, unless the same price is already indexed or the index is full."""
+        if self.currsize >= self.max_bytes:
+            return
+        key = _document_key(item)
+        if key in self._keys:
+            return
+        tokens = [token for field in TEXT_FIELDS for token in tokenize(str(item.get(field) or ""))]
+        if not tokens:
+            return
+        self._keys.add(key)
+        self._add_document(PriceItem.from_dict(item, FULLTEXT_FIELDS), tokens, str(item.get("serviceName") or ""))
+
+    def add_items(self, items: Iterable[dict[str, Any]]) -> None:
+        """Index price items."""
+        for item in items:
+            self.add(item)
+
+    def add_catalog(self, catalog: "PriceCatalog") -> None:
+        """
+        Index every row of an offline catalog.
+
+        Each distinct field value is tokenised once. Indexing a different catalog
+        starts the index over, since rows of the old one can no longer be read.
+        """
+        if catalog is self._catalog:
+            return
+        if self._catalog is not None:
+            self.clear()
+        self._catalog = catalog
+
+        columns = [
+            (catalog.codes(field), [[], *(tokenize(value) for value in catalog.values(field))]) for field in TEXT_FIELDS
+        ]
+        service_codes = catalog.codes("serviceName")
+        service_names = ["", *catalog.values("serviceName")]
+        for row in range(len(catalog)):
+            if self.currsize >= self.max_bytes:
+                break
+            tokens = [token for codes, value_tokens in columns for token in value_tokens[codes[row]]]
+            if tokens:
+                self._add_document(row, tokens, service_names[service_codes[row]])
+
+    def has_service(self, service_name: str) -> bool:
+        """Whether any item of a service is indexed."""
+        return self._services[service_name.casefold()] > 0
+
+    def _score(self, terms: list[str]) -> dict[int, float]:
+        documents = len(self._documents)
+        average_length = self._total_length / documents
+        scores: dict[int, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            frequency = self._document_frequency[term]
+            idf = math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
+            for doc_id, count in Counter(postings).items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * count * (BM25_K1 + 1) / (count + norm)
+        return scores
+
+    def _item(self, document: PriceItem | int) -> Mapping[str, Any]:
+        if isinstance(document, int):
+            assert self._catalog is not None
+            return self._catalog.row(document)
+        return document
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        service_name: str | None = None,
+        region: str | None = None,
+        price_type: str | None = None,
+        currency_code: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Price items best matching a free-text query, best first.
+
+        Items can be narrowed to a service, region, price type (the item's
+        `type`) and currency; these are compared case-insensitively.
+
+        Returns:
+            Price items (fetched ones with FULLTEXT_FIELDS only), each with its
+            BM25 score added as `match_score`
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._documents:
+            return []
+
+        wanted = {
+            "serviceName": service_name,
+            "armRegionName": region,
+            "type": price_type,
+            "currencyCode": currency_code,
+        }
+        wanted = {field: value.casefold() for field, value in wanted.items() if value}
+
+        results: list[dict[str, Any]] = []
+        seen: set[tuple[Any, ...]] = set()
+        for doc_id, score in _ranked(self._score(terms), limit * _CANDIDATE_FACTOR):
+            item = self._item(self._documents[doc_id])
+            if any(str(item.get(field) or "").casefold() != value for field, value in wanted.items()):
+                continue
+            key = _document_key(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append({**item, "match_score": round(score, 3)})
+            if len(results) >= limit:
+                break
+        return results
+
+    def clear(self) -> None:
+        """Forget every indexed item and the catalog."""
+        self._documents.clear()
+        self.currsize = 0
+        self._lengths = array("I")
+        self._total_length = 0
+        self._postings.clear()
+        self._document_frequency.clear()
+        self._services.clear()
+        self._keys.clear()
+        self._catalog = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return index size."""
+        return {
+            "documents": len(self._documents),
+            "estimated_bytes": self.currsize,
+            "max_bytes": self.max_bytes,
+            "terms": len(self._postings),
+            "services": sum(1 for count in self._services.values() if count),
+            "catalog_rows": len(self._documents) - len(self._keys),
+        }
+
+
+def _ranked(scores: dict[int, float], first: int) -> Iterator[tuple[int, float]]:
+    """Scored documents, best first; only the best `first` are selected until more are consumed."""
+    best = heapq.nlargest(first, scores.items(), key=itemgetter(1))
+    yield from best
+    if len(best) < len(scores):
+        yield from sorted(scores.items(), key=itemgetter(1), reverse=True)[first:]
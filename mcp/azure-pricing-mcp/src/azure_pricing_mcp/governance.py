@@ -0,0 +1,127 @@
+"""
+Region constraints from governance output, applied to region discovery.
+
+Governance discovery writes agent-output/{project}/04-governance-constraints.json.
+Allowed regions appear there as `allowedRegions`/`allowedLocations` lists (for
+example under constraints.network) or as the `listOfAllowedLocations`
+parameter of an "Allowed locations" policy assignment; denied regions as
+`deniedRegions`/`notAllowedLocations` and the like. Any JSON document using
+those keys, such as {"allowedRegions": ["swedencentral"]}, works as well.
+
+An allow-list is pushed down into the request filter (armRegionName eq ... or
+...), so other regions are never fetched. The Retail Prices API filter has no
+"not equal", so a deny-list alone is applied while ranking instead.
+"""
+
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+_ALLOW_KEYS = frozenset({"allowedregions", "allowedlocations", "listofallowedlocations"})
+_DENY_KEYS = frozenset(
+    {
+        "deniedregions",
+        "deniedlocations",
+        "blockedregions",
+        "blockedlocations",
+        "notallowedlocations",
+        "listofnotallowedlocations",
+    }
+)
+_SEPARATORS_RE = re.compile(r"[\s_-]+")
+
+
+def normalise_region(region: str) -> str:
+    """Region as armRegionName spells it: "West Europe" -> "westeurope"."""
+    return _SEPARATORS_RE.sub("", region).lower()
+
+
+@dataclass(frozen=True)
+class RegionPolicy:
+    """Regions a deployment may use: an optional allow-list minus a deny-list."""
+
+    allowed: frozenset[str] | None = None  # None allows every region not denied
+    denied: frozenset[str] = frozenset()
+    source: str | None = None
+
+    @property
+    def restricted(self) -> bool:
+        """Whether the policy excludes any region."""
+        return self.allowed is not None or bool(self.denied)
+
+    def permits(self, region: str | None) -> bool:
+        """Whether a region may be used; items without a region are not."""
+        if not region:
+            return False
+        region = normalise_region(region)
+        if region in self.denied:
+            return False
+        return self.allowed is None or region in self.allowed
+
+    def allowed_regions(self) -> list[str] | None:
+        """Regions to request, sorted, or None if the policy has no allow-list to push down."""
+        if self.allowed is None:
+            return None
+        return sorted(self.allowed - self.denied)
+
+    def describe(self) -> dict[str, Any]:
+        """Summary for tool results."""
+        return {
+            "source": self.source,
+            "allowed_regions": self.allowed_regions(),
+            "denied_regions": sorted(self.denied),
+        }
+
+
+def region_policy_from_dict(data: Any, source: str | None = None) -> RegionPolicy:
+    """
+    Collect the region constraints anywhere in a governance document.
+
+    Several allow-lists (e.g. policies assigned at different scopes) must all
+    permit a region, so they are intersected; deny-lists are combined.
+    """
+    allowed: frozenset[str] | None = None
+    denied: set[str] = set()
+    for key, value in _walk(data):
+        regions = _region_list(value)
+        if regions is None:
+            continue
+        if key in _ALLOW_KEYS:
+            allowed = regions if allowed is None else allowed & regions
+        elif key in _DENY_KEYS:
+            denied |= regions
+    return RegionPolicy(allowed, frozenset(denied), source)
+
+
+def load_region_policy(path: str) -> RegionPolicy:
+    """
+    Read a governance constraints file (or any JSON using the same keys).
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If it is not valid JSON
+    """
+    with open(path, encoding="utf-8") as f:
+        return region_policy_from_dict(json.load(f), source=path)
+
+
+def _walk(value: Any) -> Iterable[tuple[str, Any]]:
+    """Every (lowercased key, value) pair in nested dicts and lists."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield str(key).lower(), child
+            yield from _walk(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from _walk(child)
+
+
+def _region_list(value: Any) -> frozenset[str] | None:
+    """Regions of a list, or of a policy parameter's {"value": [...]}; None for anything else."""
+    if isinstance(value, dict) and "value" in value:
+        value = value["value"]
+    if not isinstance(value, list) or not all(isinstance(region, str) for region in value):
+        return None
+    return frozenset(normalise_region(region) for region in value)
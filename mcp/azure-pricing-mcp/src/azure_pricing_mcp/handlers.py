@@ -1,11 +1,12 @@
 """Tool handlers for Azure Pricing MCP Server."""
 
-import json
 import logging
 from typing import Any
 
 from mcp.types import TextContent
 
+from . import codec
+
 # Use the same logger namespace as server.py to ensure consistent stderr output
 logger = logging.getLogger("azure_pricing_mcp")
 
@@ -33,6 +34,12 @@ def register_tool_handlers(server: Any, pricing_server: Any) -> None:
                 elif name == "azure_cost_estimate":
                     return await _handle_cost_estimate(pricing_server, arguments)
 
+                elif name == "azure_cost_estimate_batch":
+                    return await _handle_cost_estimate_batch(pricing_server, arguments)
+
+                elif name == "azure_bicep_cost_estimate":
+                    return await _handle_bicep_cost_estimate(pricing_server, arguments)
+
                 elif name == "azure_discover_skus":
                     return await _handle_discover_skus(pricing_server, arguments)
 
@@ -42,6 +49,12 @@ def register_tool_handlers(server: Any, pricing_server: Any) -> None:
                 elif name == "azure_region_recommend":
                     return await _handle_region_recommend(pricing_server, arguments)
 
+                elif name == "azure_workload_region_optimize":
+                    return await _handle_workload_region_optimize(pricing_server, arguments)
+
+                elif name == "azure_price_fulltext_search":
+                    return await _handle_fulltext_search(pricing_server, arguments)
+
                 elif name == "get_customer_discount":
                     return await _handle_customer_discount(pricing_server, arguments)
 
@@ -133,7 +146,7 @@ async def _handle_price_search(pricing_server, arguments: dict) -> list[TextCont
                     response_text += f"   **You Save: ${total_savings:.6f}**\n\n"
 
             response_text += "**Detailed Pricing:**\n"
-            response_text += json.dumps(formatted_items, indent=2)
+            response_text += codec.dumps(formatted_items, indent=True)
 
             return [TextContent(type="text", text=response_text)]
         else:
@@ -171,7 +184,7 @@ async def _handle_price_compare(pricing_server, arguments: dict) -> list[TextCon
     if "discount_applied" in result:
         response_text += f"💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n\n"
 
-    response_text += json.dumps(result["comparisons"], indent=2)
+    response_text += codec.dumps(result["comparisons"], indent=True)
 
     return [TextContent(type="text", text=response_text)]
 
@@ -200,6 +213,9 @@ Showing top: {result['showing_top']}
     if "discount_applied" in result:
         response_text += f"\n💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
 
+    if "region_policy" in result:
+        response_text += _format_region_policy(result["region_policy"])
+
     # Add summary
     if "summary" in result:
         summary = result["summary"]
@@ -322,6 +338,83 @@ Original Pricing (before discount):
     return [TextContent(type="text", text=estimate_text)]
 
 
+async def _handle_cost_estimate_batch(pricing_server, arguments: dict) -> list[TextContent]:
+    """Handle azure_cost_estimate_batch tool calls."""
+    result = await pricing_server.estimate_costs_batch(**arguments)
+
+    if "error" in result:
+        return [TextContent(type="text", text=f"Error: {result['error']}")]
+
+    return [TextContent(type="text", text=_format_cost_estimate(result, "Batch Cost Estimate"))]
+
+
+def _format_cost_estimate(result: dict, title: str) -> str:
+    """Render a batch estimate as totals and line item tables."""
+    totals = result["totals"]
+    lookups = result["lookups"]
+    response_text = f"""🧾 {title} ({lookups['line_items']} line items)
+
+Currency: {result['currency']}
+Lookups: {lookups['distinct_lookups']} distinct, fetched with {lookups['upstream_queries']} queries
+"""
+
+    if "discount_applied" in result:
+        response_text += f"\n💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
+
+    response_text += "\n📊 Totals:\n\n"
+    response_text += "| Service | Monthly Cost | Yearly Cost |\n"
+    response_text += "|---------|--------------|-------------|\n"
+    for service, monthly in totals["by_service"].items():
+        response_text += f"| {service} | ${monthly:,.2f} | ${monthly * 12:,.2f} |\n"
+    response_text += f"| **Total** | **${totals['monthly_cost']:,.2f}** | **${totals['yearly_cost']:,.2f}** |\n"
+
+    response_text += "\n📋 Line Items:\n\n"
+    response_text += "| # | Item | Region | Quantity | Unit Price | Monthly Cost |\n"
+    response_text += "|---|------|--------|----------|------------|--------------|\n"
+    for line in result["lines"]:
+        item = f"{line['service_name']} {line['sku_name']}"
+        if line.get("description"):
+            item = f"{line['description']} ({item})"
+        if "error" in line:
+            response_text += f"| {line['line']} | {item} | {line['region']} | {line['quantity']} | N/A | not found |\n"
+            continue
+        response_text += (
+            f"| {line['line']} | {item} | {line['region']} | {line['quantity']} "
+            f"| ${line['unit_price']:.6f}/{line['unit_of_measure']} | ${line['monthly_cost']:,.2f} |\n"
+        )
+
+    if result["unpriced_lines"]:
+        numbers = ", ".join(str(number) for number in result["unpriced_lines"])
+        response_text += f"\n⚠️ No pricing found for line(s) {numbers}; they are left out of the totals.\n"
+
+    return response_text
+
+
+async def _handle_bicep_cost_estimate(pricing_server, arguments: dict) -> list[TextContent]:
+    """Handle azure_bicep_cost_estimate tool calls."""
+    result = await pricing_server.estimate_bicep_costs(**arguments)
+    scan = result["scan"]
+
+    if "error" in result:
+        response_text = f"Error: {result['error']}"
+    else:
+        response_text = _format_cost_estimate(result, f"Bicep Cost Estimate, {len(scan['files'])} files")
+
+    if scan["skipped"]:
+        response_text += "\n⏭️ Not priced:\n\n"
+        response_text += "| Resource | Type | Reason |\n"
+        response_text += "|----------|------|--------|\n"
+        for entry in scan["skipped"]:
+            response_text += f"| {entry['resource']} | {entry['resource_type']} | {entry['reason']} |\n"
+
+    if scan["warnings"]:
+        response_text += "\n⚠️ Scan warnings:\n"
+        for warning in scan["warnings"]:
+            response_text += f"   • {warning}\n"
+
+    return [TextContent(type="text", text=response_text)]
+
+
 async def _handle_discover_skus(pricing_server, arguments: dict) -> list[TextContent]:
     """Handle azure_discover_skus tool calls."""
     result = await pricing_server.discover_skus(**arguments)
@@ -329,11 +422,12 @@ async def _handle_discover_skus(pricing_server, arguments: dict) -> list[TextCon
     # Format the response
     skus = result.get("skus", [])
     if skus:
+        more = " (more may exist; raise the limit or filter by region)" if result.get("has_more") else ""
         return [
             TextContent(
                 type="text",
-                text=f"Found {result['total_skus']} SKUs for {result['service_name']}:\n\n"
-                + json.dumps(skus, indent=2),
+                text=f"Found {result['total_skus']} SKUs for {result['service_name']}{more}:\n\n"
+                + codec.dumps(skus, indent=True),
             )
         ]
     else:
@@ -422,6 +516,112 @@ async def _handle_sku_discovery(pricing_server, arguments: dict) -> list[TextCon
         return [TextContent(type="text", text=response_text)]
 
 
+def _format_region_policy(policy: dict) -> str:
+    """Render the region constraints a ranking was limited to."""
+    text = f"\n🛡️ Region policy ({policy['source'] or 'configured'}):"
+    if policy["allowed_regions"] is not None:
+        text += f" allowed {', '.join(policy['allowed_regions'])}"
+    if policy["denied_regions"]:
+        text += f"{';' if policy['allowed_regions'] is not None else ''} denied {', '.join(policy['denied_regions'])}"
+    return text + "\n"
+
+
+async def _handle_workload_region_optimize(pricing_server, arguments: dict) -> list[TextContent]:
+    """Handle azure_workload_region_optimize tool calls."""
+    result = await pricing_server.optimize_workload_region(**arguments)
+
+    if "error" in result:
+        return [TextContent(type="text", text=f"Error: {result['error']}")]
+
+    resources = result["resources"]
+    response_text = f"""🌍 Workload Region Optimization ({len(resources)} resources)
+
+Currency: {result['currency']}
+Regions offering every resource: {result['complete_regions']} of {result['total_regions_found']}
+"""
+
+    if "discount_applied" in result:
+        response_text += f"\n💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
+
+    if "region_policy" in result:
+        response_text += _format_region_policy(result["region_policy"])
+
+    if result["unpriced_resources"]:
+        names = ", ".join(f"{r['sku_name']} ({r['service_name']})" for r in result["unpriced_resources"])
+        response_text += f"\n⚠️ No pricing found for: {names} (left out of the totals)\n"
+
+    if "summary" in result:
+        summary = result["summary"]
+        response_text += f"""
+📊 Summary:
+   🥇 Cheapest: {summary['cheapest_location']} ({summary['cheapest_region']}) - ${summary['cheapest_monthly_cost']:,.2f}/month
+   🥉 Most Expensive: {summary['most_expensive_location']} ({summary['most_expensive_region']}) - ${summary['most_expensive_monthly_cost']:,.2f}/month
+   💰 Max Savings: ${summary['max_monthly_savings']:,.2f}/month ({summary['max_savings_percentage']:.1f}%) by choosing the cheapest region
+"""
+
+        response_text += "\n📋 Ranked Regions (monthly On-Demand cost):\n\n"
+        response_text += "| Rank | Region | Location | Monthly Cost | Savings vs Max |\n"
+        response_text += "|------|--------|----------|--------------|----------------|\n"
+        for i, rec in enumerate(result["recommendations"], 1):
+            rank_display = {1: "🥇 1", 2: "🥈 2", 3: "🥉 3"}.get(i, str(i))
+            response_text += (
+                f"| {rank_display} | {rec['region']} | {rec['location']} | ${rec['monthly_cost']:,.2f} "
+                f"| {rec['savings_vs_most_expensive']:.1f}% |\n"
+            )
+
+        best = result["recommendations"][0] if result["recommendations"] else None
+        if best:
+            response_text += f"\n🧾 Breakdown for {best['location']} ({best['region']}):\n"
+            for resource, cost in zip(resources, best["line_costs"], strict=True):
+                response_text += (
+                    f"   • {resource['quantity']} x {resource['sku_name']} ({resource['service_name']}): "
+                    f"${cost:,.2f}/month\n"
+                )
+    else:
+        response_text += "\nNo single region offers every priced resource.\n"
+
+    partial = result["partial_regions"]
+    if partial:
+        response_text += f"\n🚫 Regions missing some resources ({len(partial)}):\n"
+        for row in partial[:5]:
+            response_text += f"   • {row['location']} ({row['region']}): missing {', '.join(row['missing'])}\n"
+
+    return [TextContent(type="text", text=response_text)]
+
+
+async def _handle_fulltext_search(pricing_server, arguments: dict) -> list[TextContent]:
+    """Handle azure_price_fulltext_search tool calls."""
+    result = await pricing_server.fulltext_search(**arguments)
+
+    if not result["items"]:
+        response_text = f"No known prices match '{result['query']}'."
+        if result["indexed_prices"] == 0:
+            response_text += " Nothing has been fetched yet; run azure_price_search or pass service_name first."
+        return [TextContent(type="text", text=response_text)]
+
+    formatted_items = [
+        {
+            "match_score": item["match_score"],
+            "service": item.get("serviceName"),
+            "product": item.get("productName"),
+            "meter": item.get("meterName"),
+            "sku": item.get("skuName"),
+            "region": item.get("armRegionName"),
+            "price": item.get("retailPrice"),
+            "unit": item.get("unitOfMeasure"),
+            "type": item.get("type"),
+        }
+        for item in result["items"]
+    ]
+    response_text = (
+        f"Top {result['count']} of {result['indexed_prices']} known prices for '{result['query']}' "
+        f"({result['search_ms']} ms):\n\n"
+    )
+    response_text += codec.dumps(formatted_items, indent=True)
+
+    return [TextContent(type="text", text=response_text)]
+
+
 async def _handle_customer_discount(pricing_server, arguments: dict) -> list[TextContent]:
     """Handle get_customer_discount tool calls."""
     result = await pricing_server.get_customer_discount(**arguments)
@@ -0,0 +1,179 @@
+"""Compact in-memory representation of Retail Prices API items."""
+
+import sys
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+# Fields of a Retail Prices API item (2023-01-01-preview), in the order the API returns them
+PRICE_ITEM_FIELDS = (
+    "currencyCode",
+    "tierMinimumUnits",
+    "reservationTerm",
+    "retailPrice",
+    "unitPrice",
+    "armRegionName",
+    "location",
+    "effectiveStartDate",
+    "effectiveEndDate",
+    "meterId",
+    "meterName",
+    "productId",
+    "skuId",
+    "productName",
+    "skuName",
+    "serviceName",
+    "serviceId",
+    "serviceFamily",
+    "unitOfMeasure",
+    "type",
+    "isPrimaryMeterRegion",
+    "armSkuName",
+    "savingsPlan",
+)
+# Projections: the item fields read by call paths that never return raw items.
+# Pages fetched for them are decoded and cached with only these fields.
+REGION_RANKING_FIELDS = frozenset(
+    {"armRegionName", "location", "retailPrice", "skuName", "productName", "unitOfMeasure", "meterName"}
+)
+SKU_LISTING_FIELDS = frozenset(
+    {"skuName", "armSkuName", "productName", "armRegionName", "retailPrice", "unitOfMeasure", "meterName"}
+)
+# What full-text search returns and needs to tell prices apart (see fulltext.py)
+FULLTEXT_FIELDS = frozenset(
+    {
+        "currencyCode",
+        "tierMinimumUnits",
+        "reservationTerm",
+        "retailPrice",
+        "armRegionName",
+        "meterId",
+        "meterName",
+        "skuId",
+        "productName",
+        "skuName",
+        "serviceName",
+        "unitOfMeasure",
+        "type",
+    }
+)
+
+# Fields whose values are unique to (nearly) every item; all other strings repeat across rows
+_UNSHARED_FIELDS = frozenset({"meterId", "retailPrice", "unitPrice", "tierMinimumUnits", "savingsPlan"})
+
+_FIELD_SET = frozenset(PRICE_ITEM_FIELDS)
+_ABSENT = object()
+
+
+class PriceItem(Mapping[str, Any]):
+    """
+    Read-only price item stored in slots instead of a per-item dict.
+
+    String values are interned, so a serviceName, location or unitOfMeasure
+    repeated across thousands of cached items is held once. Fields the API
+    adds later are kept in a small overflow dict. Behaves like the decoded
+    JSON dict for reading (`[]`, `get`, `in`, iteration, equality); call
+    to_dict() (or copy()) where a mutable dict or JSON output is needed.
+    """
+
+    __slots__ = (*PRICE_ITEM_FIELDS, "_extra")
+
+    _extra: dict[str, Any] | None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], fields: frozenset[str] | None = None) -> "PriceItem":
+        """Build a PriceItem from a decoded API item, keeping only `fields` if given."""
+        item = cls.__new__(cls)
+        extra: dict[str, Any] | None = None
+        for key, value in data.items():
+            if fields is not None and key not in fields:
+                continue
+            if isinstance(value, str):
+                value = sys.intern(value)
+            if key in _FIELD_SET:
+                setattr(item, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[sys.intern(key)] = value
+        item._extra = extra
+        return item
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key, default)
+        return self._extra.get(key, default) if self._extra else default
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _ABSENT) is not _ABSENT  # type: ignore[arg-type]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in PRICE_ITEM_FIELDS:
+            if getattr(self, name, _ABSENT) is not _ABSENT:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"PriceItem({self.to_dict()!r})"
+
+    def __sizeof__(self) -> int:
+        # Shared (interned) strings are not charged to each item
+        size = object.__sizeof__(self)
+        for name in _UNSHARED_FIELDS:
+            value = getattr(self, name, None)
+            if isinstance(value, list):
+                size += sys.getsizeof(value) + sum(
+                    sys.getsizeof(plan) + sum(sys.getsizeof(v) for v in plan.values()) for plan in value
+                )
+            elif value is not None:
+                size += sys.getsizeof(value)
+        if self._extra:
+            size += sys.getsizeof(self._extra) + sum(sys.getsizeof(v) for v in self._extra.values())
+        return size
+
+    def to_dict(self) -> dict[str, Any]:
+        """Plain dict copy of the item, as the API returned it."""
+        data = {name: self[name] for name in self}
+        if isinstance(data.get("savingsPlan"), list):
+            data["savingsPlan"] = [dict(plan) for plan in data["savingsPlan"]]
+        return data
+
+    copy = to_dict
+
+
+def compact_page(page: dict[str, Any], fields: frozenset[str] | None = None) -> dict[str, Any]:
+    """
+    Convert the Items of a decoded API page to PriceItems in place and return the page.
+
+    With `fields`, every item (PriceItems included) is cut down to those fields.
+    """
+    items = page.get("Items")
+    if items:
+        if fields is None:
+            page["Items"] = [item if isinstance(item, PriceItem) else PriceItem.from_dict(item) for item in items]
+        else:
+            page["Items"] = [PriceItem.from_dict(item, fields) for item in items]
+    return page
+
+
+def as_dict(item: Mapping[str, Any]) -> dict[str, Any]:
+    """A price item as a plain dict, for tool output."""
+    if isinstance(item, PriceItem):
+        return item.to_dict()
+    return item if isinstance(item, dict) else dict(item)
+
+
+def json_default(value: Any) -> Any:
+    """`default` hook letting json.dumps encode PriceItems."""
+    if isinstance(value, PriceItem):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
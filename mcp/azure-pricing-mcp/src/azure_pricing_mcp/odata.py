@@ -0,0 +1,287 @@
+"""
+Parsing and local evaluation of the OData $filter expressions built by AzurePricingServer.
+
+String comparisons ignore case, as the Retail Prices API's do: a filter on
+armRegionName eq 'WestEurope' matches items in "westeurope".
+
+Filter fields are resolved to the item keys they are stored under when
+parsed, so Term.field always names an item key: the API filters on
+priceType, but items carry that value as "type".
+"""
+
+import re
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+_TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<string>'(?:[^']|'')*')
+        |(?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+        |(?P<punct>[(),])
+        |(?P<word>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
+    re.VERBOSE,
+)
+
+COMPARISON_OPS = ("eq", "ne")
+FUNCTION_OPS = ("contains", "startswith")
+_KEYWORD_LITERALS = {"true": True, "false": False, "null": None}
+# Filter fields whose value items store under a different key
+ITEM_FIELDS = {"priceType": "type"}
+
+Predicate = Callable[[Mapping[str, Any]], bool]
+
+
+class ODataParseError(ValueError):
+    """Raised when a $filter uses syntax outside the supported subset."""
+
+
+def fold(value: Any) -> Any:
+    """Casefold strings for comparison; other values are compared as they are."""
+    return value.casefold() if isinstance(value, str) else value
+
+
+@dataclass(frozen=True)
+class Term:
+    """
+    A single comparison on one field.
+
+    `op` is one of eq, ne, contains, startswith or in; for `in` the value is a
+    tuple of candidates. `field` is the item key (see ITEM_FIELDS).
+    """
+
+    op: str
+    field: str
+    value: Any
+
+    def matches(self, item: Mapping[str, Any]) -> bool:
+        """Evaluate this term against a price item."""
+        actual = fold(item.get(self.field))
+        if self.op == "eq":
+            return bool(actual == fold(self.value))
+        if self.op == "ne":
+            return bool(actual != fold(self.value))
+        if self.op == "in":
+            return actual in {fold(value) for value in self.value}
+        if not isinstance(actual, str):
+            return False
+        if self.op == "contains":
+            return fold(self.value) in actual
+        return actual.startswith(fold(self.value))
+
+    def implies(self, other: "Term") -> bool:
+        """True if every item matching this term also matches `other` (eq and contains terms only)."""
+        if self.field != other.field or self.op not in ("eq", "contains"):
+            return False
+        if other.op == "eq":
+            return self.op == "eq" and fold(self.value) == fold(other.value)
+        if other.op != "contains":
+            return False
+        # other is contains(field, s): satisfied by any value that contains s
+        return fold(other.value) in fold(self.value)
+
+
+@dataclass(frozen=True)
+class BoolOp:
+    """Two or more sub-expressions joined by `and` or `or`."""
+
+    op: str
+    operands: tuple["Expr", ...]
+
+
+Expr = Term | BoolOp
+
+
+def _tokenize(text: str) -> list[tuple[str, str]]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ODataParseError(f"Unexpected character at position {pos} in filter: {text!r}")
+        kind = match.lastgroup
+        assert kind is not None
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _unquote(token: str) -> str:
+    return token[1:-1].replace("''", "'")
+
+
+class _Parser:
+    """Recursive-descent parser; `or` binds looser than `and`, parentheses group."""
+
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def peek(self) -> tuple[str, str] | None:
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def expect(self, kind: str, value: str | None = None) -> str:
+        token = self.peek()
+        if token is None or token[0] != kind or (value is not None and token[1] != value):
+            found = token[1] if token else "end of filter"
+            raise ODataParseError(f"Expected {value or kind}, found {found!r}")
+        self.i += 1
+        return token[1]
+
+    def parse(self) -> Expr:
+        expr = self.disjunction()
+        if self.peek() is not None:
+            raise ODataParseError(f"Unexpected {self.peek()[1]!r} in filter")  # type: ignore[index]
+        return expr
+
+    def disjunction(self) -> Expr:
+        operands = [self.conjunction()]
+        while self.peek() == ("word", "or"):
+            self.i += 1
+            operands.append(self.conjunction())
+        return operands[0] if len(operands) == 1 else BoolOp("or", tuple(operands))
+
+    def conjunction(self) -> Expr:
+        operands = [self.primary()]
+        while self.peek() == ("word", "and"):
+            self.i += 1
+            operands.append(self.primary())
+        return operands[0] if len(operands) == 1 else BoolOp("and", tuple(operands))
+
+    def primary(self) -> Expr:
+        token = self.peek()
+        if token == ("punct", "("):
+            self.i += 1
+            expr = self.disjunction()
+            self.expect("punct", ")")
+            return expr
+        if token is not None and token[0] == "word" and token[1] in FUNCTION_OPS:
+            self.i += 1
+            self.expect("punct", "(")
+            field = self.field()
+            self.expect("punct", ",")
+            value = _unquote(self.expect("string"))
+            self.expect("punct", ")")
+            return Term(token[1], field, value)
+
+        field = self.field()
+        op = self.expect("word")
+        if op == "in":
+            self.expect("punct", "(")
+            values = [self.literal()]
+            while self.peek() == ("punct", ","):
+                self.i += 1
+                values.append(self.literal())
+            self.expect("punct", ")")
+            return Term("in", field, tuple(values))
+        if op not in COMPARISON_OPS:
+            raise ODataParseError(f"Unsupported operator {op!r}")
+        return Term(op, field, self.literal())
+
+    def field(self) -> str:
+        name = self.expect("word")
+        return ITEM_FIELDS.get(name, name)
+
+    def literal(self) -> Any:
+        token = self.peek()
+        if token is None:
+            raise ODataParseError("Expected a value, found end of filter")
+        kind, text = token
+        self.i += 1
+        if kind == "string":
+            return _unquote(text)
+        if kind == "number":
+            return float(text) if "." in text else int(text)
+        if kind == "word" and text in _KEYWORD_LITERALS:
+            return _KEYWORD_LITERALS[text]
+        raise ODataParseError(f"Expected a value, found {text!r}")
+
+
+@lru_cache(maxsize=1024)
+def parse_filter(filter_text: str) -> Expr:
+    """
+    Parse a $filter in the supported subset into an expression tree.
+
+    Supports `eq`, `ne`, `in (...)`, `contains(...)`, `startswith(...)`,
+    `and`, `or` and parentheses over string, number and boolean literals.
+
+    Raises:
+        ODataParseError: If the filter uses any other syntax
+    """
+    return _Parser(filter_text).parse()
+
+
+@lru_cache(maxsize=1024)
+def parse_conjunction(filter_text: str) -> tuple[Term, ...]:
+    """
+    Parse a filter made of `eq` and `contains` terms joined by `and`.
+
+    Accepts the shapes search_azure_prices and discover_skus emit, e.g.
+    "serviceName eq 'Virtual Machines' and contains(skuName, 'D4s')".
+
+    Raises:
+        ODataParseError: If the filter uses any other syntax
+    """
+    expr = parse_filter(filter_text)
+    terms = expr.operands if isinstance(expr, BoolOp) and expr.op == "and" else (expr,)
+    if not all(isinstance(term, Term) and term.op in ("eq", "contains") for term in terms):
+        raise ODataParseError(f"Not a conjunction of eq/contains terms: {filter_text!r}")
+    return terms  # type: ignore[return-value]
+
+
+def _compile_term(term: Term) -> Predicate:
+    field = term.field
+    if term.op == "in":
+        candidates = frozenset(fold(value) for value in term.value)
+        return lambda item: fold(item.get(field)) in candidates
+    value = fold(term.value)
+    if term.op == "eq":
+        return lambda item: bool(fold(item.get(field)) == value)
+    if term.op == "ne":
+        return lambda item: bool(fold(item.get(field)) != value)
+    if term.op == "contains":
+        return lambda item: isinstance(actual := item.get(field), str) and value in actual.casefold()
+    return lambda item: isinstance(actual := item.get(field), str) and actual.casefold().startswith(value)
+
+
+def compile_expr(expr: Expr) -> Predicate:
+    """Turn an expression tree into a predicate over price items."""
+    if isinstance(expr, Term):
+        return _compile_term(expr)
+    predicates = tuple(compile_expr(operand) for operand in expr.operands)
+    if expr.op == "and":
+        if len(predicates) == 2:
+            first, second = predicates
+            return lambda item: first(item) and second(item)
+        return lambda item: all(predicate(item) for predicate in predicates)
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda item: first(item) or second(item)
+    return lambda item: any(predicate(item) for predicate in predicates)
+
+
+@lru_cache(maxsize=1024)
+def compile_filter(filter_text: str) -> Predicate:
+    """
+    Compile a $filter into a predicate, once per distinct filter string.
+
+    Raises:
+        ODataParseError: If the filter uses syntax outside the supported subset
+    """
+    return compile_expr(parse_filter(filter_text))
+
+
+def filter_items(items: list[dict[str, Any]], filter_text: str | None) -> list[dict[str, Any]]:
+    """Items matching a $filter, evaluated locally."""
+    if not filter_text:
+        return list(items)
+    predicate = compile_filter(filter_text)
+    return [item for item in items if predicate(item)]
+
+
+def conjunction_implies(query: tuple[Term, ...], cached: tuple[Term, ...]) -> bool:
+    """True if every item matching all `query` terms also matches all `cached` terms."""
+    return all(any(q.implies(c) for q in query) for c in cached)
@@ -0,0 +1,116 @@
+"""
+Fold many narrow price lookups into few Retail Prices API requests.
+
+Lookups that share every filter condition except the value of one field (for
+example the same service and SKU in different regions) are answered by one
+request whose filter ORs those values together. Values are chunked so each
+request URL stays within MAX_URL_LENGTH, and the merged result is split back
+out per value on the client.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import quote, urlencode
+
+# Conservative limit for the full request URL, including the base URL
+MAX_URL_LENGTH = 2000
+REGION_FIELD = "armRegionName"
+
+
+def quote_literal(value: str) -> str:
+    """Render a string as an OData literal, doubling embedded quotes."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def fold_filter(conditions: tuple[str, ...], field_name: str, values: list[str]) -> str:
+    """Build `conditions and (field eq 'a' or field eq 'b' ...)`."""
+    alternatives = " or ".join(f"{field_name} eq {quote_literal(value)}" for value in values)
+    if len(values) > 1:
+        alternatives = f"({alternatives})"
+    return " and ".join([*conditions, alternatives])
+
+
+@dataclass
+class FoldedQuery:
+    """One upstream request answering the lookups for several values of `field_name`."""
+
+    params: dict[str, Any]
+    conditions: tuple[str, ...]
+    field_name: str
+    values: list[str] = field(default_factory=list)
+
+    def demultiplex(self, items: Iterable[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+        """
+        Split the merged result set back out per requested value, preserving item order.
+
+        Values are matched case-insensitively, since the API accepts region names
+        in any case but returns them in lowercase.
+        """
+        by_value: dict[str, list[dict[str, Any]]] = {value: [] for value in self.values}
+        lookup = {value.casefold(): bucket for value, bucket in by_value.items()}
+        for item in items:
+            actual = item.get(self.field_name)
+            bucket = lookup.get(actual.casefold()) if isinstance(actual, str) else None
+            if bucket is not None:
+                bucket.append(item)
+        return by_value
+
+    def split(self) -> list["FoldedQuery"]:
+        """One query per value, for values the merged result may not have reached."""
+        base_params = {key: value for key, value in self.params.items() if key != "$filter"}
+        return [_make_query(base_params, self.conditions, self.field_name, [value]) for value in self.values]
+
+
+def _url_length(base_url: str, params: dict[str, Any]) -> int:
+    return len(base_url) + 1 + len(urlencode(params, quote_via=quote))
+
+
+def plan_folded_queries(
+    base_url: str,
+    base_params: dict[str, Any],
+    lookups: Iterable[tuple[tuple[str, ...], str]],
+    field_name: str = REGION_FIELD,
+    max_url_length: int = MAX_URL_LENGTH,
+) -> list[FoldedQuery]:
+    """
+    Group lookups into as few requests as fit within the URL length limit.
+
+    Args:
+        base_url: Endpoint the requests go to (counted towards the URL length)
+        base_params: Parameters shared by every request (api-version, currencyCode)
+        lookups: (filter conditions, value of `field_name`) pairs; duplicates are merged
+        field_name: The field whose values are ORed together
+        max_url_length: Upper bound for each request URL
+
+    Returns:
+        Queries in first-seen order of their conditions. A value too long to share
+        a request is still given a query of its own.
+    """
+    groups: dict[tuple[str, ...], list[str]] = {}
+    for conditions, value in lookups:
+        values = groups.setdefault(tuple(conditions), [])
+        if value not in values:
+            values.append(value)
+
+    queries: list[FoldedQuery] = []
+    for conditions, values in groups.items():
+        chunk: list[str] = []
+        for value in values:
+            candidate = [*chunk, value]
+            params = {**base_params, "$filter": fold_filter(conditions, field_name, candidate)}
+            if chunk and _url_length(base_url, params) > max_url_length:
+                queries.append(_make_query(base_params, conditions, field_name, chunk))
+                chunk = [value]
+            else:
+                chunk = candidate
+        if chunk:
+            queries.append(_make_query(base_params, conditions, field_name, chunk))
+    return queries
+
+
+def _make_query(
+    base_params: dict[str, Any], conditions: tuple[str, ...], field_name: str, values: list[str]
+) -> FoldedQuery:
+    params = {**base_params, "$filter": fold_filter(conditions, field_name, values)}
+    return FoldedQuery(params=params, conditions=conditions, field_name=field_name, values=values)
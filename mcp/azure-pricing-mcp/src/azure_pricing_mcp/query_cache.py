@@ -0,0 +1,116 @@
+"""Answer narrower price queries from cached, fully fetched broader result sets."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from .odata import BoolOp, ODataParseError, Term, compile_expr, conjunction_implies, parse_conjunction
+
+DEFAULT_QUERY_CACHE_TTL = 3600  # seconds, matches the response cache
+# Total items referenced by all cached result sets
+DEFAULT_QUERY_CACHE_MAX_ITEMS = 50_000
+# Larger result sets are not worth holding for subsumption
+MAX_RESULT_SET_ITEMS = 5_000
+
+# Query parameters that shape the result set rather than select rows
+_PAGING_PARAMS = {"$filter", "$top", "$skip"}
+
+Scope = tuple[tuple[str, str], ...]
+
+
+def split_query(params: dict[str, Any] | None) -> tuple[Scope, tuple[Term, ...]] | None:
+    """
+    Split query parameters into a scope (currency, API version, ...) and filter terms.
+
+    Returns None if the filter cannot be evaluated locally.
+    """
+    params = params or {}
+    scope = tuple(sorted((k, str(v)) for k, v in params.items() if k not in _PAGING_PARAMS))
+    filter_text = params.get("$filter")
+    if not filter_text:
+        return scope, ()
+    try:
+        return scope, parse_conjunction(filter_text)
+    except ODataParseError:
+        return None
+
+
+class _ResultSet:
+    __slots__ = ("items", "expires_at")
+
+    def __init__(self, items: list[dict[str, Any]], expires_at: float):
+        self.items = items
+        self.expires_at = expires_at
+
+
+class SubsumptionCache:
+    """
+    Complete result sets keyed by (scope, filter terms).
+
+    A later query in the same scope whose filter implies a cached filter (for
+    example, the same service and SKU plus an armRegionName term) is a subset
+    of that result set, so it is answered by filtering the cached items
+    locally instead of calling the API.
+    """
+
+    def __init__(
+        self,
+        max_items: int = DEFAULT_QUERY_CACHE_MAX_ITEMS,
+        ttl: float = DEFAULT_QUERY_CACHE_TTL,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._timer = timer
+        # Least recently used first
+        self._entries: OrderedDict[tuple[Scope, tuple[Term, ...]], _ResultSet] = OrderedDict()
+        self._total_items = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, scope: Scope, terms: tuple[Term, ...], items: list[dict[str, Any]]) -> None:
+        """Record the complete result set of a query."""
+        if len(items) > MAX_RESULT_SET_ITEMS:
+            return
+
+        key = (scope, terms)
+        if key in self._entries:
+            self._total_items -= len(self._entries.pop(key).items)
+        self._entries[key] = _ResultSet(items, self._timer() + self.ttl)
+        self._total_items += len(items)
+
+        while self._total_items > self.max_items and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_items -= len(evicted.items)
+
+    def lookup(self, scope: Scope, terms: tuple[Term, ...]) -> list[dict[str, Any]] | None:
+        """Return the items matching `terms` if a cached result set covers them, else None."""
+        now = self._timer()
+        for key in reversed(list(self._entries)):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self._total_items -= len(entry.items)
+                continue
+
+            cached_scope, cached_terms = key
+            if cached_scope == scope and conjunction_implies(terms, cached_terms):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if terms == cached_terms:
+                    return list(entry.items)
+                predicate = compile_expr(BoolOp("and", terms))
+                return [item for item in entry.items if predicate(item)]
+        return None
+
+    def clear(self) -> None:
+        """Remove every result set."""
+        self._entries.clear()
+        self._total_items = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and hit counters."""
+        return {"result_sets": len(self._entries), "items": self._total_items, "hits": self.hits}
@@ -0,0 +1,220 @@
+"""
+Region ranking: the cheapest regions for one SKU (recommend_regions) and for
+a workload of several SKUs priced together (optimize_workload_region).
+"""
+
+import heapq
+import re
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from typing import Any
+
+_UNIT_COUNT_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)")
+
+
+def pricing_type(item: Mapping[str, Any]) -> str:
+    """Pricing type of an item (Spot, Low Priority or On-Demand), read from its SKU and meter names."""
+    sku_name = item.get("skuName") or ""
+    meter_name = item.get("meterName") or ""
+    if "Spot" in sku_name or "Spot" in meter_name:
+        return "Spot"
+    if "Low Priority" in sku_name or "Low Priority" in meter_name:
+        return "Low Priority"
+    return "On-Demand"
+
+
+def monthly_units(unit_of_measure: str | None, hours_per_month: float) -> float:
+    """
+    Billed units per month for one resource priced per `unit_of_measure`.
+
+    Hourly and daily prices ("1 Hour", "100 Hours", "1/Day") scale with
+    hours_per_month; monthly prices count once. Usage-based units ("1 GB",
+    "10K") also count once, so a quantity of them is the monthly usage.
+    """
+    unit = (unit_of_measure or "").lower()
+    match = _UNIT_COUNT_RE.match(unit)
+    per = float(match.group(1)) if match and float(match.group(1)) > 0 else 1.0
+    if "hour" in unit:
+        return hours_per_month / per
+    if "day" in unit:
+        return hours_per_month / 24 / per
+    return 1.0
+
+
+class RegionRanking:
+    """
+    Cheapest on-demand and Spot/Low Priority price per region.
+
+    Items are folded in one at a time, so only one entry per region is ever
+    held however many pages the discovery query spans. Ranking then selects
+    the top N with a heap and the most expensive region (the savings baseline)
+    with one linear scan, and builds output rows for the top N only.
+    """
+
+    def __init__(self, permits: Callable[[str], bool] | None = None) -> None:
+        """
+        Args:
+            permits: Region filter (e.g. RegionPolicy.permits); items in other regions are not ranked
+        """
+        # region -> (price, item); insertion order breaks price ties like a stable sort would
+        self._on_demand: dict[str, tuple[float, Mapping[str, Any]]] = {}
+        self._spot: dict[str, tuple[float, Mapping[str, Any]]] = {}
+        self._permits = permits
+        self.items_seen = 0
+        self.items_excluded = 0
+
+    def __len__(self) -> int:
+        """Number of regions with an on-demand price."""
+        return len(self._on_demand)
+
+    def add(self, item: Mapping[str, Any]) -> None:
+        """Fold one price item in; items without a region or a positive price (preview/unavailable) are ignored."""
+        self.items_seen += 1
+        region = item.get("armRegionName")
+        price = item.get("retailPrice", 0)
+        if not region or not price or price <= 0:
+            return
+        if self._permits is not None and not self._permits(region):
+            self.items_excluded += 1
+            return
+        best = self._on_demand if pricing_type(item) == "On-Demand" else self._spot
+        current = best.get(region)
+        if current is None or price < current[0]:
+            best[region] = (price, item)
+
+    def add_items(self, items: Iterable[Mapping[str, Any]]) -> None:
+        """Fold in several price items."""
+        for item in items:
+            self.add(item)
+
+    def on_demand(self) -> dict[str, tuple[float, Mapping[str, Any]]]:
+        """Cheapest on-demand (price, item) per region."""
+        return dict(self._on_demand)
+
+    def rank(self, top_n: int, discount_percentage: float | None = None) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """
+        The top_n cheapest regions, cheapest first, and a summary of the whole ranking.
+
+        A discount scales every price alike, so it is applied to the selected
+        rows only and leaves the order unchanged.
+
+        Returns:
+            Tuple of (recommendations, summary); the summary is empty if no region has an on-demand price
+        """
+        if not self._on_demand:
+            return [], {}
+        factor = 1 - discount_percentage / 100 if discount_percentage is not None and discount_percentage > 0 else None
+
+        entries = list(self._on_demand.items())
+        top = heapq.nsmallest(max(top_n, 0), entries, key=lambda entry: entry[1][0])
+        # The last of several equally expensive regions, as it would be after a stable sort
+        most_expensive = max(reversed(entries), key=lambda entry: entry[1][0])
+        cheapest = top[0] if top else min(entries, key=lambda entry: entry[1][0])
+
+        max_price = self._price(most_expensive[1][0], factor)
+        recommendations = [self._row(region, price, item, factor, max_price) for region, (price, item) in top]
+        summary = {
+            "cheapest_region": cheapest[0],
+            "cheapest_location": cheapest[1][1].get("location", cheapest[0]),
+            "cheapest_price": self._price(cheapest[1][0], factor),
+            "most_expensive_region": most_expensive[0],
+            "most_expensive_location": most_expensive[1][1].get("location", most_expensive[0]),
+            "most_expensive_price": max_price,
+            "max_savings_percentage": self._savings(self._price(cheapest[1][0], factor), max_price),
+        }
+        return recommendations, summary
+
+    @staticmethod
+    def _price(price: float, factor: float | None) -> float:
+        return round(price * factor, 6) if factor is not None else price
+
+    @staticmethod
+    def _savings(price: float, max_price: float) -> float:
+        return round((max_price - price) / max_price * 100, 2) if max_price > 0 else 0.0
+
+    def _row(
+        self, region: str, price: float, item: Mapping[str, Any], factor: float | None, max_price: float
+    ) -> dict[str, Any]:
+        row: dict[str, Any] = {
+            "region": region,
+            "location": item.get("location", region),
+            "retail_price": self._price(price, factor),
+            "sku_name": item.get("skuName"),
+            "product_name": item.get("productName"),
+            "unit_of_measure": item.get("unitOfMeasure"),
+            "meter_name": item.get("meterName"),
+            "pricing_type": "On-Demand",
+        }
+        spot = self._spot.get(region)
+        if spot is not None:
+            row["spot_price"] = spot[0]
+            row["spot_sku_name"] = spot[1].get("skuName")
+        if factor is not None:
+            row["original_price"] = price
+        row["savings_vs_most_expensive"] = self._savings(row["retail_price"], max_price)
+        return row
+
+
+def rank_workload(
+    line_costs: Sequence[Mapping[str, float]], top_n: int, discount_percentage: float | None = None
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, Any]]:
+    """
+    Rank regions by the total monthly cost of a workload.
+
+    `line_costs` holds one {region: monthly cost} mapping per workload line,
+    i.e. the rows of a line x region cost matrix with holes where a SKU is not
+    offered. Regions offering every line are ranked by their column total;
+    the others are returned separately with the indexes of the lines they lack.
+
+    Returns:
+        Tuple of (recommendations, partial_regions, summary): the top_n complete
+        regions cheapest first, the incomplete regions (fewest lines missing,
+        then cheapest first) and a summary that is empty if no region is complete
+    """
+    factor = 1 - discount_percentage / 100 if discount_percentage is not None and discount_percentage > 0 else 1.0
+    regions = list(dict.fromkeys(region for costs in line_costs for region in costs))
+
+    complete: list[tuple[float, str, list[float]]] = []
+    partial: list[dict[str, Any]] = []
+    for region in regions:
+        column = [costs.get(region) for costs in line_costs]
+        available = [cost * factor for cost in column if cost is not None]
+        if len(available) == len(column):
+            complete.append((sum(available), region, available))
+        else:
+            partial.append(
+                {
+                    "region": region,
+                    "monthly_cost_available": round(sum(available), 2),
+                    "missing_lines": [i for i, cost in enumerate(column) if cost is None],
+                }
+            )
+    partial.sort(key=lambda row: (len(row["missing_lines"]), row["monthly_cost_available"]))
+    if not complete:
+        return [], partial, {}
+
+    top = heapq.nsmallest(max(top_n, 0), complete, key=lambda entry: entry[0])
+    cheapest = top[0] if top else min(complete, key=lambda entry: entry[0])
+    most_expensive = max(reversed(complete), key=lambda entry: entry[0])
+    max_total = most_expensive[0]
+
+    def savings(total: float) -> float:
+        return round((max_total - total) / max_total * 100, 2) if max_total > 0 else 0.0
+
+    recommendations = [
+        {
+            "region": region,
+            "monthly_cost": round(total, 2),
+            "line_costs": [round(cost, 2) for cost in column],
+            "savings_vs_most_expensive": savings(total),
+        }
+        for total, region, column in top
+    ]
+    summary = {
+        "cheapest_region": cheapest[1],
+        "cheapest_monthly_cost": round(cheapest[0], 2),
+        "most_expensive_region": most_expensive[1],
+        "most_expensive_monthly_cost": round(max_total, 2),
+        "max_monthly_savings": round(max_total - cheapest[0], 2),
+        "max_savings_percentage": savings(cheapest[0]),
+    }
+    return recommendations, partial, summary
@@ -0,0 +1,190 @@
+"""Process-wide adaptive rate limiting for the Azure Retail Prices API."""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+# Token bucket defaults (requests per second)
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 10
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_MAX_RATE = 20.0
+
+# AIMD tuning: add this much rate per successful request, multiply by this factor on a 429
+DEFAULT_INCREASE_STEP = 0.1
+DEFAULT_DECREASE_FACTOR = 0.5
+
+# Backoff used when a 429 carries no Retry-After header
+DEFAULT_BASE_BACKOFF = 5.0  # seconds
+MAX_BACKOFF = 60.0  # seconds
+
+# Fraction of each wait added as random jitter so waiters do not wake in lockstep
+DEFAULT_JITTER = 0.2
+
+
+def parse_retry_after(value: Any) -> float | None:
+    """
+    Parse a Retry-After header value into seconds.
+
+    Supports both forms allowed by RFC 9110: delay-seconds ("120") and an
+    HTTP-date ("Wed, 21 Oct 2015 07:28:00 GMT"). Returns None if the value
+    is missing or malformed.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every request to the pricing API.
+
+    The refill rate follows AIMD: each successful response adds a small
+    constant to the rate, each 429 halves it. A 429 also pauses the whole
+    bucket until its Retry-After (or an exponential backoff) has elapsed,
+    so concurrent callers back off together instead of retrying into the
+    same quota.
+
+    State changes never await, so one limiter can safely be shared across
+    tasks and event loops.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        increase_step: float = DEFAULT_INCREASE_STEP,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+        base_backoff: float = DEFAULT_BASE_BACKOFF,
+        jitter: float = DEFAULT_JITTER,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.base_backoff = base_backoff
+        self.jitter = jitter
+        self._clock = clock
+
+        self._rate = min(max(rate, min_rate), max_rate)
+        self._tokens = float(burst)
+        self._last_refill = clock()
+        self._paused_until = 0.0
+        self._consecutive_rate_limits = 0
+        self._waiting = 0
+
+        self._rate_limited_responses = 0
+        self._throttled_acquires = 0
+
+    @property
+    def rate(self) -> float:
+        """Current refill rate in requests per second."""
+        return self._rate
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for a token."""
+        return self._waiting
+
+    def _refill(self, now: float) -> None:
+        # Nothing accrues during a pause, so callers cannot resume in a burst
+        elapsed = max(0.0, now - max(self._last_refill, self._paused_until))
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+    def _try_acquire(self) -> float:
+        """Take a token if one is available; otherwise return seconds to wait."""
+        now = self._clock()
+        self._refill(now)
+
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        wait = self._try_acquire()
+        if wait <= 0:
+            return
+
+        self._throttled_acquires += 1
+        self._waiting += 1
+        try:
+            while wait > 0:
+                await asyncio.sleep(wait * (1 + self.jitter * random.random()))  # nosec B311 - jitter only
+                wait = self._try_acquire()
+        finally:
+            self._waiting -= 1
+
+    def on_success(self) -> None:
+        """Record a successful response (additive increase)."""
+        self._consecutive_rate_limits = 0
+        self._rate = min(self.max_rate, self._rate + self.increase_step)
+
+    def on_rate_limited(self, retry_after: float | None = None) -> float:
+        """
+        Record a 429 response (multiplicative decrease) and pause the bucket.
+
+        Args:
+            retry_after: Seconds from the Retry-After header, if present
+
+        Returns:
+            The number of seconds the bucket is paused for
+        """
+        now = self._clock()
+        self._rate_limited_responses += 1
+        self._consecutive_rate_limits += 1
+
+        # A burst of 429s from requests sent before the first one came back
+        # should only count as one congestion signal
+        if now >= self._paused_until:
+            self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+
+        if retry_after is None:
+            retry_after = min(MAX_BACKOFF, self.base_backoff * 2 ** (self._consecutive_rate_limits - 1))
+
+        self._paused_until = max(self._paused_until, now + retry_after)
+        # Drop any saved-up burst: one request may go when the pause ends,
+        # the rest are paced by the reduced rate
+        self._refill(now)
+        self._tokens = min(self._tokens, 1.0)
+
+        logger.warning(f"Rate limited (429). Pausing requests for {retry_after:.1f}s, rate now {self._rate:.2f} req/s")
+        return retry_after
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the limiter state."""
+        return {
+            "rate_per_second": round(self._rate, 3),
+            "queue_depth": self._waiting,
+            "paused_for_seconds": round(max(0.0, self._paused_until - self._clock()), 3),
+            "rate_limited_responses": self._rate_limited_responses,
+            "throttled_acquires": self._throttled_acquires,
+        }
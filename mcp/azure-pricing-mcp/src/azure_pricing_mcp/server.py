@@ -7,17 +7,36 @@ A Model Context Protocol server that provides tools for querying Azure retail pr
 
 import asyncio
 import hashlib
-import json
 import logging
+import os
 import sys
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping
+from contextlib import aclosing
+from functools import partial
 from typing import Any
 
 import aiohttp
-from cachetools import TTLCache
 from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool
 
+from . import bicep, codec
+from .batcher import DEFAULT_BATCH_MAX_SIZE, MicroBatcher
+from .cache import DEFAULT_CACHE_MAX_BYTES, ResponseCache
+from .catalog import PriceCatalog
+from .disk_cache import DiskCache
+from .fulltext import DEFAULT_FULLTEXT_MAX_BYTES, FullTextIndex
+from .governance import RegionPolicy, load_region_policy
+from .models import REGION_RANKING_FIELDS, SKU_LISTING_FIELDS, PriceItem, as_dict, compact_page
+from .planner import FoldedQuery, plan_folded_queries, quote_literal
+from .query_cache import MAX_RESULT_SET_ITEMS, SubsumptionCache, split_query
+from .ranking import RegionRanking, monthly_units, pricing_type, rank_workload
+from .rate_limit import AdaptiveRateLimiter, parse_retry_after
+from .service_registry import ServiceRegistry
+from .sku_index import SkuIndex
+from .streaming import ItemStreamParser
+
 # Configure logging - redirect to stderr to avoid corrupting JSON-RPC on stdout
 # For stdio transport, all logging MUST go to stderr, not stdout
 logging.basicConfig(
@@ -31,12 +50,26 @@ logger = logging.getLogger("azure_pricing_mcp")
 AZURE_PRICING_BASE_URL = "https://prices.azure.com/api/retail/prices"
 DEFAULT_API_VERSION = "2023-01-01-preview"
 MAX_RESULTS_PER_REQUEST = 1000
+MAX_PAGES_PER_QUERY = 20  # Upper bound on NextPageLink hops for a single query
+REGION_DISCOVERY_LIMIT = 5000  # Items scanned by recommend_regions to discover regions
+REGION_FANOUT_CONCURRENCY = 8  # Regions compare_prices looks up at once
+ESTIMATE_FANOUT_CONCURRENCY = 8  # Folded lookups a batch cost estimate runs at once
+SUGGESTION_FANOUT_CONCURRENCY = 4  # Candidate services probed at once when suggesting alternatives
+WORKLOAD_FANOUT_CONCURRENCY = 4  # Workload SKUs priced across regions at once
+SIMILAR_SERVICE_SUGGESTIONS = 5  # Stop probing candidate services once this many matched
 
 # Retry and rate limiting configuration
 MAX_RETRIES = 3
-RATE_LIMIT_RETRY_BASE_WAIT = 5  # seconds
+RATE_LIMIT_RETRY_BASE_WAIT = 5  # seconds, backoff when a 429 carries no Retry-After
 DEFAULT_CUSTOMER_DISCOUNT = 0.0  # percent (disabled by default)
 
+# Most recently used disk cache entries loaded into memory at startup
+DISK_CACHE_WARM_ENTRIES = 500
+SERVICE_REFRESH_PAGES = 3  # Pages sampled per service family by a registry refresh
+SERVICE_RESOLVE_MIN_SCORE = 0.6  # Registry matches below this fall back to probing searches
+FULLTEXT_WARM_PAGES = 3  # Pages fetched to index a service full-text search has not seen yet
+STREAM_CHUNK_BYTES = 64 * 1024  # Response body read size when pages are parsed as they stream in
+
 # Common service name mappings for fuzzy search
 # Maps user-friendly terms to official Azure service names
 SERVICE_NAME_MAPPINGS = {
@@ -150,8 +183,37 @@ class AzurePricingServer:
 
     _session: aiohttp.ClientSession | None = None
     _session_lock: asyncio.Lock | None = None
-    # Cache responses for 1 hour (3600 seconds), max 100 entries
-    _cache: TTLCache = TTLCache(maxsize=100, ttl=3600)
+    # Cache responses for 1 hour (3600 seconds), bounded by estimated memory (see configure_memory_cache)
+    _cache: ResponseCache = ResponseCache(max_bytes=DEFAULT_CACHE_MAX_BYTES, ttl=3600, restore=compact_page)
+    # Upstream requests currently in flight, keyed like the cache (single-flight)
+    _inflight: dict[str, asyncio.Future] = {}
+    # Number of callers that awaited an in-flight request instead of issuing their own
+    _coalesced_requests: int = 0
+    # Number of pages parsed incrementally as their body streamed in (see iter_streamed_items)
+    _streamed_pages: int = 0
+    # Token bucket shared by every instance so all tools see the same upstream quota
+    _rate_limiter: AdaptiveRateLimiter = AdaptiveRateLimiter(base_backoff=RATE_LIMIT_RETRY_BASE_WAIT)
+    # Fully fetched result sets used to answer narrower queries without a request
+    _query_cache: SubsumptionCache = SubsumptionCache()
+    # Optional persistent L2 cache behind _cache (see configure_disk_cache)
+    _disk_cache: DiskCache | None = None
+    # Optional offline price catalog that answers queries locally (see configure_catalog)
+    _catalog: PriceCatalog | None = None
+    # Optional window merging concurrent first-page requests (see configure_batching)
+    _batcher: MicroBatcher | None = None
+    # SKU names seen per service, used for SKU suggestions without an extra request
+    _sku_index: SkuIndex = SkuIndex()
+    # Service, family and product names seen in price data, used to resolve service hints
+    _service_registry: ServiceRegistry = ServiceRegistry(aliases=SERVICE_NAME_MAPPINGS)
+    _registry_refresh_task: asyncio.Task | None = None
+    # Product, meter and SKU names of every price seen, for free-text search
+    _fulltext_index: FullTextIndex = FullTextIndex()
+    # Parsed Bicep files, reused while unchanged
+    _bicep_scanner: bicep.BicepScanner = bicep.BicepScanner()
+    # Default region constraints for region recommendations (see configure_region_policy)
+    _region_policy: RegionPolicy | None = None
+    # Directory tool calls may read files under; None means the working directory (see configure_workspace_root)
+    _workspace_root: str | None = None
 
     def __init__(self):
         if AzurePricingServer._session_lock is None:
@@ -189,54 +251,369 @@ class AzurePricingServer:
             await AzurePricingServer._session.close()
             AzurePricingServer._session = None
 
-    def _cache_key(self, url: str, params: dict[str, Any] | None) -> str:
-        """Generate cache key from URL and parameters."""
-        params_str = json.dumps(params or {}, sort_keys=True)
-        return hashlib.md5(f"{url}{params_str}".encode()).hexdigest()
+    @staticmethod
+    def configure_memory_cache(max_bytes: int = DEFAULT_CACHE_MAX_BYTES, compress: bool = True) -> ResponseCache:
+        """
+        Replace the in-memory response cache with one using the given memory budget.
+
+        Args:
+            max_bytes: Estimated bytes the cache may hold
+            compress: Keep entries outside the hot window as compressed JSON
+        """
+        AzurePricingServer._cache = ResponseCache(
+            max_bytes=max_bytes, ttl=AzurePricingServer._cache.ttl, compress=compress, restore=compact_page
+        )
+        logger.info(f"In-memory cache budget set to {max_bytes / (1024 * 1024):.0f} MB")
+        return AzurePricingServer._cache
+
+    @staticmethod
+    def configure_fulltext_index(max_bytes: int = DEFAULT_FULLTEXT_MAX_BYTES) -> FullTextIndex:
+        """
+        Replace the full-text index with an empty one using the given memory budget.
+
+        Args:
+            max_bytes: Estimated bytes the indexed documents and postings may hold
+        """
+        index = FullTextIndex(max_bytes=max_bytes)
+        if AzurePricingServer._catalog is not None:
+            index.add_catalog(AzurePricingServer._catalog)
+        AzurePricingServer._fulltext_index = index
+        logger.info(f"Full-text index budget set to {max_bytes / (1024 * 1024):.0f} MB")
+        return index
+
+    @staticmethod
+    def configure_disk_cache(path: str | None, **kwargs: Any) -> DiskCache | None:
+        """
+        Enable (or with path=None, disable) the persistent SQLite response cache.
+
+        Unexpired entries are loaded into the in-memory cache straight away so a
+        restarted server answers repeat queries without going upstream.
+
+        Args:
+            path: Database file path
+            **kwargs: Passed to DiskCache (ttl, max_bytes)
+        """
+        if AzurePricingServer._disk_cache is not None:
+            AzurePricingServer._disk_cache.close()
+            AzurePricingServer._disk_cache = None
+
+        if not path:
+            return None
+
+        disk_cache = DiskCache(path, **kwargs)
+        AzurePricingServer._disk_cache = disk_cache
+
+        warmed = 0
+        # Oldest first so the most recently used entries end up freshest in the LRU
+        for key, value in reversed(disk_cache.load_recent(DISK_CACHE_WARM_ENTRIES)):
+            AzurePricingServer._cache[key] = compact_page(value)
+            # Projected pages lack fields the local indexes need, as in iter_price_pages
+            if "|" not in key:
+                AzurePricingServer._observe_items(value.get("Items", []))
+            warmed += 1
+        logger.info(f"Disk cache enabled at {path} ({warmed} entries loaded)")
+        return disk_cache
+
+    @staticmethod
+    def configure_workspace_root(path: str | None) -> str:
+        """
+        Set (or with path=None, reset to the working directory) the directory tools may read files under.
+
+        Paths in tool arguments (Bicep templates, governance constraints
+        files) are resolved against it and rejected if they lead outside it,
+        since with the HTTP transport they come from remote clients.
+        """
+        AzurePricingServer._workspace_root = os.path.realpath(path) if path else None
+        return AzurePricingServer._workspace_path(".")
+
+    @staticmethod
+    def _workspace_path(path: str) -> str:
+        """
+        Resolve a path from a tool call against the workspace root.
+
+        Raises:
+            ValueError: If the path lies outside the workspace root
+        """
+        root = AzurePricingServer._workspace_root or os.getcwd()
+        resolved = os.path.normpath(os.path.join(root, path))
+        if not bicep.is_within(root, resolved):
+            raise ValueError(f"{path} is outside the workspace root {root}")
+        return resolved
+
+    @staticmethod
+    def configure_region_policy(path: str | None) -> RegionPolicy | None:
+        """
+        Load (or with path=None, clear) the default region constraints.
+
+        Region recommendations and workload optimization then only fetch and
+        rank regions the governance constraints file permits, unless a call
+        names a constraints file of its own.
+        """
+        if not path:
+            AzurePricingServer._region_policy = None
+            return None
+
+        policy = load_region_policy(path)
+        AzurePricingServer._region_policy = policy
+        if policy.restricted:
+            logger.info(f"Region policy loaded from {path}: {policy.describe()}")
+        else:
+            logger.warning(f"Region policy {path} has no allowed or denied regions; every region is permitted")
+        return policy
+
+    @staticmethod
+    def _policy_for(constraints_file: str | None) -> RegionPolicy | None:
+        """
+        The region policy a call applies: its own constraints file, or the configured default.
+
+        Raises:
+            OSError: If the constraints file cannot be read
+            ValueError: If it lies outside the workspace root or is not valid JSON
+        """
+        if constraints_file:
+            return load_region_policy(AzurePricingServer._workspace_path(constraints_file))
+        return AzurePricingServer._region_policy
+
+    @staticmethod
+    def configure_catalog(path: str | None) -> PriceCatalog | None:
+        """
+        Load (or with path=None, unload) the offline price catalog.
+
+        While loaded, queries the catalog covers (same currency and, for a scoped
+        sync, one of the synced services) are answered without calling the API.
+        """
+        if not path:
+            AzurePricingServer._catalog = None
+            return None
+
+        catalog = PriceCatalog.load(path)
+        AzurePricingServer._catalog = catalog
+        AzurePricingServer._sku_index.add_catalog(catalog)
+        AzurePricingServer._service_registry.add_catalog(catalog)
+        AzurePricingServer._fulltext_index.add_catalog(catalog)
+        stats = catalog.stats()
+        logger.info(f"Offline catalog loaded from {path}: {stats['rows']} prices, synced {stats['synced_at']}")
+        return catalog
+
+    @staticmethod
+    def configure_batching(window_ms: float, max_batch_size: int = DEFAULT_BATCH_MAX_SIZE) -> MicroBatcher | None:
+        """
+        Enable (or with window_ms=0, disable) micro-batching of concurrent lookups.
+
+        First-page requests with the same API version and currency that arrive
+        within `window_ms` of each other are merged into one upstream query.
+        Every request waits up to the window, so this only pays off when many
+        sessions query at once (HTTP/SSE transport).
+        """
+        if window_ms <= 0:
+            AzurePricingServer._batcher = None
+            return None
+
+        batcher = MicroBatcher(
+            lambda url, params: AzurePricingServer()._fetch(url, params, None),
+            AZURE_PRICING_BASE_URL,
+            window=window_ms / 1000,
+            max_batch_size=max_batch_size,
+        )
+        AzurePricingServer._batcher = batcher
+        logger.info(f"Micro-batching enabled: {window_ms:g} ms window, up to {max_batch_size} requests per batch")
+        return batcher
+
+    @staticmethod
+    def get_request_stats() -> dict[str, Any]:
+        """Return counters describing upstream request traffic."""
+        return {
+            "coalesced_requests": AzurePricingServer._coalesced_requests,
+            "in_flight_requests": len(AzurePricingServer._inflight),
+            "streamed_pages": AzurePricingServer._streamed_pages,
+            "memory_cache": AzurePricingServer._cache.stats(),
+            "query_cache": AzurePricingServer._query_cache.stats(),
+            "rate_limiter": AzurePricingServer._rate_limiter.stats(),
+            "disk_cache": AzurePricingServer._disk_cache.stats() if AzurePricingServer._disk_cache else None,
+            "micro_batcher": AzurePricingServer._batcher.stats() if AzurePricingServer._batcher else None,
+            "sku_index": AzurePricingServer._sku_index.stats(),
+            "service_registry": AzurePricingServer._service_registry.stats(),
+            "fulltext_index": AzurePricingServer._fulltext_index.stats(),
+            "bicep_scanner": AzurePricingServer._bicep_scanner.stats(),
+            "json_codec": codec.backend(),
+        }
+
+    @staticmethod
+    def _observe_items(items: list[dict[str, Any]]) -> None:
+        """Feed fetched price items to the local SKU index, service registry and full-text index."""
+        AzurePricingServer._sku_index.add_items(items)
+        AzurePricingServer._service_registry.add_items(items)
+        AzurePricingServer._fulltext_index.add_items(items)
+
+    async def refresh_service_registry(self, currency_code: str = "USD") -> int:
+        """
+        Sample the first pages of every service family so the registry learns their services.
+
+        Pages go through the normal request path (caches, rate limiter), which
+        feeds the registry. A family that fails is logged and skipped.
+
+        Returns:
+            Number of services known afterwards
+        """
+        registry = AzurePricingServer._service_registry
+        for family in registry.families():
+            params = {
+                "api-version": DEFAULT_API_VERSION,
+                "currencyCode": currency_code,
+                "$filter": f"serviceFamily eq '{family}'",
+            }
+            try:
+                async with aclosing(self.iter_price_pages(params, max_pages=SERVICE_REFRESH_PAGES)) as pages:
+                    async for _ in pages:
+                        pass
+            except Exception as e:
+                logger.warning(f"Service registry refresh failed for family {family}: {e}")
+        logger.info(f"Service registry refreshed: {len(registry)} services known")
+        return len(registry)
+
+    @staticmethod
+    def start_service_registry_refresh(interval: float) -> asyncio.Task:
+        """Refresh the service registry now and then every `interval` seconds in a background task."""
+
+        async def refresh_forever() -> None:
+            while True:
+                await AzurePricingServer().refresh_service_registry()
+                await asyncio.sleep(interval)
+
+        if AzurePricingServer._registry_refresh_task is not None:
+            AzurePricingServer._registry_refresh_task.cancel()
+        AzurePricingServer._registry_refresh_task = asyncio.create_task(refresh_forever())
+        return AzurePricingServer._registry_refresh_task
+
+    def _cache_key(self, url: str, params: dict[str, Any] | None, fields: frozenset[str] | None = None) -> str:
+        """Generate cache key from URL, parameters and item projection (readable after the "|")."""
+        key = hashlib.md5(f"{url}{codec.dumps(params or {}, sort_keys=True)}".encode()).hexdigest()
+        if fields is not None:
+            key += "|" + ",".join(sorted(fields))
+        return key
 
     async def _make_request(
-        self, url: str, params: dict[str, Any] | None = None, max_retries: int = MAX_RETRIES
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        max_retries: int = MAX_RETRIES,
+        fields: frozenset[str] | None = None,
     ) -> dict[str, Any]:
-        """Make HTTP request to Azure Pricing API with caching and retry logic."""
+        """
+        Make HTTP request to Azure Pricing API with caching, request coalescing and retry logic.
+
+        With `fields`, items are decoded and cached with only those fields, under
+        a key of their own; a cached full copy of the page is projected instead.
+        """
         # Check cache first
-        cache_key = self._cache_key(url, params)
-        if cache_key in AzurePricingServer._cache:
+        cache_key = self._cache_key(url, params, fields)
+        cached = AzurePricingServer._cache.get(cache_key)
+        if cached is not None:
             logger.debug(f"Cache hit for {url}")
-            return AzurePricingServer._cache[cache_key]
+            return cached
+        if fields is not None:
+            full = AzurePricingServer._cache.get(self._cache_key(url, params))
+            if full is not None:
+                logger.debug(f"Cache hit for {url} (projected)")
+                return compact_page(dict(full), fields)
+
+        # Join an identical request that is already in flight
+        task = AzurePricingServer._inflight.get(cache_key)
+        if task is not None:
+            AzurePricingServer._coalesced_requests += 1
+            logger.debug(f"Coalesced request for {url}")
+        else:
+            task = asyncio.ensure_future(self._fetch(url, params, cache_key, max_retries, fields))
+            AzurePricingServer._inflight[cache_key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(cache_key, t))
+
+        # Shield so one caller being cancelled does not cancel the shared request
+        page: dict[str, Any] | None = await asyncio.shield(task)
+        if page is None:
+            # A streamed read of this page (see _stream_page) was abandoned before the end
+            return await self._make_request(url, params, max_retries, fields)
+        return page
+
+    @staticmethod
+    def _finish_inflight(cache_key: str, task: asyncio.Future) -> None:
+        """Drop a completed request from the in-flight table."""
+        if AzurePricingServer._inflight.get(cache_key) is task:
+            del AzurePricingServer._inflight[cache_key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def fetch_uncached(self, url: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Fetch a page straight from the API without reading or filling any cache (used for bulk downloads)."""
+        return await self._fetch(url, params, None)
+
+    async def _fetch(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        cache_key: str | None,
+        max_retries: int = MAX_RETRIES,
+        fields: frozenset[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Fetch a URL from the disk cache or the Azure Pricing API (retrying on rate limits) and cache the result.
+
+        A cache_key of None skips every cache. With `fields`, only those item
+        fields are kept (see _make_request).
+        """
+        disk_cache = AzurePricingServer._disk_cache
+        if cache_key is not None and disk_cache is not None:
+            cached = await self._load_from_disk(disk_cache, cache_key)
+            if cached is not None:
+                logger.debug(f"Disk cache hit for {url}")
+                AzurePricingServer._cache[cache_key] = cached
+                return cached
+
+        # Share one upstream query with concurrent lookups if batching is on
+        batcher = AzurePricingServer._batcher
+        if cache_key is not None and batcher is not None and url == AZURE_PRICING_BASE_URL and params:
+            page = await batcher.submit(params)
+            if page is not None:
+                page = compact_page(page, fields)
+                AzurePricingServer._cache[cache_key] = page
+                if disk_cache is not None:
+                    await self._store_on_disk(disk_cache, cache_key, page)
+                return page
 
         session = await self.get_session()
         last_exception = None
 
+        limiter = AzurePricingServer._rate_limiter
+
         for attempt in range(max_retries + 1):  # 0, 1, 2, 3 (4 total attempts)
+            # Wait for the shared token bucket (and any Retry-After pause) before each attempt
+            await limiter.acquire()
             try:
                 async with session.get(url, params=params) as response:
                     if response.status == 429:  # Too Many Requests
+                        # The limiter logs the pause
+                        limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
                         if attempt < max_retries:
-                            wait_time = RATE_LIMIT_RETRY_BASE_WAIT * \
-                                (attempt + 1)  # 5, 10, 15 seconds
-                            logger.warning(
-                                f"Rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries + 1})"
-                            )
-                            await asyncio.sleep(wait_time)
                             continue
                         else:
                             # Last attempt failed, raise the error
                             response.raise_for_status()
 
                     response.raise_for_status()
-                    json_data: dict[str, Any] = await response.json()
+                    json_data: dict[str, Any] = await response.json(loads=partial(codec.loads_page, fields=fields))
+                    limiter.on_success()
 
                     # Cache successful response
+                    if cache_key is None:
+                        return json_data
                     AzurePricingServer._cache[cache_key] = json_data
+                    if disk_cache is not None:
+                        await self._store_on_disk(disk_cache, cache_key, json_data)
                     return json_data
 
             except aiohttp.ClientResponseError as e:
                 if e.status == 429 and attempt < max_retries:
-                    wait_time = RATE_LIMIT_RETRY_BASE_WAIT * (attempt + 1)
-                    logger.warning(
-                        f"Rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries + 1})"
-                    )
-                    await asyncio.sleep(wait_time)
+                    limiter.on_rate_limited(None)
                     last_exception = e
                     continue
                 else:
@@ -254,6 +631,345 @@ class AzurePricingServer:
             raise last_exception
         raise RuntimeError("Request failed without exception")
 
+    @staticmethod
+    async def _load_from_disk(disk_cache: DiskCache, cache_key: str) -> dict[str, Any] | None:
+        """Read a response from the disk cache; failures are treated as a miss."""
+        try:
+            cached = await asyncio.to_thread(disk_cache.get, cache_key)
+        except Exception as e:
+            logger.warning(f"Failed to read disk cache entry: {e}")
+            return None
+        return compact_page(cached) if cached is not None else None
+
+    @staticmethod
+    async def _store_on_disk(disk_cache: DiskCache, cache_key: str, value: dict[str, Any]) -> None:
+        """Write a response to the disk cache; failures only cost a future cache miss."""
+        try:
+            await asyncio.to_thread(disk_cache.set, cache_key, value)
+        except Exception as e:
+            logger.warning(f"Failed to write disk cache entry: {e}")
+
+    async def iter_price_pages(
+        self,
+        params: dict[str, Any],
+        max_pages: int | None = MAX_PAGES_PER_QUERY,
+        fields: frozenset[str] | None = None,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Yield raw API pages for a query, following NextPageLink lazily.
+
+        Each page is fetched through _make_request, so pages are cached individually
+        and only as many pages as the caller consumes are ever requested.
+
+        If the offline catalog covers the query, or a fully fetched result set for a
+        broader filter is cached, the query is answered from it as a single locally
+        filtered page instead.
+
+        While the query's result set can still be kept to answer narrower
+        queries (see query_cache.py), pages are fetched whole even if the
+        caller passes `fields`, since a projected set could not answer a query
+        reading other fields. Once it is too large, pages carry only `fields`
+        (catalog and result-set answers may carry more) and are not fed to the
+        local indexes, which need whole items.
+
+        Args:
+            params: Query parameters for the first page ($filter, currencyCode, ...)
+            max_pages: Stop after this many pages (None follows every link)
+            fields: Item fields the caller reads (None keeps every field)
+        """
+        local_items = self._answer_locally(params)
+        if local_items is not None:
+            yield {"Items": local_items, "NextPageLink": None, "Count": len(local_items)}
+            return
+
+        # Collect the result set so it can answer narrower queries once complete
+        collected: list[Any] | None = [] if split_query(params) is not None else None
+
+        url: str | None = AZURE_PRICING_BASE_URL
+        page_params: dict[str, Any] | None = params
+        pages_fetched = 0
+
+        while url:
+            page_fields = fields if collected is None else None
+            page = await self._make_request(url, page_params, fields=page_fields)
+            pages_fetched += 1
+            if page_fields is None:
+                AzurePricingServer._observe_items(page.get("Items", []))
+            if collected is not None:
+                collected.extend(page.get("Items", []))
+                if len(collected) > MAX_RESULT_SET_ITEMS:
+                    collected = None
+            yield page
+
+            # NextPageLink already carries the full query string
+            url = page.get("NextPageLink")
+            page_params = None
+
+            if url and max_pages is not None and pages_fetched >= max_pages:
+                logger.warning(f"Stopped following NextPageLink after {pages_fetched} pages")
+                return
+
+        if collected is not None:
+            self._keep_result_set(params, collected)
+
+    @staticmethod
+    def _keep_result_set(params: dict[str, Any], items: list[Any]) -> None:
+        """Record the items of a query read to its last page, unless $top may have truncated them."""
+        query = split_query(params)
+        top = params.get("$top")
+        if query is not None and (top is None or len(items) < int(top)):
+            AzurePricingServer._query_cache.add(*query, items)
+
+    async def iter_price_items(
+        self, params: dict[str, Any], limit: int | None = None, max_pages: int | None = MAX_PAGES_PER_QUERY
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """Yield individual price items across pages, stopping after `limit` items."""
+        if limit is not None and limit <= 0:
+            return
+
+        count = 0
+        async with aclosing(self.iter_price_pages(params, max_pages=max_pages)) as pages:
+            async for page in pages:
+                for item in page.get("Items", []):
+                    yield item
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+
+    def _answer_locally(self, params: dict[str, Any]) -> list[dict[str, Any]] | None:
+        """Items for a first-page query from the offline catalog or a cached broader result set, if either covers it."""
+        catalog = AzurePricingServer._catalog
+        if catalog is not None:
+            catalog_items = catalog.lookup(params)
+            if catalog_items is not None:
+                return catalog_items
+
+        query = split_query(params)
+        if query is not None and self._cache_key(AZURE_PRICING_BASE_URL, params) not in AzurePricingServer._cache:
+            subset = AzurePricingServer._query_cache.lookup(*query)
+            if subset is not None:
+                logger.debug(f"Answered {params.get('$filter')!r} from a cached broader result set")
+                return subset
+        return None
+
+    async def iter_streamed_items(
+        self,
+        params: dict[str, Any],
+        limit: int | None = None,
+        max_pages: int | None = MAX_PAGES_PER_QUERY,
+        fields: frozenset[str] | None = None,
+        stop: Callable[[], bool] | None = None,
+        last_page: dict[str, Any] | None = None,
+    ) -> AsyncGenerator[Mapping[str, Any], None]:
+        """
+        Yield price items across pages as each response body streams in.
+
+        Unlike iter_price_items, a page that has to be fetched is parsed
+        incrementally (see streaming.py): items are yielded as their bytes
+        arrive, and neither the raw body nor a decoded tree of the whole page
+        is held. Callers that aggregate on the fly therefore keep peak memory
+        to one chunk plus the compact items the cache stores anyway. Catalog,
+        result-set and cached pages are served as in iter_price_pages, and a
+        result set read to the end is kept the same way (so its pages are
+        fetched whole while it is small enough to keep).
+
+        Args:
+            params: Query parameters for the first page ($filter, currencyCode, ...)
+            limit: Stop after this many items (None yields every item)
+            max_pages: Stop after this many pages (None follows every link)
+            fields: Item fields the caller reads (None keeps every field)
+            stop: Called after each page; returning True ends the iteration there
+            last_page: Receives the fields other than Items (NextPageLink, Count) of
+                       each page read to the end, so callers can tell whether more follow
+        """
+        if limit is not None and limit <= 0:
+            return
+
+        count = 0
+        local_items = self._answer_locally(params)
+        if local_items is not None:
+            for local_item in local_items[:limit]:
+                yield local_item
+            return
+
+        collected: list[Any] | None = [] if split_query(params) is not None else None
+
+        url: str | None = AZURE_PRICING_BASE_URL
+        page_params: dict[str, Any] | None = params
+        pages_fetched = 0
+
+        while url:
+            envelope: dict[str, Any] = {}
+            page_fields = fields if collected is None else None
+            async with aclosing(self._stream_page(url, page_params, envelope, page_fields)) as items:
+                async for item in items:
+                    if collected is not None:
+                        collected.append(item)
+                    yield item
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+            pages_fetched += 1
+            if last_page is not None:
+                last_page.clear()
+                last_page.update((key, value) for key, value in envelope.items() if key != "Items")
+            if collected is not None and len(collected) > MAX_RESULT_SET_ITEMS:
+                collected = None
+            if stop is not None and stop():
+                return
+
+            url = envelope.get("NextPageLink")
+            page_params = None
+
+            if url and max_pages is not None and pages_fetched >= max_pages:
+                logger.warning(f"Stopped following NextPageLink after {pages_fetched} pages")
+                return
+
+        if collected is not None:
+            self._keep_result_set(params, collected)
+
+    async def _stream_page(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        envelope: dict[str, Any],
+        fields: frozenset[str] | None = None,
+        max_retries: int = MAX_RETRIES,
+    ) -> AsyncGenerator[Mapping[str, Any], None]:
+        """
+        Yield the items of one page, parsing the response body as it arrives.
+
+        Pages that are cached, already in flight or batched go through
+        _make_request instead. The page's other fields (NextPageLink, Count)
+        are written to `envelope` once its items are exhausted, and a page read
+        to the end is cached like any other.
+
+        While the body streams, the page is registered as in flight, so an
+        identical request joins it rather than going upstream. If the caller
+        stops before the end, those requests are resolved with None and fetch
+        the page themselves.
+        """
+        cache_key = self._cache_key(url, params, fields)
+        disk_cache = AzurePricingServer._disk_cache
+        page: dict[str, Any] | None = None
+        if (
+            cache_key in AzurePricingServer._cache
+            or cache_key in AzurePricingServer._inflight
+            or (fields is not None and self._cache_key(url, params) in AzurePricingServer._cache)
+            or (AzurePricingServer._batcher is not None and url == AZURE_PRICING_BASE_URL and params)
+        ):
+            page = await self._make_request(url, params, fields=fields)
+        elif disk_cache is not None:
+            page = await self._load_from_disk(disk_cache, cache_key)
+            if page is not None:
+                AzurePricingServer._cache[cache_key] = page
+        if page is not None:
+            envelope.update(page)
+            for item in page.get("Items", []):
+                yield item
+            return
+
+        inflight: asyncio.Future[dict[str, Any] | None] = asyncio.get_running_loop().create_future()
+        AzurePricingServer._inflight[cache_key] = inflight
+        try:
+            session = await self.get_session()
+            limiter = AzurePricingServer._rate_limiter
+
+            for attempt in range(max_retries + 1):
+                await limiter.acquire()
+                async with session.get(url, params=params) as response:
+                    if response.status == 429 and attempt < max_retries:
+                        limiter.on_rate_limited(parse_retry_after(response.headers.get("Retry-After")))
+                        continue
+                    response.raise_for_status()
+
+                    parser = ItemStreamParser(fields)
+                    items: list[PriceItem] = []
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+                        for item in parser.feed(chunk):
+                            items.append(item)
+                            yield item
+                    page = parser.close()
+                    limiter.on_success()
+
+                AzurePricingServer._streamed_pages += 1
+                page["Items"] = items
+                envelope.update(page)
+                AzurePricingServer._cache[cache_key] = page
+                inflight.set_result(page)
+                if fields is None:
+                    AzurePricingServer._observe_items(page["Items"])
+                if disk_cache is not None:
+                    await self._store_on_disk(disk_cache, cache_key, page)
+                return
+        except aiohttp.ClientError as e:
+            logger.error(f"HTTP request failed: {e}")
+            if not inflight.done():
+                inflight.set_exception(e)
+            raise
+        finally:
+            # Stopped early (or failed otherwise): let joined requests fetch the page themselves
+            if not inflight.done():
+                inflight.set_result(None)
+            self._finish_inflight(cache_key, inflight)
+
+    async def _collect_price_items(
+        self,
+        params: dict[str, Any],
+        limit: int,
+        max_pages: int | None = MAX_PAGES_PER_QUERY,
+        fields: frozenset[str] | None = None,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """
+        Collect up to `limit` items across pages, keeping only `fields` if given.
+
+        Returns:
+            Tuple of (items, has_more) where has_more reports whether the API
+            holds further matching items beyond the ones returned.
+        """
+        items: list[dict[str, Any]] = []
+        has_more = False
+
+        async with aclosing(self.iter_price_pages(params, max_pages=max_pages, fields=fields)) as pages:
+            async for page in pages:
+                page_items = page.get("Items", [])
+                remaining = limit - len(items)
+                items.extend(page_items[:remaining])
+                has_more = len(page_items) > remaining or bool(page.get("NextPageLink"))
+                if len(items) >= limit:
+                    break
+
+        return items, has_more
+
+    async def fetch_folded(
+        self, query: FoldedQuery, max_pages: int | None = MAX_PAGES_PER_QUERY
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Run a folded multi-value query to completion and split its items back out per value.
+
+        If the page cap stops the query first, values without items yet may
+        just come later in the result, so each of them is queried on its own.
+        """
+        items: list[dict[str, Any]] = []
+        capped = False
+        async with aclosing(self.iter_price_pages(query.params, max_pages=max_pages)) as pages:
+            async for page in pages:
+                items.extend(page.get("Items", []))
+                capped = bool(page.get("NextPageLink"))
+        by_value = query.demultiplex(items)
+        if not capped or len(query.values) < 2:
+            return by_value
+
+        missing = [single for single in query.split() if not by_value[single.values[0]]]
+        if missing:
+            logger.warning(
+                f"Folded lookup for {query.field_name} {query.values} stopped at the {max_pages}-page cap, "
+                f"querying {[single.values[0] for single in missing]} one by one"
+            )
+            for found in await asyncio.gather(*(self.fetch_folded(single, max_pages) for single in missing)):
+                by_value.update(found)
+        return by_value
+
     async def search_azure_prices(
         self,
         service_name: str | None = None,
@@ -265,43 +981,21 @@ class AzurePricingServer:
         limit: int = 50,
         discount_percentage: float | None = None,
         validate_sku: bool = True,
+        fields: frozenset[str] | None = None,
     ) -> dict[str, Any]:
-        """Search Azure retail prices with various filters, SKU validation, and discount support."""
-
-        # Build filter conditions
-        filter_conditions = []
-
-        if service_name:
-            filter_conditions.append(f"serviceName eq '{service_name}'")
-        if service_family:
-            filter_conditions.append(f"serviceFamily eq '{service_family}'")
-        if region:
-            filter_conditions.append(f"armRegionName eq '{region}'")
-        if sku_name:
-            filter_conditions.append(f"contains(skuName, '{sku_name}')")
-        if price_type:
-            filter_conditions.append(f"priceType eq '{price_type}'")
-
-        # Construct query parameters
-        params = {"api-version": DEFAULT_API_VERSION,
-                  "currencyCode": currency_code}
-
-        if filter_conditions:
-            params["$filter"] = " and ".join(filter_conditions)
-
-        # Limit results
-        if limit < MAX_RESULTS_PER_REQUEST:
-            params["$top"] = str(limit)
+        """
+        Search Azure retail prices with various filters, SKU validation, and discount support.
 
-        # Make request
-        data = await self._make_request(AZURE_PRICING_BASE_URL, params)
+        Internal callers that read only some item fields pass them as `fields`
+        (see models.py) so pages are decoded and cached without the rest.
+        """
 
-        # Process results
-        items = data.get("Items", [])
+        params, filter_conditions = self._search_params(
+            service_name, service_family, region, sku_name, price_type, currency_code, limit
+        )
 
-        # If we have more results than requested, truncate
-        if len(items) > limit:
-            items = items[:limit]
+        # Fetch pages until we have enough results
+        items, has_more = await self._collect_price_items(params, limit, fields=fields)
 
         # SKU validation and clarification
         validation_info = {}
@@ -314,14 +1008,16 @@ class AzurePricingServer:
                 "suggestions": [item.get("skuName") for item in items[:5] if item and item.get("skuName")],
             }
 
-        # Apply discount if provided
+        # Apply discount if provided (copies items into plain dicts either way)
         if discount_percentage is not None and discount_percentage > 0 and isinstance(items, list):
             items = self._apply_discount_to_items(items, discount_percentage)
+        else:
+            items = [as_dict(item) for item in items]
 
         result = {
             "items": items,
             "count": len(items) if isinstance(items, list) else 0,
-            "has_more": bool(data.get("NextPageLink")),
+            "has_more": has_more,
             "currency": currency_code,
             "filters_applied": filter_conditions,
         }
@@ -337,55 +1033,69 @@ class AzurePricingServer:
 
         return result
 
+    @staticmethod
+    def _search_params(
+        service_name: str | None = None,
+        service_family: str | None = None,
+        region: str | None = None,
+        sku_name: str | None = None,
+        price_type: str | None = None,
+        currency_code: str = "USD",
+        limit: int = 50,
+    ) -> tuple[dict[str, Any], list[str]]:
+        """Build the query parameters and filter conditions of a price search."""
+        # Build filter conditions
+        filter_conditions = []
+
+        if service_name:
+            filter_conditions.append(f"serviceName eq '{service_name}'")
+        if service_family:
+            filter_conditions.append(f"serviceFamily eq '{service_family}'")
+        if region:
+            filter_conditions.append(f"armRegionName eq '{region}'")
+        if sku_name:
+            filter_conditions.append(f"contains(skuName, '{sku_name}')")
+        if price_type:
+            filter_conditions.append(f"priceType eq '{price_type}'")
+
+        # Construct query parameters
+        params = {"api-version": DEFAULT_API_VERSION,
+                  "currencyCode": currency_code}
+
+        if filter_conditions:
+            params["$filter"] = " and ".join(filter_conditions)
+
+        # Limit results
+        if limit < MAX_RESULTS_PER_REQUEST:
+            params["$top"] = str(limit)
+
+        return params, filter_conditions
+
     async def _validate_and_suggest_skus(
         self, service_name: str | None, sku_name: str, currency_code: str = "USD"
     ) -> dict[str, Any]:
-        """Validate SKU name and suggest alternatives if not found."""
+        """
+        Validate SKU name and suggest alternatives if not found.
 
-        # Try to find similar SKUs
-        suggestions = []
+        Suggestions are ranked from the SKU index (every SKU seen in fetched pages
+        or the offline catalog), tolerating typos and separator differences. Only
+        when the index has no match is the service sampled with one more request.
+        """
 
-        if service_name:
-            # Search for SKUs within the service
-            broad_search = await self.search_azure_prices(
-                # Avoid recursion
-                service_name=service_name, currency_code=currency_code, limit=100, validate_sku=False
-            )
+        unique_suggestions: list[dict[str, Any]] = []
 
-            # Find SKUs that partially match
-            sku_lower = sku_name.lower()
-            items = broad_search.get("items", [])
-            if items:  # Only process if items exist
-                for item in items:
-                    item_sku = item.get("skuName")
-                    if not item_sku:  # Skip items without SKU names
-                        continue
-                    item_sku_lower = item_sku.lower()
-                    if (
-                        sku_lower in item_sku_lower
-                        or item_sku_lower in sku_lower
-                        or any(word in item_sku_lower for word in sku_lower.split() if word)
-                    ):
-                        suggestions.append(
-                            {
-                                "sku_name": item_sku,
-                                "product_name": item.get("productName", "Unknown"),
-                                "price": item.get("retailPrice", 0),
-                                "unit": item.get("unitOfMeasure", "Unknown"),
-                                "region": item.get("armRegionName", "Unknown"),
-                            }
-                        )
-
-        # Remove duplicates and limit suggestions
-        seen_skus = set()
-        unique_suggestions = []
-        for suggestion in suggestions:
-            sku = suggestion["sku_name"]
-            if sku not in seen_skus:
-                seen_skus.add(sku)
-                unique_suggestions.append(suggestion)
-                if len(unique_suggestions) >= 5:
-                    break
+        if service_name:
+            index = AzurePricingServer._sku_index
+            unique_suggestions = index.suggest(service_name, sku_name, limit=5)
+
+            if not unique_suggestions:
+                # Search for SKUs within the service
+                broad_search = await self.search_azure_prices(
+                    # Avoid recursion
+                    service_name=service_name, currency_code=currency_code, limit=100, validate_sku=False
+                )
+                index.add_items(broad_search.get("items", []), service_name=service_name)
+                unique_suggestions = index.suggest(service_name, sku_name, limit=5)
 
         return {
             "sku_validation": {
@@ -456,39 +1166,86 @@ class AzurePricingServer:
         regions: list[str] | None = None,
         currency_code: str = "USD",
         discount_percentage: float | None = None,
+        max_concurrency: int = REGION_FANOUT_CONCURRENCY,
     ) -> dict[str, Any]:
-        """Compare prices across different regions or SKUs."""
+        """
+        Compare prices across different regions or SKUs.
+
+        With a SKU, regions are folded into as few upstream queries as the URL
+        length allows (see planner.py); otherwise each region is a separate
+        search. Either way lookups run concurrently, at most `max_concurrency`
+        at a time, and a region whose lookup fails is logged and left out.
+        """
 
         comparisons = []
 
         if regions and isinstance(regions, list):
             # Compare across regions
-            for region in regions:
-                try:
-                    result = await self.search_azure_prices(
-                        service_name=service_name,
-                        sku_name=sku_name,
-                        region=region,
-                        currency_code=currency_code,
-                        limit=10,
-                    )
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+            def region_comparison(region: str, items: list[dict[str, Any]], latency_ms: float) -> dict[str, Any] | None:
+                if not items:
+                    return None
+                # Get the first item for comparison
+                item = items[0]
+                return {
+                    "region": region,
+                    "sku_name": item.get("skuName"),
+                    "retail_price": item.get("retailPrice"),
+                    "unit_of_measure": item.get("unitOfMeasure"),
+                    "product_name": item.get("productName"),
+                    "meter_name": item.get("meterName"),
+                    "latency_ms": latency_ms,
+                }
 
-                    if result["items"]:
-                        # Get the first item for comparison
-                        item = result["items"][0]
-                        comparisons.append(
-                            {
-                                "region": region,
-                                "sku_name": item.get("skuName"),
-                                "retail_price": item.get("retailPrice"),
-                                "unit_of_measure": item.get("unitOfMeasure"),
-                                "product_name": item.get("productName"),
-                                "meter_name": item.get("meterName"),
-                            }
+            async def compare_region(region: str) -> dict[str, Any] | None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        result = await self.search_azure_prices(
+                            service_name=service_name,
+                            sku_name=sku_name,
+                            region=region,
+                            currency_code=currency_code,
+                            limit=10,
                         )
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to get prices for region {region}: {e}")
+                    except Exception as e:
+                        logger.warning(
+                            f"Failed to get prices for region {region}: {e}")
+                        return None
+                    latency_ms = round((time.perf_counter() - started) * 1000, 1)
+                return region_comparison(region, result.get("items") or [], latency_ms)
+
+            async def compare_folded(query: FoldedQuery) -> list[dict[str, Any] | None]:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        by_region = await self.fetch_folded(query)
+                    except Exception as e:
+                        logger.warning(
+                            f"Folded lookup for regions {query.values} failed, querying them one by one: {e}"
+                        )
+                        by_region = None
+                    latency_ms = round((time.perf_counter() - started) * 1000, 1)
+                if by_region is None:
+                    return list(await asyncio.gather(*(compare_region(region) for region in query.values)))
+                return [region_comparison(region, by_region[region], latency_ms) for region in query.values]
+
+            if sku_name and len(regions) > 1:
+                conditions = (
+                    f"serviceName eq {quote_literal(service_name)}",
+                    f"contains(skuName, {quote_literal(sku_name)})",
+                )
+                queries = plan_folded_queries(
+                    AZURE_PRICING_BASE_URL,
+                    {"api-version": DEFAULT_API_VERSION, "currencyCode": currency_code},
+                    [(conditions, region) for region in regions],
+                )
+                chunks = await asyncio.gather(*(compare_folded(query) for query in queries))
+                region_results = [comparison for chunk in chunks for comparison in chunk]
+            else:
+                region_results = await asyncio.gather(*(compare_region(region) for region in regions))
+            comparisons = [comparison for comparison in region_results if comparison is not None]
         else:
             # Compare different SKUs within the same service
             result = await self.search_azure_prices(service_name=service_name, currency_code=currency_code, limit=20)
@@ -544,6 +1301,7 @@ class AzurePricingServer:
         top_n: int = 10,
         currency_code: str = "USD",
         discount_percentage: float | None = None,
+        constraints_file: str | None = None,
     ) -> dict[str, Any]:
         """
         Recommend the cheapest Azure regions for a given service and SKU.
@@ -560,6 +1318,8 @@ class AzurePricingServer:
             top_n: Number of top recommendations to return (default: 10)
             currency_code: Currency for pricing (default: USD)
             discount_percentage: Optional discount to apply to all prices
+            constraints_file: Governance constraints JSON (under the workspace root) limiting the regions considered
+                              (default: the configured region policy, if any)
 
         Returns:
             Dict with ranked region recommendations and pricing details
@@ -568,22 +1328,21 @@ class AzurePricingServer:
         # Returns list of search variants and a display name
         search_terms, display_sku = normalize_sku_name(sku_name)
 
-        # Step 1: Discover all regions where this SKU is available
-        # Try each search term variant until we get results
-        discovery_result: dict[str, Any] = {"items": []}
+        try:
+            policy = self._policy_for(constraints_file)
+        except (OSError, ValueError) as e:
+            return {"error": str(e), "recommendations": []}
+        if policy is not None and policy.allowed_regions() == []:
+            return {
+                "error": "The region policy permits no regions",
+                "region_policy": policy.describe(),
+                "recommendations": [],
+            }
 
-        for search_term in search_terms:
-            discovery_result = await self.search_azure_prices(
-                service_name=service_name,
-                sku_name=search_term,
-                currency_code=currency_code,
-                limit=500,  # Get many results to discover regions
-                validate_sku=False,  # Skip validation for discovery
-            )
-            if discovery_result.get("items"):
-                break
+        # Step 1: Discover all permitted regions where this SKU is available
+        ranking = await self._discover_region_prices(service_name, search_terms, currency_code, policy)
 
-        if not discovery_result["items"]:
+        if not ranking.items_seen:
             return {
                 "error": f"No pricing found for {display_sku} in service {service_name}",
                 "service_name": service_name,
@@ -593,93 +1352,21 @@ class AzurePricingServer:
                 "recommendations": [],
             }
 
-        # Extract unique regions with non-zero prices
-        # Track both On-Demand and Spot pricing separately per region
-        region_data: dict[str, dict[str, Any]] = {}
-        # Track Spot pricing separately
-        spot_data: dict[str, dict[str, Any]] = {}
-
-        for item in discovery_result["items"]:
-            region = item.get("armRegionName")
-            price = item.get("retailPrice", 0)
-            location = item.get("location", region)
-            sku_name_item = item.get("skuName", "")
-            meter_name = item.get("meterName", "")
-
-            # Determine pricing type from SKU/meter name
-            is_spot = "Spot" in sku_name_item or "Spot" in meter_name
-            is_low_priority = "Low Priority" in sku_name_item or "Low Priority" in meter_name
-
-            # Filter out items with $0 prices (preview/unavailable)
-            if region and price and price > 0:
-                item_data = {
-                    "region": region,
-                    "location": location,
-                    "retail_price": price,
-                    "sku_name": item.get("skuName"),
-                    "product_name": item.get("productName"),
-                    "unit_of_measure": item.get("unitOfMeasure"),
-                    "meter_name": item.get("meterName"),
-                }
-
-                if is_spot or is_low_priority:
-                    # Track Spot/Low Priority pricing separately
-                    pricing_type = "Spot" if is_spot else "Low Priority"
-                    if region not in spot_data or price < spot_data[region]["retail_price"]:
-                        spot_data[region] = {**item_data,
-                                             "pricing_type": pricing_type}
-                else:
-                    # On-Demand pricing
-                    if region not in region_data or price < region_data[region]["retail_price"]:
-                        region_data[region] = {
-                            **item_data, "pricing_type": "On-Demand"}
-
-        # Merge Spot pricing info into On-Demand entries
-        for region, on_demand in region_data.items():
-            if region in spot_data:
-                spot = spot_data[region]
-                on_demand["spot_price"] = spot["retail_price"]
-                on_demand["spot_sku_name"] = spot["sku_name"]
-
-        if not region_data:
+        if not ranking:
+            error = f"No regions with valid pricing found for {display_sku}"
+            if ranking.items_excluded:
+                error += " among the regions the region policy permits"
             return {
-                "error": f"No regions with valid pricing found for {display_sku}",
+                "error": error,
                 "service_name": service_name,
                 "sku_name": display_sku,
                 "sku_input": sku_name,
                 "recommendations": [],
             }
 
-        # Step 2: If we need more detailed pricing, fetch in parallel batches
-        # For now, we already have pricing from discovery - use it directly
-        recommendations = list(region_data.values())
-
-        # Step 3: Apply discount if provided
-        if discount_percentage is not None and discount_percentage > 0:
-            for rec in recommendations:
-                original_price = rec["retail_price"]
-                discounted_price = original_price * \
-                    (1 - discount_percentage / 100)
-                rec["original_price"] = original_price
-                rec["retail_price"] = round(discounted_price, 6)
-
-        # Step 4: Sort by price (cheapest first)
-        recommendations.sort(key=lambda x: x.get("retail_price", float("inf")))
-
-        # Step 5: Calculate savings vs most expensive region
-        if recommendations:
-            max_price = max(r.get("retail_price", 0) for r in recommendations)
-
-            for rec in recommendations:
-                price = rec.get("retail_price", 0)
-                if max_price > 0:
-                    savings_vs_max = ((max_price - price) / max_price) * 100
-                    rec["savings_vs_most_expensive"] = round(savings_vs_max, 2)
-                else:
-                    rec["savings_vs_most_expensive"] = 0.0
-
-        # Step 6: Limit to top N recommendations
-        top_recommendations = recommendations[:top_n]
+        # Step 2: Rank the regions (cheapest first), applying any discount and
+        # computing savings vs the most expensive region
+        top_recommendations, summary = ranking.rank(top_n, discount_percentage)
 
         # Build result
         result: dict[str, Any] = {
@@ -687,28 +1374,191 @@ class AzurePricingServer:
             "sku_name": display_sku,
             "sku_input": sku_name,  # Original input for transparency
             "currency": currency_code,
-            "total_regions_found": len(recommendations),
-            "showing_top": min(top_n, len(recommendations)),
+            "total_regions_found": len(ranking),
+            "showing_top": min(top_n, len(ranking)),
             "recommendations": top_recommendations,
+            "summary": summary,
         }
 
-        # Add summary statistics
-        if recommendations:
-            result["summary"] = {
-                "cheapest_region": recommendations[0]["region"],
-                "cheapest_location": recommendations[0]["location"],
-                "cheapest_price": recommendations[0]["retail_price"],
-                "most_expensive_region": recommendations[-1]["region"],
-                "most_expensive_location": recommendations[-1]["location"],
-                "most_expensive_price": recommendations[-1]["retail_price"],
-                "max_savings_percentage": recommendations[0].get("savings_vs_most_expensive", 0),
-            }
+        if policy is not None and policy.restricted:
+            result["region_policy"] = policy.describe()
 
         # Add discount info if applied
         if discount_percentage is not None and discount_percentage > 0:
             result["discount_applied"] = {
                 "percentage": discount_percentage,
-                "note": "Prices shown are after discount",
+                "note": "Prices shown are after discount",
+            }
+
+        return result
+
+    async def _discover_region_prices(
+        self,
+        service_name: str,
+        search_terms: list[str],
+        currency_code: str = "USD",
+        policy: RegionPolicy | None = None,
+    ) -> RegionRanking:
+        """
+        Fold the prices of a SKU in every region into a RegionRanking.
+
+        Each search term variant (see normalize_sku_name) is tried until one
+        matches, keeping the cheapest On-Demand and Spot price per region as
+        items stream in. A policy's allowed regions are folded into the filter
+        (see planner.py), so only they are fetched; denied regions are left
+        out of the ranking.
+        """
+        ranking = RegionRanking(policy.permits if policy is not None and policy.restricted else None)
+        allowed = policy.allowed_regions() if policy is not None else None
+        for search_term in search_terms:
+            params, conditions = self._search_params(
+                service_name=service_name,
+                sku_name=search_term,
+                currency_code=currency_code,
+                limit=REGION_DISCOVERY_LIMIT,  # Follow pages so every region is discovered
+            )
+            queries = [params]
+            if allowed is not None:
+                base_params = {key: value for key, value in params.items() if key != "$filter"}
+                lookups = [(tuple(conditions), region) for region in allowed]
+                queries = [query.params for query in plan_folded_queries(AZURE_PRICING_BASE_URL, base_params, lookups)]
+            for query_params in queries:
+                items = self.iter_streamed_items(
+                    query_params, limit=REGION_DISCOVERY_LIMIT, fields=REGION_RANKING_FIELDS
+                )
+                async with aclosing(items):
+                    async for item in items:
+                        ranking.add(item)
+            if ranking.items_seen:
+                break
+        return ranking
+
+    async def optimize_workload_region(
+        self,
+        resources: list[dict[str, Any]],
+        top_n: int = 10,
+        hours_per_month: float = 730,
+        currency_code: str = "USD",
+        discount_percentage: float | None = None,
+        max_concurrency: int = WORKLOAD_FANOUT_CONCURRENCY,
+        constraints_file: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Find the cheapest single region for a workload of several SKUs.
+
+        Every distinct (service, SKU) is priced in all regions like
+        recommend_regions does, at most `max_concurrency` at a time. Each
+        resource's monthly cost per region (price x quantity x billed units,
+        see ranking.monthly_units) forms a resource x region matrix; regions
+        offering every resource are ranked by total, the rest are listed with
+        the resources they lack.
+
+        Args:
+            resources: Items with service_name, sku_name and optional quantity (default 1)
+                       and hours_per_month (default: the hours_per_month argument)
+            top_n: Number of regions to return (default: 10)
+            hours_per_month: Usage hours for hourly-priced resources (default: 730)
+            currency_code: Currency for pricing (default: USD)
+            discount_percentage: Optional discount to apply to all prices
+            max_concurrency: SKUs discovered at once
+            constraints_file: Governance constraints JSON (under the workspace root) limiting the regions considered
+                              (default: the configured region policy, if any)
+
+        Returns:
+            Dict with ranked regions, per-resource costs and incomplete regions
+        """
+        if not resources:
+            return {"error": "No resources given", "recommendations": []}
+
+        try:
+            policy = self._policy_for(constraints_file)
+        except (OSError, ValueError) as e:
+            return {"error": str(e), "recommendations": []}
+        if policy is not None and policy.allowed_regions() == []:
+            return {
+                "error": "The region policy permits no regions",
+                "region_policy": policy.describe(),
+                "recommendations": [],
+            }
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def discover(service_name: str, sku_name: str) -> RegionRanking | None:
+            async with semaphore:
+                try:
+                    search_terms, _ = normalize_sku_name(sku_name)
+                    return await self._discover_region_prices(service_name, search_terms, currency_code, policy)
+                except Exception as e:
+                    logger.warning(f"Failed to get region prices for {sku_name} ({service_name}): {e}")
+                    return None
+
+        # Price each distinct SKU once, however many resources use it
+        keys = list(dict.fromkeys((resource["service_name"], resource["sku_name"]) for resource in resources))
+        rankings = dict(zip(keys, await asyncio.gather(*(discover(*key) for key in keys)), strict=True))
+
+        priced: list[dict[str, Any]] = []
+        line_costs: list[dict[str, float]] = []
+        unpriced: list[dict[str, Any]] = []
+        locations: dict[str, str] = {}
+        for resource in resources:
+            quantity = resource.get("quantity", 1)
+            hours = resource.get("hours_per_month", hours_per_month)
+            entry = {
+                "service_name": resource["service_name"],
+                "sku_name": resource["sku_name"],
+                "quantity": quantity,
+                "hours_per_month": hours,
+            }
+            ranking = rankings[(resource["service_name"], resource["sku_name"])]
+            if not ranking:
+                unpriced.append(entry)
+                continue
+
+            costs: dict[str, float] = {}
+            for region, (price, item) in ranking.on_demand().items():
+                costs[region] = price * quantity * monthly_units(item.get("unitOfMeasure"), hours)
+                locations.setdefault(region, item.get("location") or region)
+            entry["unit_of_measure"] = next(iter(ranking.on_demand().values()))[1].get("unitOfMeasure")
+            entry["regions_available"] = len(costs)
+            priced.append(entry)
+            line_costs.append(costs)
+
+        if not priced:
+            return {
+                "error": "No pricing found for any resource in the workload",
+                "unpriced_resources": unpriced,
+                "recommendations": [],
+            }
+
+        recommendations, partial, summary = rank_workload(line_costs, top_n, discount_percentage)
+        for row in recommendations:
+            row["location"] = locations[row["region"]]
+        for row in partial:
+            row["location"] = locations[row["region"]]
+            row["missing"] = [priced[i]["sku_name"] for i in row.pop("missing_lines")]
+
+        result: dict[str, Any] = {
+            "currency": currency_code,
+            "resources": priced,
+            "unpriced_resources": unpriced,
+            "total_regions_found": len(locations),
+            "complete_regions": len(locations) - len(partial),
+            "showing_top": len(recommendations),
+            "recommendations": recommendations,
+            "partial_regions": partial,
+        }
+        if summary:
+            summary["cheapest_location"] = locations[summary["cheapest_region"]]
+            summary["most_expensive_location"] = locations[summary["most_expensive_region"]]
+            result["summary"] = summary
+
+        if policy is not None and policy.restricted:
+            result["region_policy"] = policy.describe()
+
+        if discount_percentage is not None and discount_percentage > 0:
+            result["discount_applied"] = {
+                "percentage": discount_percentage,
+                "note": "Costs shown are after discount",
             }
 
         return result
@@ -823,6 +1673,229 @@ class AzurePricingServer:
 
         return result
 
+    async def estimate_costs_batch(
+        self,
+        line_items: list[dict[str, Any]],
+        hours_per_month: float = 730,
+        currency_code: str = "USD",
+        discount_percentage: float | None = None,
+        max_concurrency: int = ESTIMATE_FANOUT_CONCURRENCY,
+    ) -> dict[str, Any]:
+        """
+        Estimate the monthly cost of a bill of materials in one call.
+
+        Identical (service, SKU, region) lookups are made once, and lookups of
+        the same SKU in different regions are folded into shared requests (see
+        planner.py) that run concurrently, at most `max_concurrency` at a time,
+        through the usual caches. Each line is priced at its SKU's pay-as-you-go
+        On-Demand rate, scaled by quantity and billed units per month (see
+        ranking.monthly_units).
+
+        Args:
+            line_items: Items with service_name, sku_name, region and optional quantity (default 1),
+                        hours_per_month (default: the hours_per_month argument) and description
+            hours_per_month: Usage hours for hourly-priced lines (default: 730)
+            currency_code: Currency for pricing (default: USD)
+            discount_percentage: Optional discount to apply to all prices
+            max_concurrency: Upstream lookups run at once
+
+        Returns:
+            Dict with per-line costs, totals by service and region, and lookup counts
+        """
+        if not line_items:
+            return {"error": "No line items given", "lines": []}
+
+        def lookup_key(line_item: dict[str, Any]) -> tuple[str, str, str]:
+            # A line missing any of these is reported unpriced rather than failing the batch
+            return (
+                line_item.get("service_name") or "",
+                line_item.get("sku_name") or "",
+                (line_item.get("region") or "").lower(),
+            )
+
+        def sku_conditions(service_name: str, sku_name: str) -> tuple[str, ...]:
+            return (
+                f"serviceName eq {quote_literal(service_name)}",
+                f"contains(skuName, {quote_literal(sku_name)})",
+                "priceType eq 'Consumption'",
+            )
+
+        lookups = list(dict.fromkeys(key for key in map(lookup_key, line_items) if all(key)))
+        queries = plan_folded_queries(
+            AZURE_PRICING_BASE_URL,
+            {"api-version": DEFAULT_API_VERSION, "currencyCode": currency_code},
+            [(sku_conditions(service_name, sku_name), region) for service_name, sku_name, region in lookups],
+        )
+        skus = {
+            sku_conditions(service_name, sku_name): (service_name, sku_name) for service_name, sku_name, _ in lookups
+        }
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(query: FoldedQuery) -> dict[str, list[dict[str, Any]]]:
+            async with semaphore:
+                try:
+                    return await self.fetch_folded(query)
+                except Exception as e:
+                    logger.warning(f"Batch estimate lookup for regions {query.values} failed: {e}")
+                    return {}
+
+        prices: dict[tuple[str, str, str], Mapping[str, Any] | None] = {}
+        for query, found in zip(queries, await asyncio.gather(*(run(query) for query in queries)), strict=True):
+            service_name, sku_name = skus[query.conditions]
+            for region in query.values:
+                prices[(service_name, sku_name, region)] = self._pick_estimate_item(found.get(region, []), sku_name)
+
+        discounted = discount_percentage is not None and discount_percentage > 0
+        factor = 1 - (discount_percentage or 0) / 100
+        lines: list[dict[str, Any]] = []
+        by_service: dict[str, float] = {}
+        by_region: dict[str, float] = {}
+        for number, line_item in enumerate(line_items, 1):
+            quantity = line_item.get("quantity", 1)
+            hours = line_item.get("hours_per_month", hours_per_month)
+            line: dict[str, Any] = {
+                "line": number,
+                "service_name": line_item.get("service_name"),
+                "sku_name": line_item.get("sku_name"),
+                "region": line_item.get("region"),
+                "quantity": quantity,
+                "hours_per_month": hours,
+            }
+            if line_item.get("description"):
+                line["description"] = line_item["description"]
+            lines.append(line)
+
+            item = prices.get(lookup_key(line_item))
+            if item is None:
+                line["error"] = f"No pricing found for {line['sku_name']} in {line['region']}"
+                continue
+
+            unit_price = item["retailPrice"]
+            billed_units = monthly_units(item.get("unitOfMeasure"), hours)
+            monthly_cost = unit_price * factor * quantity * billed_units
+            line.update(
+                {
+                    "matched_sku": item.get("skuName"),
+                    "product_name": item.get("productName"),
+                    "meter_name": item.get("meterName"),
+                    "unit_of_measure": item.get("unitOfMeasure"),
+                    "unit_price": round(unit_price * factor, 6),
+                    "billed_units_per_month": round(billed_units, 4),
+                    "monthly_cost": round(monthly_cost, 2),
+                    "yearly_cost": round(monthly_cost * 12, 2),
+                }
+            )
+            if discounted:
+                line["original_unit_price"] = unit_price
+            by_service[line["service_name"]] = by_service.get(line["service_name"], 0.0) + monthly_cost
+            region = line["region"].lower()
+            by_region[region] = by_region.get(region, 0.0) + monthly_cost
+
+        monthly_total = sum(by_service.values())
+        result: dict[str, Any] = {
+            "currency": currency_code,
+            "lines": lines,
+            "totals": {
+                "monthly_cost": round(monthly_total, 2),
+                "yearly_cost": round(monthly_total * 12, 2),
+                "by_service": {
+                    name: round(cost, 2) for name, cost in sorted(by_service.items(), key=lambda entry: -entry[1])
+                },
+                "by_region": {
+                    name: round(cost, 2) for name, cost in sorted(by_region.items(), key=lambda entry: -entry[1])
+                },
+            },
+            "priced_lines": sum(1 for line in lines if "error" not in line),
+            "unpriced_lines": [line["line"] for line in lines if "error" in line],
+            "lookups": {
+                "line_items": len(line_items),
+                "distinct_lookups": len(lookups),
+                "upstream_queries": len(queries),
+            },
+        }
+
+        if discounted:
+            result["discount_applied"] = {
+                "percentage": discount_percentage,
+                "note": "Costs shown are after discount",
+            }
+
+        return result
+
+    async def estimate_bicep_costs(
+        self,
+        paths: list[str],
+        default_region: str | None = None,
+        hours_per_month: float = 730,
+        currency_code: str = "USD",
+        discount_percentage: float | None = None,
+        max_workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Estimate the monthly cost of the resources Bicep templates deploy.
+
+        The files are scanned for resource types, SKUs and locations (see
+        bicep.py; large scans parse files in parallel processes) off the event
+        loop, and the billable resources are priced in one batch estimate.
+        Resources billed by usage (Log Analytics ingestion, storage) are listed
+        as skipped with the usage quantity they need rather than priced.
+
+        Args:
+            paths: .bicep/.bicepparam files, or directories to scan for them, under the workspace root
+            default_region: Region for resources whose location cannot be resolved statically
+            hours_per_month: Usage hours for hourly-priced resources (default: 730)
+            currency_code: Currency for pricing (default: USD)
+            discount_percentage: Optional discount to apply to all prices
+            max_workers: Parser processes for large scans
+
+        Returns:
+            The batch estimate, with a "scan" entry listing scanned files, skipped resources and warnings
+        """
+        summary: dict[str, Any] = {"files": [], "resources": 0, "skipped": [], "warnings": []}
+        try:
+            resolved = [self._workspace_path(path) for path in paths]
+        except ValueError as e:
+            return {"error": str(e), "scan": summary}
+
+        scanner = AzurePricingServer._bicep_scanner
+        root = self._workspace_path(".")
+        scan = await asyncio.to_thread(scanner.scan, resolved, max_workers, root)
+        line_items, skipped = bicep.line_items(scan.resources, default_region)
+        summary = {
+            "files": scan.files,
+            "resources": len(scan.resources),
+            "skipped": skipped,
+            "warnings": scan.warnings,
+        }
+        if not scan.files:
+            return {"error": f"No Bicep files found in {', '.join(paths)}", "scan": summary}
+        if not line_items:
+            return {"error": "No billable resources with a resolvable SKU and location found", "scan": summary}
+
+        result = await self.estimate_costs_batch(
+            line_items,
+            hours_per_month=hours_per_month,
+            currency_code=currency_code,
+            discount_percentage=discount_percentage,
+        )
+        result["scan"] = summary
+        return result
+
+    @staticmethod
+    def _pick_estimate_item(items: list[dict[str, Any]], sku_name: str) -> Mapping[str, Any] | None:
+        """
+        The price a batch estimate uses for a SKU: the first On-Demand, non-zero
+        price, preferring an exact SKU name match over one that merely contains it.
+        """
+        candidates = [
+            item for item in items if (item.get("retailPrice") or 0) > 0 and pricing_type(item) == "On-Demand"
+        ]
+        wanted = sku_name.casefold()
+        for item in candidates:
+            if wanted in (str(item.get("skuName", "")).casefold(), str(item.get("armSkuName", "")).casefold()):
+                return item
+        return candidates[0] if candidates else None
+
     async def discover_skus(
         self, service_name: str, region: str | None = None, price_type: str = "Consumption", limit: int = 100
     ) -> dict[str, Any]:
@@ -843,40 +1916,43 @@ class AzurePricingServer:
         if filter_conditions:
             params["$filter"] = " and ".join(filter_conditions)
 
-        # Limit results
-        if limit < MAX_RESULTS_PER_REQUEST:
-            params["$top"] = str(limit)
-
-        # Make request
-        data = await self._make_request(AZURE_PRICING_BASE_URL, params)
+        # Process and deduplicate SKUs, following pages until `limit` SKUs are found
+        skus: dict[str, dict[str, Any]] = {}
+        skipped_skus = False
+        last_page: dict[str, Any] = {}
 
-        # Process and deduplicate SKUs
-        skus = {}
-        items = data.get("Items", [])
+        # Items are aggregated as they stream in; stop at a page boundary so regions on the
+        # current page are still collected. Pages are ordered by meter, not SKU, so only
+        # the limit or the page cap ends the listing early, and either is reported
+        items = self.iter_streamed_items(
+            params, fields=SKU_LISTING_FIELDS, stop=lambda: len(skus) >= limit, last_page=last_page
+        )
+        async with aclosing(items):
+            async for item in items:
+                sku_name = item.get("skuName")
+                arm_sku_name = item.get("armSkuName")
+                product_name = item.get("productName")
+                region = item.get("armRegionName")
+                price = item.get("retailPrice", 0)
+                unit = item.get("unitOfMeasure")
+                meter_name = item.get("meterName")
 
-        for item in items:
-            sku_name = item.get("skuName")
-            arm_sku_name = item.get("armSkuName")
-            product_name = item.get("productName")
-            region = item.get("armRegionName")
-            price = item.get("retailPrice", 0)
-            unit = item.get("unitOfMeasure")
-            meter_name = item.get("meterName")
-
-            if sku_name and sku_name not in skus:
-                skus[sku_name] = {
-                    "sku_name": sku_name,
-                    "arm_sku_name": arm_sku_name,
-                    "product_name": product_name,
-                    "sample_price": price,
-                    "unit_of_measure": unit,
-                    "meter_name": meter_name,
-                    "sample_region": region,
-                    "available_regions": [region] if region else [],
-                }
-            elif sku_name and region and region not in skus[sku_name]["available_regions"]:
-                # Add region to existing SKU
-                skus[sku_name]["available_regions"].append(region)
+                if sku_name and sku_name not in skus and len(skus) < limit:
+                    skus[sku_name] = {
+                        "sku_name": sku_name,
+                        "arm_sku_name": arm_sku_name,
+                        "product_name": product_name,
+                        "sample_price": price,
+                        "unit_of_measure": unit,
+                        "meter_name": meter_name,
+                        "sample_region": region,
+                        "available_regions": [region] if region else [],
+                    }
+                elif sku_name in skus and region and region not in skus[sku_name]["available_regions"]:
+                    # Add region to existing SKU
+                    skus[sku_name]["available_regions"].append(region)
+                elif sku_name and sku_name not in skus:
+                    skipped_skus = True
 
         # Convert to list and sort by SKU name
         sku_list = list(skus.values())
@@ -886,10 +1962,48 @@ class AzurePricingServer:
             "service_name": service_name,
             "skus": sku_list,
             "total_skus": len(sku_list),
+            "has_more": skipped_skus or bool(last_page.get("NextPageLink")),
             "price_type": price_type,
             "region_filter": region,
         }
 
+    @staticmethod
+    async def _first_results(
+        lookups: list[Callable[[], Awaitable[Any]]],
+        wanted: int,
+        max_concurrency: int = SUGGESTION_FANOUT_CONCURRENCY,
+    ) -> list[Any]:
+        """
+        Run lookups concurrently and return the first `wanted` non-None results in input order.
+
+        Results are consumed in input order, so the outcome matches running the
+        lookups one by one and stopping early; lookups that are no longer needed
+        are cancelled. An exception from a lookup that is needed propagates.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(lookup: Callable[[], Awaitable[Any]]) -> Any:
+            async with semaphore:
+                return await lookup()
+
+        tasks = [asyncio.ensure_future(run(lookup)) for lookup in lookups]
+        results: list[Any] = []
+        try:
+            for task in tasks:
+                if len(results) >= wanted:
+                    break
+                result = await task
+                if result is not None:
+                    results.append(result)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark exceptions from unneeded lookups as retrieved
+                    task.exception()
+        return results
+
     async def search_azure_prices_with_fuzzy_matching(
         self,
         service_name: str | None = None,
@@ -936,9 +2050,13 @@ class AzurePricingServer:
         currency_code: str = "USD",
         limit: int = 50,
     ) -> dict[str, Any]:
-        """Find services with similar names or suggest alternatives."""
+        """
+        Find services with similar names or suggest alternatives.
+
+        Candidate services are probed concurrently; probing stops once
+        SIMILAR_SERVICE_SUGGESTIONS candidates (in sorted order) have prices.
+        """
 
-        suggestions = []
         search_term = service_name.lower() if service_name else ""
 
         # Try exact mapping first
@@ -958,18 +2076,22 @@ class AzurePricingServer:
             if search_term in user_term or user_term in search_term:
                 partial_matches.append(azure_service)
 
-        # Remove duplicates and try each match
-        for azure_service in list(set(partial_matches)):
-            result = await self.search_azure_prices(service_name=azure_service, currency_code=currency_code, limit=5)
+        async def suggest(service: str, reason: str, probe_limit: int, samples: int) -> dict[str, Any] | None:
+            result = await self.search_azure_prices(
+                service_name=service, currency_code=currency_code, limit=probe_limit
+            )
+            if not result["items"]:
+                return None
+            return {"service_name": service, "match_reason": reason, "sample_items": result["items"][:samples]}
 
-            if result["items"]:
-                suggestions.append(
-                    {
-                        "service_name": azure_service,
-                        "match_reason": f"Partial match for '{service_name}'",
-                        "sample_items": result["items"][:3],
-                    }
-                )
+        # Remove duplicates and try each match
+        suggestions = await self._first_results(
+            [
+                partial(suggest, azure_service, f"Partial match for '{service_name}'", 5, 3)
+                for azure_service in sorted(set(partial_matches))
+            ],
+            SIMILAR_SERVICE_SUGGESTIONS,
+        )
 
         # If still no matches, do a broad search and look for similar services
         if not suggestions:
@@ -991,19 +2113,10 @@ class AzurePricingServer:
                     matching_services.add(service)
 
             # Create suggestions from found services
-            for service in list(matching_services)[:5]:  # Limit to top 5
-                service_result = await self.search_azure_prices(
-                    service_name=service, currency_code=currency_code, limit=3
-                )
-
-                if service_result["items"]:
-                    suggestions.append(
-                        {
-                            "service_name": service,
-                            "match_reason": f"Contains '{search_term}'",
-                            "sample_items": service_result["items"][:2],
-                        }
-                    )
+            suggestions = await self._first_results(
+                [partial(suggest, service, f"Contains '{search_term}'", 3, 2) for service in sorted(matching_services)],
+                SIMILAR_SERVICE_SUGGESTIONS,
+            )
 
         return {
             "items": [],
@@ -1028,10 +2141,23 @@ class AzurePricingServer:
             limit: Maximum number of results
         """
 
-        # Use fuzzy matching to find the right service
-        result = await self.search_azure_prices_with_fuzzy_matching(
-            service_name=service_hint, region=region, currency_code=currency_code, limit=limit
-        )
+        # Resolve the hint against the service registry first, so a good match costs one query
+        result: dict[str, Any] = {"items": []}
+        matches = AzurePricingServer._service_registry.resolve(service_hint, limit=1)
+        if matches and matches[0]["score"] >= SERVICE_RESOLVE_MIN_SCORE:
+            resolved = matches[0]["service_name"]
+            result = await self.search_azure_prices(
+                service_name=resolved, region=region, currency_code=currency_code, limit=limit
+            )
+            if resolved.casefold() != service_hint.casefold():
+                result["suggestion_used"] = resolved
+                result["match_type"] = f"registry_{matches[0]['matched_on']}"
+
+        if not result["items"]:
+            # Use fuzzy matching to find the right service
+            result = await self.search_azure_prices_with_fuzzy_matching(
+                service_name=service_hint, region=region, currency_code=currency_code, limit=limit
+            )
 
         # If we found exact matches, process SKUs
         if result["items"]:
@@ -1099,6 +2225,65 @@ class AzurePricingServer:
             "match_type": "no_match",
         }
 
+    async def fulltext_search(
+        self,
+        query: str,
+        service_name: str | None = None,
+        region: str | None = None,
+        price_type: str | None = None,
+        currency_code: str = "USD",
+        limit: int = 20,
+    ) -> dict[str, Any]:
+        """
+        Rank known prices against free text such as "premium ssd lrs".
+
+        Searches every price fetched so far and the offline catalog, without
+        calling the API. If `service_name` names a service nothing is indexed
+        for yet, its first pages are fetched (and indexed) first.
+
+        Args:
+            query: Words to look for in product, meter and SKU names
+            service_name: Only return prices of this service
+            region: Only return prices in this region
+            price_type: Only return this price type (Consumption, Reservation, ...)
+            currency_code: Only return prices in this currency
+            limit: Maximum number of results
+
+        Returns:
+            Dict with the matching items (best first, each with a match_score)
+        """
+        index = AzurePricingServer._fulltext_index
+        if service_name and not index.has_service(service_name):
+            params = {
+                "api-version": DEFAULT_API_VERSION,
+                "currencyCode": currency_code,
+                "$filter": f"serviceName eq '{service_name}'",
+            }
+            try:
+                async with aclosing(self.iter_price_pages(params, max_pages=FULLTEXT_WARM_PAGES)) as pages:
+                    async for page in pages:
+                        # Catalog and cached result-set answers bypass _make_request
+                        index.add_items(page.get("Items", []))
+            except Exception as e:
+                logger.warning(f"Could not fetch {service_name} prices for full-text search: {e}")
+
+        started = time.perf_counter()
+        items = index.search(
+            query,
+            limit=limit,
+            service_name=service_name,
+            region=region,
+            price_type=price_type,
+            currency_code=currency_code,
+        )
+        return {
+            "query": query,
+            "items": items,
+            "count": len(items),
+            "indexed_prices": len(index),
+            "search_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
 
 def create_server() -> Server:
     """Create and configure the MCP server instance."""
@@ -1207,6 +2392,91 @@ def create_server() -> Server:
                     "required": ["service_name", "sku_name", "region"],
                 },
             ),
+            Tool(
+                name="azure_cost_estimate_batch",
+                description="Estimate the monthly and yearly cost of a whole bill of materials (many service/SKU/region line items) in one call. Identical lookups are made once and the rest are fetched concurrently; returns a totals table and a per-line breakdown.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "line_items": {
+                            "type": "array",
+                            "description": "Line items to price",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "service_name": {"type": "string", "description": "Azure service name"},
+                                    "sku_name": {"type": "string", "description": "SKU name"},
+                                    "region": {"type": "string", "description": "Azure region"},
+                                    "quantity": {
+                                        "type": "number",
+                                        "description": "Instances, or monthly units for usage-priced SKUs such as GB (default: 1)",
+                                        "default": 1,
+                                    },
+                                    "hours_per_month": {
+                                        "type": "number",
+                                        "description": "Usage hours for this line (default: the batch's hours_per_month)",
+                                    },
+                                    "description": {
+                                        "type": "string",
+                                        "description": "Optional label shown in the breakdown (e.g., 'Web tier')",
+                                    },
+                                },
+                                "required": ["service_name", "sku_name", "region"],
+                            },
+                            "minItems": 1,
+                        },
+                        "hours_per_month": {
+                            "type": "number",
+                            "description": "Expected hours of usage per month for hourly-priced lines (default: 730)",
+                            "default": 730,
+                        },
+                        "currency_code": {
+                            "type": "string",
+                            "description": "Currency code (default: USD)",
+                            "default": "USD",
+                        },
+                        "discount_percentage": {
+                            "type": "number",
+                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                        },
+                    },
+                    "required": ["line_items"],
+                },
+            ),
+            Tool(
+                name="azure_bicep_cost_estimate",
+                description="Estimate the monthly and yearly cost of the resources Bicep templates deploy. Scans .bicep/.bicepparam files (or directories of them) for resource types, SKUs and locations, follows module calls and parameter files, and prices every billable resource in one batch estimate.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "paths": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Bicep files or directories to scan, relative to the server's workspace root (e.g., ['infra/bicep/rebel-tactical'])",
+                            "minItems": 1,
+                        },
+                        "default_region": {
+                            "type": "string",
+                            "description": "Region for resources whose location cannot be resolved from the templates (e.g., resourceGroup().location)",
+                        },
+                        "hours_per_month": {
+                            "type": "number",
+                            "description": "Expected hours of usage per month for hourly-priced resources (default: 730)",
+                            "default": 730,
+                        },
+                        "currency_code": {
+                            "type": "string",
+                            "description": "Currency code (default: USD)",
+                            "default": "USD",
+                        },
+                        "discount_percentage": {
+                            "type": "number",
+                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                        },
+                    },
+                    "required": ["paths"],
+                },
+            ),
             Tool(
                 name="azure_discover_skus",
                 description="Discover available SKUs for a specific Azure service",
@@ -1282,10 +2552,108 @@ def create_server() -> Server:
                             "type": "number",
                             "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
                         },
+                        "constraints_file": {
+                            "type": "string",
+                            "description": "Governance constraints JSON under the server's workspace root (e.g., agent-output/<project>/04-governance-constraints.json); only its allowed, non-denied regions are fetched and ranked",
+                        },
                     },
                     "required": ["service_name", "sku_name"],
                 },
             ),
+            Tool(
+                name="azure_workload_region_optimize",
+                description="Find the cheapest single Azure region for a whole workload (e.g. several VM SKUs, a SQL tier and storage). Prices every SKU across all regions concurrently, totals the monthly cost per region, and ranks regions that offer every resource; regions missing a SKU are listed with what they lack.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "resources": {
+                            "type": "array",
+                            "description": "Resources in the workload",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "service_name": {
+                                        "type": "string",
+                                        "description": "Azure service name (e.g., 'Virtual Machines', 'SQL Database')",
+                                    },
+                                    "sku_name": {
+                                        "type": "string",
+                                        "description": "SKU name (e.g., 'D4s v5', 'P1v3')",
+                                    },
+                                    "quantity": {
+                                        "type": "number",
+                                        "description": "Instances, or monthly units for usage-priced SKUs such as GB (default: 1)",
+                                        "default": 1,
+                                    },
+                                    "hours_per_month": {
+                                        "type": "number",
+                                        "description": "Usage hours for this resource (default: the workload's hours_per_month)",
+                                    },
+                                },
+                                "required": ["service_name", "sku_name"],
+                            },
+                            "minItems": 1,
+                        },
+                        "top_n": {
+                            "type": "integer",
+                            "description": "Number of regions to return (default: 10)",
+                            "default": 10,
+                        },
+                        "hours_per_month": {
+                            "type": "number",
+                            "description": "Usage hours for hourly-priced resources (default: 730)",
+                            "default": 730,
+                        },
+                        "currency_code": {
+                            "type": "string",
+                            "description": "Currency code (default: USD)",
+                            "default": "USD",
+                        },
+                        "discount_percentage": {
+                            "type": "number",
+                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                        },
+                        "constraints_file": {
+                            "type": "string",
+                            "description": "Governance constraints JSON under the server's workspace root (e.g., agent-output/<project>/04-governance-constraints.json); only its allowed, non-denied regions are fetched and ranked",
+                        },
+                    },
+                    "required": ["resources"],
+                },
+            ),
+            Tool(
+                name="azure_price_fulltext_search",
+                description="Free-text search over Azure prices already fetched or in the offline catalog (e.g. 'premium ssd lrs', 'ampere arm vm'). Matches words in product, meter and SKU names and returns BM25-ranked prices instantly, without calling the pricing API.",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Words to search for in product, meter and SKU names",
+                        },
+                        "service_name": {
+                            "type": "string",
+                            "description": "Only return prices of this service (fetched first if not seen yet)",
+                        },
+                        "region": {"type": "string", "description": "Only return prices in this region"},
+                        "price_type": {
+                            "type": "string",
+                            "description": "Price type: 'Consumption', 'Reservation', or 'DevTestConsumption'",
+                        },
+                        "currency_code": {
+                            "type": "string",
+                            "description": "Currency code (default: USD)",
+                            "default": "USD",
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of results (default: 20)",
+                            "default": 20,
+                        },
+                    },
+                    "required": ["query"],
+                },
+            ),
             Tool(
                 name="get_customer_discount",
                 description="Get customer discount information. Returns default 10% discount for all customers.",
@@ -1313,6 +2681,12 @@ async def main():
     """Main entry point for the server."""
     import argparse
 
+    # `catalog ...` manages the offline price catalog instead of starting the server
+    if len(sys.argv) > 1 and sys.argv[1] == "catalog":
+        from .catalog import catalog_main
+
+        return await catalog_main(sys.argv[2:])
+
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Azure Pricing MCP Server")
     parser.add_argument(
@@ -1326,10 +2700,79 @@ async def main():
     )
     parser.add_argument("--port", type=int, default=8080,
                         help="Port for HTTP server (default: 8080)")
+    parser.add_argument(
+        "--catalog",
+        default=os.environ.get("AZURE_PRICING_CATALOG"),
+        help="Answer queries from an offline catalog built with 'catalog sync' (env: AZURE_PRICING_CATALOG)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=float(os.environ.get("AZURE_PRICING_CACHE_MAX_MB", DEFAULT_CACHE_MAX_BYTES / (1024 * 1024))),
+        help="Memory budget for the in-memory response cache in MB (env: AZURE_PRICING_CACHE_MAX_MB)",
+    )
+    parser.add_argument(
+        "--fulltext-max-mb",
+        type=float,
+        default=float(os.environ.get("AZURE_PRICING_FULLTEXT_MAX_MB", DEFAULT_FULLTEXT_MAX_BYTES / (1024 * 1024))),
+        help="Memory budget for the full-text price index in MB (env: AZURE_PRICING_FULLTEXT_MAX_MB)",
+    )
+    parser.add_argument(
+        "--cache-db",
+        default=os.environ.get("AZURE_PRICING_CACHE_DB"),
+        help="SQLite file for a persistent response cache that survives restarts (env: AZURE_PRICING_CACHE_DB)",
+    )
+    parser.add_argument(
+        "--service-refresh-hours",
+        type=float,
+        default=float(os.environ.get("AZURE_PRICING_SERVICE_REFRESH_HOURS", 0)),
+        help="Sample every service family for the service registry at startup and then this often; "
+        "0 disables (env: AZURE_PRICING_SERVICE_REFRESH_HOURS)",
+    )
+    parser.add_argument(
+        "--workspace-root",
+        default=os.environ.get("AZURE_PRICING_WORKSPACE_ROOT"),
+        help="Directory tools may read files under (Bicep templates, constraints files); default: the working "
+        "directory (env: AZURE_PRICING_WORKSPACE_ROOT)",
+    )
+    parser.add_argument(
+        "--region-policy",
+        default=os.environ.get("AZURE_PRICING_REGION_POLICY"),
+        help="Governance constraints JSON (e.g. agent-output/<project>/04-governance-constraints.json) whose "
+        "allowed/denied regions limit region recommendations (env: AZURE_PRICING_REGION_POLICY)",
+    )
+    parser.add_argument(
+        "--batch-window-ms",
+        type=float,
+        default=float(os.environ.get("AZURE_PRICING_BATCH_WINDOW_MS", 0)),
+        help="Merge concurrent lookups arriving within this many ms into one request; 0 disables "
+        "(env: AZURE_PRICING_BATCH_WINDOW_MS)",
+    )
+    parser.add_argument(
+        "--batch-max-size",
+        type=int,
+        default=int(os.environ.get("AZURE_PRICING_BATCH_MAX_SIZE", DEFAULT_BATCH_MAX_SIZE)),
+        help="Most lookups merged into one request (env: AZURE_PRICING_BATCH_MAX_SIZE)",
+    )
 
     # Only parse known args to avoid issues with MCP passing additional args
     args, _ = parser.parse_known_args()
 
+    AzurePricingServer.configure_memory_cache(int(args.cache_max_mb * 1024 * 1024))
+    AzurePricingServer.configure_fulltext_index(int(args.fulltext_max_mb * 1024 * 1024))
+    if args.cache_db:
+        AzurePricingServer.configure_disk_cache(args.cache_db)
+    if args.catalog:
+        AzurePricingServer.configure_catalog(args.catalog)
+    if args.workspace_root:
+        AzurePricingServer.configure_workspace_root(args.workspace_root)
+    if args.region_policy:
+        AzurePricingServer.configure_region_policy(args.region_policy)
+    if args.batch_window_ms > 0:
+        AzurePricingServer.configure_batching(args.batch_window_ms, args.batch_max_size)
+    if args.service_refresh_hours > 0:
+        AzurePricingServer.start_service_registry_refresh(args.service_refresh_hours * 3600)
+
     server = create_server()
 
     if args.transport == "http":
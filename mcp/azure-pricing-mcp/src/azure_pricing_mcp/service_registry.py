@@ -0,0 +1,164 @@
+"""Registry of the service names, families and product names seen in price data, with fuzzy resolution."""
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any
+
+from .sku_index import trigrams
+
+if TYPE_CHECKING:
+    from .catalog import PriceCatalog
+
+# Service families swept by a background refresh, in addition to any seen in price data
+SERVICE_FAMILIES = (
+    "Compute",
+    "Storage",
+    "Databases",
+    "Networking",
+    "Analytics",
+    "AI + Machine Learning",
+    "Containers",
+    "Web",
+    "Integration",
+    "Internet of Things",
+    "Management and Governance",
+    "Security",
+    "Developer Tools",
+    "Mixed Reality",
+    "Other",
+)
+MIN_RESOLVE_SCORE = 0.35  # n-gram similarity below this is not considered a match
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _normalise(text: str) -> str:
+    return _NON_ALNUM_RE.sub("", text.lower())
+
+
+class ServiceRegistry:
+    """
+    Every distinct serviceName, plus the serviceFamily and productNames seen for it.
+
+    Service names, product names and user aliases (e.g. "aks") are indexed by
+    character trigrams, so a free-text hint resolves to ranked service names
+    locally. Fed from fetched price pages and the offline catalog, and swept
+    periodically by AzurePricingServer.refresh_service_registry().
+    """
+
+    def __init__(self, aliases: Mapping[str, str] | None = None):
+        self._aliases = {_normalise(alias): service for alias, service in (aliases or {}).items()}
+        self._families: dict[str, str] = {}  # serviceName -> serviceFamily
+        # Indexed names: normalised text -> service it points at and what kind of name it is
+        self._names: dict[str, tuple[str, str]] = {}
+        self._name_list: list[str] = []
+        self._gram_counts: list[int] = []
+        self._postings: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._families)
+
+    def _index(self, text: str, service_name: str, kind: str) -> None:
+        key = _normalise(text)
+        if not key or key in self._names:
+            return
+        self._names[key] = (service_name, kind)
+        name_id = len(self._name_list)
+        self._name_list.append(key)
+        grams = trigrams(key)
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(name_id)
+
+    def add(self, service_name: str, service_family: str | None = None, product_name: str | None = None) -> None:
+        """Record a service, optionally with its family and one of its product names."""
+        if service_name not in self._families or (service_family and not self._families[service_name]):
+            self._families[service_name] = service_family or ""
+            self._index(service_name, service_name, "service")
+        if product_name:
+            self._index(product_name, service_name, "product")
+
+    def add_items(self, items: Iterable[dict[str, Any]]) -> None:
+        """Record the services of price items."""
+        for item in items:
+            service_name = item.get("serviceName")
+            if service_name:
+                self.add(service_name, item.get("serviceFamily"), item.get("productName"))
+
+    def add_catalog(self, catalog: "PriceCatalog") -> None:
+        """Record every service and product in an offline catalog."""
+        columns = ("serviceName", "serviceFamily", "productName")
+        for service_name, service_family, product_name in catalog.first_rows(*columns):
+            if service_name:
+                self.add(service_name, service_family or None, product_name or None)
+
+    def services(self) -> list[str]:
+        """Every known service name, sorted."""
+        return sorted(self._families)
+
+    def families(self) -> list[str]:
+        """Every known service family (seen or swept by default), sorted."""
+        return sorted({*SERVICE_FAMILIES, *(family for family in self._families.values() if family)})
+
+    def resolve(self, hint: str, limit: int = 5) -> list[dict[str, Any]]:
+        """
+        Services matching a free-text hint, best first.
+
+        An alias or exact service name scores 1.0. Otherwise each service scores
+        the best trigram similarity of its name or product names to the hint,
+        with a bonus when the hint appears verbatim.
+
+        Returns:
+            Matches with service_name, service_family, score and matched_on
+        """
+        key = _normalise(hint)
+        if not key:
+            return []
+
+        best: dict[str, tuple[float, str]] = {}
+        if key in self._aliases:
+            best[self._aliases[key]] = (1.0, "alias")
+
+        hint_grams = trigrams(key)
+        shared: Counter[int] = Counter()
+        for gram in hint_grams:
+            shared.update(self._postings.get(gram, ()))
+        for name_id, overlap in shared.items():
+            name = self._name_list[name_id]
+            service_name, kind = self._names[name]
+            if name == key:
+                score = 1.0
+            else:
+                score = 2 * overlap / (len(hint_grams) + self._gram_counts[name_id])
+                if key in name:
+                    score = min(score + 0.5, 0.99)
+            if score >= MIN_RESOLVE_SCORE and score > best.get(service_name, (0.0, ""))[0]:
+                best[service_name] = (score, kind)
+
+        ranked = sorted(best.items(), key=lambda match: (-match[1][0], len(match[0]), match[0]))
+        return [
+            {
+                "service_name": service_name,
+                "service_family": self._families.get(service_name) or None,
+                "score": round(score, 3),
+                "matched_on": kind,
+            }
+            for service_name, (score, kind) in ranked[:limit]
+        ]
+
+    def clear(self) -> None:
+        """Forget every recorded service (aliases are kept)."""
+        self._families.clear()
+        self._names.clear()
+        self._name_list.clear()
+        self._gram_counts.clear()
+        self._postings.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return registry size."""
+        return {
+            "services": len(self._families),
+            "indexed_names": len(self._name_list),
+            "aliases": len(self._aliases),
+        }
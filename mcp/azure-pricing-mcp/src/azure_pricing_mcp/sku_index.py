@@ -0,0 +1,171 @@
+"""Per-service index of SKU names with typo-tolerant, ranked lookup."""
+
+import re
+from collections import Counter
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .catalog import PriceCatalog
+
+DEFAULT_MAX_SKUS = 200_000  # distinct (service, SKU) names kept across all services
+MIN_SUGGESTION_SCORE = 0.3  # trigram similarity below this is not worth suggesting
+_RERANK_CANDIDATES = 50  # best trigram matches re-ranked by edit distance
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def compact(name: str) -> str:
+    """
+    Normalise a SKU name for matching.
+
+    Lowercases and drops separators and a leading "standard", so "Standard_D4s_v5",
+    "D4s v5" and "d4sv5" all compare equal.
+    """
+    text = _NON_ALNUM_RE.sub("", name.lower())
+    return text[len("standard") :] if text.startswith("standard") and len(text) > len("standard") else text
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of a compacted name, padded so short names still have some."""
+    padded = f"^{text}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class _ServiceSkus:
+    __slots__ = ("names", "compacted", "gram_counts", "samples", "ids", "postings")
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.compacted: list[str] = []
+        self.gram_counts: list[int] = []
+        self.samples: list[dict[str, Any]] = []
+        self.ids: dict[str, int] = {}
+        self.postings: dict[str, list[int]] = {}
+
+
+class SkuIndex:
+    """
+    SKU names seen for each service, indexed by character trigrams.
+
+    Fed from every price page the server fetches and from the offline catalog,
+    so SKU validation can rank suggestions from everything observed so far
+    without another upstream request. Candidates sharing trigrams with the
+    query are scored by trigram overlap (plus a bonus when the query is a
+    substring), and the best are re-ranked by edit distance.
+    """
+
+    def __init__(self, max_skus: int = DEFAULT_MAX_SKUS):
+        self.max_skus = max_skus
+        self._services: dict[str, _ServiceSkus] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, service_name: str, sku_name: str, item: dict[str, Any]) -> None:
+        """Record a SKU of a service, keeping `item` as its sample price."""
+        service = self._services.get(service_name.casefold())
+        if service is None:
+            service = self._services[service_name.casefold()] = _ServiceSkus()
+        if sku_name in service.ids or self._size >= self.max_skus:
+            return
+
+        sku_id = len(service.names)
+        service.ids[sku_name] = sku_id
+        service.names.append(sku_name)
+        compacted = compact(sku_name)
+        service.compacted.append(compacted)
+        grams = trigrams(compacted)
+        service.gram_counts.append(len(grams))
+        for gram in grams:
+            service.postings.setdefault(gram, []).append(sku_id)
+        service.samples.append(
+            {
+                "product_name": item.get("productName", "Unknown"),
+                "price": item.get("retailPrice", 0),
+                "unit": item.get("unitOfMeasure", "Unknown"),
+                "region": item.get("armRegionName", "Unknown"),
+            }
+        )
+        self._size += 1
+
+    def add_items(self, items: Iterable[dict[str, Any]], service_name: str | None = None) -> None:
+        """Record the SKUs of price items, attributed to `service_name` if the items lack one."""
+        for item in items:
+            sku_name = item.get("skuName")
+            service = item.get("serviceName") or service_name
+            if sku_name and service:
+                self.add(service, sku_name, item)
+
+    def add_catalog(self, catalog: "PriceCatalog") -> None:
+        """Record every SKU in an offline catalog."""
+        for (service_name, sku_name), row in catalog.first_rows("serviceName", "skuName").items():
+            if service_name and sku_name:
+                self.add(service_name, sku_name, catalog.row(row))
+
+    def skus(self, service_name: str) -> list[str]:
+        """SKU names recorded for a service."""
+        service = self._services.get(service_name.casefold())
+        return list(service.names) if service else []
+
+    def suggest(self, service_name: str, query: str, limit: int = 5) -> list[dict[str, Any]]:
+        """
+        SKUs of a service most similar to `query`, best first.
+
+        Returns:
+            Suggestions with sku_name, match_score and the SKU's sample price fields
+        """
+        service = self._services.get(service_name.casefold())
+        query_compact = compact(query)
+        if service is None or not query_compact:
+            return []
+
+        query_grams = trigrams(query_compact)
+        shared: Counter[int] = Counter()
+        for gram in query_grams:
+            shared.update(service.postings.get(gram, ()))
+
+        scored = []
+        for sku_id, overlap in shared.items():
+            score = 2 * overlap / (len(query_grams) + service.gram_counts[sku_id])
+            if query_compact in service.compacted[sku_id]:
+                score += 0.5
+            if score >= MIN_SUGGESTION_SCORE:
+                scored.append((score, sku_id))
+
+        best = sorted(scored, key=lambda candidate: -candidate[0])[:_RERANK_CANDIDATES]
+        ranked = sorted(
+            best,
+            key=lambda candidate: (
+                -round(candidate[0], 6),
+                edit_distance(query_compact, service.compacted[candidate[1]]),
+                service.names[candidate[1]],
+            ),
+        )
+        return [
+            {"sku_name": service.names[sku_id], "match_score": round(min(score, 1.0), 3), **service.samples[sku_id]}
+            for score, sku_id in ranked[:limit]
+        ]
+
+    def clear(self) -> None:
+        """Forget every SKU."""
+        self._services.clear()
+        self._size = 0
+
+    def stats(self) -> dict[str, Any]:
+        """Return index size."""
+        return {"services": len(self._services), "skus": self._size}
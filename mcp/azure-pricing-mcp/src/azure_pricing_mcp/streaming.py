@@ -0,0 +1,111 @@
+"""
+Incremental parsing of Retail Prices API pages.
+
+A page is {"BillingCurrency": ..., "Items": [...], "NextPageLink": ..., "Count": n}.
+ItemStreamParser is fed the body chunk by chunk as it arrives from the HTTP
+stream and hands back each entry of Items as soon as its closing brace has
+been read, so neither the whole body nor a decoded tree of every item is ever
+held. The few short fields around Items are buffered and decoded at the end.
+
+Items are decoded with the standard library's raw_decode, which is also what
+finds where each one ends; the pluggable codec backends need complete text.
+"""
+
+import codecs
+import json
+import re
+from typing import Any
+
+from .models import PriceItem
+
+_ITEMS_START = re.compile(r'"Items"\s*:\s*\[')
+_SEPARATOR = re.compile(r"[\s,]*")
+
+_HEAD, _ITEMS, _TAIL = range(3)
+
+
+class ItemStreamParser:
+    """
+    Push parser turning the chunks of one page body into PriceItems.
+
+    Usage:
+        parser = ItemStreamParser()
+        async for chunk in response.content.iter_chunked(65536):
+            for item in parser.feed(chunk):
+                ...
+        page = parser.close()  # NextPageLink, Count, ... with an empty Items list
+    """
+
+    def __init__(self, fields: frozenset[str] | None = None):
+        """
+        Args:
+            fields: Item fields to keep (None keeps every field)
+        """
+        self._fields = fields
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._scanner = json.JSONDecoder()
+        self._state = _HEAD
+        self._head = ""  # Page text up to and including the "[" opening Items
+        self._buffer = ""  # Unparsed text inside Items, then everything after it
+        self.items_parsed = 0
+
+    def feed(self, chunk: bytes) -> list[PriceItem]:
+        """Consume the next chunk of the body and return the items it completed."""
+        text = self._text.decode(chunk)
+        if self._state == _HEAD:
+            self._head += text
+            match = _ITEMS_START.search(self._head)
+            if match is None:
+                return []
+            self._buffer = self._head[match.end() :]
+            self._head = self._head[: match.end()]
+            self._state = _ITEMS
+        else:
+            self._buffer += text
+
+        if self._state != _ITEMS:
+            return []
+        return self._parse_items()
+
+    def _parse_items(self) -> list[PriceItem]:
+        items: list[PriceItem] = []
+        buffer = self._buffer
+        pos = 0
+        while True:
+            pos = _SEPARATOR.match(buffer, pos).end()  # type: ignore[union-attr]
+            if pos == len(buffer):
+                break
+            if buffer[pos] == "]":
+                self._state = _TAIL
+                break
+            if buffer[pos] != "{":
+                raise ValueError(f"Malformed price page: expected an item object, got {buffer[pos : pos + 20]!r}")
+            try:
+                value, end = self._scanner.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The item's closing brace has not arrived yet
+                break
+            items.append(PriceItem.from_dict(value, self._fields))
+            pos = end
+        self._buffer = buffer[pos:]
+        self.items_parsed += len(items)
+        return items
+
+    def close(self) -> dict[str, Any]:
+        """
+        Finish the body and return the page's other fields, with an empty Items list.
+
+        Raises:
+            ValueError: If the body ended inside Items or is not valid JSON
+        """
+        text = self._text.decode(b"", final=True)
+        if self._state == _ITEMS:
+            raise ValueError(f"Truncated price page: Items ended after {self.items_parsed} items")
+        if self._state == _HEAD:
+            page: dict[str, Any] = json.loads(self._head + text)
+            if page.get("Items"):
+                raise ValueError("Malformed price page: Items is not a list of objects")
+            return page
+        # The tail starts with the "]" closing Items, so this decodes with "Items": []
+        page = json.loads(self._head + self._buffer + text)
+        return page
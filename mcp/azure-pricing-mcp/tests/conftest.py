@@ -0,0 +1,23 @@
+"""Shared fixtures for the Azure Pricing MCP test suite."""
+
+import pytest
+
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_caches():
+    """Keep class-level caches from leaking results between tests."""
+    AzurePricingServer._cache.clear()
+    AzurePricingServer._query_cache.clear()
+    AzurePricingServer._sku_index.clear()
+    AzurePricingServer._service_registry.clear()
+    AzurePricingServer._fulltext_index.clear()
+    AzurePricingServer._bicep_scanner.clear()
+    yield
+    AzurePricingServer._cache.clear()
+    AzurePricingServer._query_cache.clear()
+    AzurePricingServer._sku_index.clear()
+    AzurePricingServer._service_registry.clear()
+    AzurePricingServer._fulltext_index.clear()
+    AzurePricingServer._bicep_scanner.clear()
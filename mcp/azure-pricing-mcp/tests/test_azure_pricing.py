@@ -1,20 +1,33 @@
 """Comprehensive tests for Azure Pricing MCP Server."""
 
+import asyncio
+import json
+from functools import partial
+from pathlib import Path
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import aiohttp
 import pytest
 from mcp.types import TextContent
 
 from azure_pricing_mcp.handlers import (
+    _handle_bicep_cost_estimate,
     _handle_cost_estimate,
+    _handle_cost_estimate_batch,
     _handle_customer_discount,
     _handle_discover_skus,
     _handle_price_compare,
     _handle_price_search,
+    _handle_region_recommend,
     _handle_sku_discovery,
+    _handle_workload_region_optimize,
 )
-from azure_pricing_mcp.server import AzurePricingServer
+from azure_pricing_mcp.models import REGION_RANKING_FIELDS, PriceItem
+from azure_pricing_mcp.planner import plan_folded_queries
+from azure_pricing_mcp.ranking import RegionRanking
+from azure_pricing_mcp.server import AZURE_PRICING_BASE_URL, MAX_PAGES_PER_QUERY, AzurePricingServer
+from azure_pricing_mcp.streaming import ItemStreamParser
 
 
 @pytest.fixture
@@ -83,6 +96,31 @@ def mock_pricing_response_with_savings() -> dict[str, Any]:
     }
 
 
+def _streaming_session(*pages: dict[str, Any], chunk_size: int = 64, pause: bool = False) -> MagicMock:
+    """Session whose successive GETs stream the given pages' JSON bodies in small chunks (optionally pausing)."""
+
+    def respond(*args, **kwargs):
+        body = json.dumps(pages[session.get.call_count - 1]).encode()
+
+        async def iter_chunked(size):
+            for start in range(0, len(body), chunk_size):
+                if pause:
+                    await asyncio.sleep(0)
+                yield body[start : start + chunk_size]
+
+        response = MagicMock(status=200)
+        response.content.iter_chunked = iter_chunked
+        response.json = AsyncMock(side_effect=lambda loads: loads(body))
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+    session = MagicMock()
+    session.get.side_effect = respond
+    return session
+
+
 @pytest.fixture
 async def pricing_server():
     """Create a pricing server instance for testing."""
@@ -181,12 +219,12 @@ class TestAzurePricingServer:
     @pytest.mark.asyncio
     async def test_compare_prices_across_regions(self, pricing_server, mock_pricing_response):
         """Test price comparison across regions."""
-        with patch.object(pricing_server, "search_azure_prices") as mock_search:
-            mock_search.return_value = {
-                "items": [mock_pricing_response["Items"][0]],
-                "count": 1,
-            }
-
+        item = mock_pricing_response["Items"][0]
+        folded_response = {
+            "Items": [item, {**item, "armRegionName": "westus", "retailPrice": 0.1}],
+            "NextPageLink": None,
+        }
+        with patch.object(pricing_server, "_make_request", return_value=folded_response) as mock_request:
             result = await pricing_server.compare_prices(
                 service_name="Virtual Machines",
                 sku_name="D4s v3",
@@ -194,8 +232,83 @@ class TestAzurePricingServer:
             )
 
             assert result["comparison_type"] == "regions"
-            assert len(result["comparisons"]) == 2
-            assert mock_search.call_count == 2
+            assert [c["region"] for c in result["comparisons"]] == ["eastus", "westus"]
+            # Both regions are answered by a single folded query
+            assert mock_request.call_count == 1
+            assert "(armRegionName eq 'eastus' or armRegionName eq 'westus')" in mock_request.call_args[0][1]["$filter"]
+
+    @pytest.mark.asyncio
+    async def test_compare_prices_quotes_folded_literals(self, pricing_server):
+        """Test quotes in the service or SKU name are escaped in the folded filter."""
+        empty_response = {"Items": [], "NextPageLink": None}
+        with patch.object(pricing_server, "_make_request", return_value=empty_response) as mock_request:
+            await pricing_server.compare_prices(
+                service_name="Bob's Service", sku_name="O'Brien", regions=["eastus", "westus"]
+            )
+
+        assert mock_request.call_args[0][1]["$filter"].startswith(
+            "serviceName eq 'Bob''s Service' and contains(skuName, 'O''Brien') and "
+        )
+
+    @pytest.mark.asyncio
+    async def test_fetch_folded_queries_regions_past_the_page_cap(self, pricing_server, mock_pricing_response):
+        """Test regions a folded query did not reach before the page cap are queried one by one."""
+        item = mock_pricing_response["Items"][0]
+        westus = {**item, "armRegionName": "westus"}
+        pages = [{"Items": [item], "NextPageLink": "https://next/1"}, {"Items": [westus], "NextPageLink": None}]
+        query = plan_folded_queries(
+            AZURE_PRICING_BASE_URL, {"currencyCode": "USD"}, [((), "eastus"), ((), "westus"), ((), "uksouth")]
+        )[0]
+
+        with patch.object(pricing_server, "_make_request", side_effect=[*pages, pages[1]]) as mock_request:
+            by_region = await pricing_server.fetch_folded(query, max_pages=1)
+
+        assert by_region == {"eastus": [item], "westus": [westus], "uksouth": []}
+        assert [call.args[1]["$filter"] for call in mock_request.call_args_list[1:]] == [
+            "armRegionName eq 'westus'",
+            "armRegionName eq 'uksouth'",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_compare_prices_falls_back_to_per_region_lookups(self, pricing_server, mock_pricing_response):
+        """Test a failed folded query is retried region by region."""
+        with (
+            patch.object(pricing_server, "fetch_folded", side_effect=RuntimeError("upstream error")),
+            patch.object(pricing_server, "search_azure_prices") as mock_search,
+        ):
+            mock_search.return_value = {"items": [mock_pricing_response["Items"][0]], "count": 1}
+            result = await pricing_server.compare_prices(
+                service_name="Virtual Machines", sku_name="D4s v3", regions=["eastus", "westus"]
+            )
+
+        assert len(result["comparisons"]) == 2
+        assert mock_search.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_compare_prices_fans_out_concurrently(self, pricing_server, mock_pricing_response):
+        """Test regions are looked up in parallel within the concurrency limit, skipping failures."""
+        active = 0
+        peak = 0
+
+        async def fake_search(region, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if region == "brokenregion":
+                raise RuntimeError("upstream error")
+            return {"items": [{**mock_pricing_response["Items"][0], "armRegionName": region}], "count": 1}
+
+        regions = ["eastus", "westus", "brokenregion", "northeurope", "westeurope", "uksouth"]
+        with patch.object(pricing_server, "search_azure_prices", side_effect=fake_search):
+            result = await pricing_server.compare_prices(
+                service_name="Virtual Machines", regions=regions, max_concurrency=3
+            )
+
+        assert peak == 3
+        assert sorted(c["region"] for c in result["comparisons"]) == sorted(set(regions) - {"brokenregion"})
+        assert all(c["latency_ms"] >= 0 for c in result["comparisons"])
 
     @pytest.mark.asyncio
     async def test_estimate_costs(self, pricing_server, mock_pricing_response_with_savings):
@@ -253,7 +366,8 @@ class TestAzurePricingServer:
             "Count": 2,
         }
 
-        with patch.object(pricing_server, "_make_request", return_value=mock_response):
+        session = _streaming_session(mock_response)
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
             result = await pricing_server.discover_skus(service_name="Virtual Machines", limit=100)
 
             assert result["total_skus"] == 2
@@ -263,18 +377,41 @@ class TestAzurePricingServer:
     @pytest.mark.asyncio
     async def test_discover_service_skus_exact_match(self, pricing_server, mock_pricing_response):
         """Test SKU discovery with exact service match."""
-        with patch.object(pricing_server, "search_azure_prices_with_fuzzy_matching") as mock_search:
-            mock_search.return_value = {
+        with (
+            patch.object(pricing_server, "search_azure_prices") as mock_search,
+            patch.object(pricing_server, "search_azure_prices_with_fuzzy_matching") as mock_fuzzy,
+        ):
+            mock_search.return_value = {"items": [mock_pricing_response["Items"][0]], "count": 1}
+
+            result = await pricing_server.discover_service_skus(service_hint="vm", limit=30)
+
+            # The alias resolves locally, so a single targeted search is enough
+            mock_search.assert_called_once()
+            assert mock_search.call_args.kwargs["service_name"] == "Virtual Machines"
+            mock_fuzzy.assert_not_called()
+            assert result["service_found"] == "Virtual Machines"
+            assert result["original_search"] == "vm"
+            assert result["match_type"] == "registry_alias"
+            assert result["total_skus"] > 0
+
+    @pytest.mark.asyncio
+    async def test_discover_service_skus_falls_back_to_fuzzy_matching(self, pricing_server, mock_pricing_response):
+        """Test SKU discovery probes alternatives when the registry has no good match."""
+        with (
+            patch.object(pricing_server, "search_azure_prices") as mock_search,
+            patch.object(pricing_server, "search_azure_prices_with_fuzzy_matching") as mock_fuzzy,
+        ):
+            mock_fuzzy.return_value = {
                 "items": [mock_pricing_response["Items"][0]],
                 "suggestion_used": "Virtual Machines",
                 "match_type": "exact_mapping",
             }
 
-            result = await pricing_server.discover_service_skus(service_hint="vm", limit=30)
+            result = await pricing_server.discover_service_skus(service_hint="quantum widgets", limit=30)
 
+            mock_search.assert_not_called()
             assert result["service_found"] == "Virtual Machines"
-            assert result["original_search"] == "vm"
-            assert result["total_skus"] > 0
+            assert result["match_type"] == "exact_mapping"
 
     @pytest.mark.asyncio
     async def test_get_customer_discount(self, pricing_server):
@@ -341,6 +478,663 @@ class TestAzurePricingServer:
             assert len(result["sku_validation"]["suggestions"]) > 0
 
 
+class TestPagination:
+    """Test NextPageLink handling."""
+
+    @staticmethod
+    def _pages() -> list[dict[str, Any]]:
+        return [
+            {"Items": [{"skuName": "A", "armRegionName": "eastus"}] * 3, "NextPageLink": "https://next/page2"},
+            {"Items": [{"skuName": "B", "armRegionName": "westus"}] * 3, "NextPageLink": None},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_iter_price_items_follows_next_page_link(self, pricing_server):
+        """Test items are yielded across pages."""
+        with patch.object(pricing_server, "_make_request", side_effect=self._pages()) as mock_request:
+            items = [item async for item in pricing_server.iter_price_items({"$filter": "x"})]
+
+            assert len(items) == 6
+            assert mock_request.call_count == 2
+            # Follow-up pages use the link as-is, without re-sending params
+            assert mock_request.call_args_list[1].args == ("https://next/page2", None)
+
+    @pytest.mark.asyncio
+    async def test_iter_price_items_stops_early(self, pricing_server):
+        """Test pages beyond what the caller consumes are never fetched."""
+        with patch.object(pricing_server, "_make_request", side_effect=self._pages()) as mock_request:
+            items = [item async for item in pricing_server.iter_price_items({}, limit=2)]
+
+            assert len(items) == 2
+            assert mock_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_search_azure_prices_spans_pages(self, pricing_server):
+        """Test search collects items from several pages and reports has_more."""
+        with patch.object(pricing_server, "_make_request", side_effect=self._pages()):
+            result = await pricing_server.search_azure_prices(service_name="Virtual Machines", limit=4)
+
+            assert result["count"] == 4
+            assert result["has_more"] is True
+            assert [item["skuName"] for item in result["items"]] == ["A", "A", "A", "B"]
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_spans_pages(self, pricing_server):
+        """Test SKU discovery keeps paging until enough SKUs are found."""
+        session = _streaming_session(*self._pages())
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            result = await pricing_server.discover_skus(service_name="Virtual Machines", limit=2)
+
+            assert [sku["sku_name"] for sku in result["skus"]] == ["A", "B"]
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_pages_past_repeated_skus(self, pricing_server):
+        """Test pages of meters for known SKUs do not end the listing."""
+        pages = [
+            {"Items": [{"serviceName": "Virtual Machines", "skuName": "A"}] * 3, "NextPageLink": f"https://next/{i}"}
+            for i in range(2)
+        ]
+        pages.append({"Items": [{"serviceName": "Virtual Machines", "skuName": "B"}], "NextPageLink": None})
+        session = _streaming_session(*pages)
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            result = await pricing_server.discover_skus(service_name="Virtual Machines", limit=100)
+
+        assert [sku["sku_name"] for sku in result["skus"]] == ["A", "B"]
+        assert result["has_more"] is False
+        assert session.get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_reports_the_page_cap(self, pricing_server):
+        """Test a listing cut off by the page cap says more SKUs may exist."""
+        pages = [
+            {"Items": [{"serviceName": "Virtual Machines", "skuName": "A"}], "NextPageLink": f"https://next/{i}"}
+            for i in range(MAX_PAGES_PER_QUERY + 1)
+        ]
+        session = _streaming_session(*pages)
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            result = await pricing_server.discover_skus(service_name="Virtual Machines", limit=100)
+            limited = await pricing_server.discover_skus(service_name="Virtual Machines", limit=1)
+
+        assert session.get.call_count == MAX_PAGES_PER_QUERY
+        assert result["has_more"] is True
+        assert limited["has_more"] is True
+
+
+class TestRequestCoalescing:
+    """Test single-flight coalescing of identical upstream requests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_fetch(self, pricing_server):
+        """Test concurrent callers for the same query await a single fetch."""
+        calls = 0
+
+        async def fake_fetch(url, params, cache_key, max_retries=3, fields=None):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"Items": [{"skuName": "A"}]}
+
+        before = AzurePricingServer.get_request_stats()["coalesced_requests"]
+        params = {"$filter": "serviceName eq 'Coalesce Test'"}
+        with patch.object(pricing_server, "_fetch", side_effect=fake_fetch):
+            results = await asyncio.gather(
+                *(pricing_server._make_request("https://test.com/coalesce", params) for _ in range(5))
+            )
+
+        assert calls == 1
+        assert all(result == {"Items": [{"skuName": "A"}]} for result in results)
+        stats = AzurePricingServer.get_request_stats()
+        assert stats["coalesced_requests"] - before == 4
+        assert stats["in_flight_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_streams_of_a_page_share_one_fetch(self, pricing_server):
+        """Test a page being streamed is joined by an identical request rather than fetched twice."""
+        page = {"Items": [{"skuName": "A"}, {"skuName": "B"}], "NextPageLink": None}
+        session = _streaming_session(page, page, chunk_size=8, pause=True)
+        params = {"$filter": "serviceName eq 'Stream Coalesce Test'"}
+
+        async def skus():
+            return [item["skuName"] async for item in pricing_server.iter_streamed_items(params)]
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            results = await asyncio.gather(skus(), skus())
+
+        assert results == [["A", "B"], ["A", "B"]]
+        assert session.get.call_count == 1
+        assert AzurePricingServer.get_request_stats()["in_flight_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_lets_joined_request_fetch_the_page(self, pricing_server):
+        """Test a request that joined a stream stopped early fetches the page itself."""
+        page = {"Items": [{"skuName": "A"}, {"skuName": "B"}], "NextPageLink": None}
+        session = _streaming_session(page, page, chunk_size=8, pause=True)
+        params = {"$filter": "serviceName eq 'Stream Abandon Test'"}
+
+        async def skus(limit=None):
+            return [item["skuName"] async for item in pricing_server.iter_streamed_items(params, limit=limit)]
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            results = await asyncio.gather(skus(limit=1), skus())
+
+        assert results == [["A"], ["A", "B"]]
+        assert session.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_is_logged(self, pricing_server, caplog):
+        """Test a failed streamed page is logged like any other request."""
+        session = MagicMock()
+        session.get.side_effect = aiohttp.ClientConnectionError("connection reset")
+        params = {"$filter": "serviceName eq 'Stream Failure Test'"}
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            with pytest.raises(aiohttp.ClientConnectionError):
+                async for _ in pricing_server.iter_streamed_items(params):
+                    pass
+
+        assert "HTTP request failed: connection reset" in caplog.text
+        assert AzurePricingServer.get_request_stats()["in_flight_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_request(self, pricing_server):
+        """Test a cancelled caller leaves the shared request running for others."""
+
+        async def fake_fetch(url, params, cache_key, max_retries=3, fields=None):
+            await asyncio.sleep(0.02)
+            return {"Items": []}
+
+        with patch.object(pricing_server, "_fetch", side_effect=fake_fetch):
+            first = asyncio.ensure_future(pricing_server._make_request("https://test.com/cancel"))
+            second = asyncio.ensure_future(pricing_server._make_request("https://test.com/cancel"))
+            await asyncio.sleep(0)
+            first.cancel()
+
+            assert await second == {"Items": []}
+            assert first.cancelled()
+
+
+class TestFieldProjection:
+    """Test pages fetched for a subset of item fields."""
+
+    FULL_ITEM = {
+        "skuName": "D4s v5",
+        "armRegionName": "eastus",
+        "retailPrice": 0.192,
+        "meterId": "m-1",
+        "savingsPlan": [{"term": "1 Year", "retailPrice": 0.15}],
+    }
+    FIELDS = frozenset({"skuName", "armRegionName", "retailPrice"})
+
+    @staticmethod
+    def _session(page: dict[str, Any]) -> MagicMock:
+        response = MagicMock(status=200)
+        response.json = AsyncMock(side_effect=lambda loads: loads(json.dumps(page)))
+        session = MagicMock()
+        session.get.return_value.__aenter__ = AsyncMock(return_value=response)
+        session.get.return_value.__aexit__ = AsyncMock(return_value=False)
+        return session
+
+    @pytest.mark.asyncio
+    async def test_projected_page_is_decoded_and_cached_with_only_those_fields(self, pricing_server):
+        session = self._session({"Items": [dict(self.FULL_ITEM)], "NextPageLink": None})
+        params = {"$filter": "serviceName eq 'Projection Test'"}
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            page = await pricing_server._make_request("https://test.com/project", params, fields=self.FIELDS)
+
+        assert page["Items"] == [{"skuName": "D4s v5", "armRegionName": "eastus", "retailPrice": 0.192}]
+        assert isinstance(page["Items"][0], PriceItem)
+        cache = AzurePricingServer._cache
+        assert pricing_server._cache_key("https://test.com/project", params, self.FIELDS) in cache
+        assert pricing_server._cache_key("https://test.com/project", params) not in cache
+
+    @pytest.mark.asyncio
+    async def test_cached_full_page_answers_a_projection(self, pricing_server):
+        params = {"$filter": "serviceName eq 'Projection Test'"}
+        full_page = {"Items": [PriceItem.from_dict(self.FULL_ITEM)], "NextPageLink": None}
+        AzurePricingServer._cache[pricing_server._cache_key("https://test.com/full", params)] = full_page
+
+        with patch.object(pricing_server, "_fetch") as mock_fetch:
+            page = await pricing_server._make_request("https://test.com/full", params, fields=self.FIELDS)
+
+        mock_fetch.assert_not_called()
+        assert set(page["Items"][0]) == self.FIELDS
+        assert set(full_page["Items"][0]) == set(self.FULL_ITEM)
+
+    @pytest.mark.asyncio
+    async def test_folded_region_discovery_fetches_only_ranking_fields(self, pricing_server, tmp_path):
+        page = {"Items": [dict(self.FULL_ITEM, serviceName="Virtual Machines")], "NextPageLink": None}
+        policy = tmp_path / "constraints.json"
+        policy.write_text(json.dumps({"allowedRegions": ["eastus", "westus"]}))
+
+        session = _streaming_session(page)
+        AzurePricingServer.configure_region_policy(str(policy))
+        try:
+            with (
+                patch.object(pricing_server, "get_session", AsyncMock(return_value=session)),
+                patch("azure_pricing_mcp.server.ItemStreamParser", wraps=ItemStreamParser) as parser,
+            ):
+                result = await pricing_server.recommend_regions("Virtual Machines", "D4s v5")
+        finally:
+            AzurePricingServer.configure_region_policy(None)
+
+        # An "or" of regions cannot be kept as a result set, so nothing needs whole items
+        parser.assert_called_once_with(REGION_RANKING_FIELDS)
+        assert result["recommendations"][0]["region"] == "eastus"
+        # Projected pages are not fed to the indexes, which need whole items
+        assert AzurePricingServer._sku_index.skus("Virtual Machines") == []
+
+    @pytest.mark.asyncio
+    async def test_recommend_regions_keeps_its_result_set_for_estimates(self, pricing_server):
+        page = {"Items": [dict(self.FULL_ITEM, serviceName="Virtual Machines")], "NextPageLink": None}
+
+        # The "D4s_v5" spelling matches nothing, "D4s v5" does
+        session = _streaming_session({"Items": [], "NextPageLink": None}, page)
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            await pricing_server.recommend_regions("Virtual Machines", "D4s v5")
+            estimate = await pricing_server.estimate_costs("Virtual Machines", "D4s v5", "eastus")
+
+        assert session.get.call_count == 2
+        assert estimate["on_demand_pricing"]["hourly_rate"] == 0.192
+        assert estimate["savings_plans"][0]["term"] == "1 Year"
+
+
+class TestRegionPolicy:
+    """Test limiting region recommendations to the regions governance permits."""
+
+    ITEMS = [
+        {
+            "armRegionName": region,
+            "location": region,
+            "retailPrice": price,
+            "skuName": "D4s v5",
+            "unitOfMeasure": "1 Hour",
+        }
+        for region, price in [("eastus", 0.2), ("westeurope", 0.25), ("swedencentral", 0.22), ("westus", 0.1)]
+    ]
+
+    @pytest.fixture(autouse=True)
+    def workspace_root(self, tmp_path):
+        AzurePricingServer.configure_workspace_root(str(tmp_path))
+        yield
+        AzurePricingServer.configure_workspace_root(None)
+
+    @pytest.fixture
+    def constraints(self, tmp_path):
+        path = tmp_path / "04-governance-constraints.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "constraints": {
+                        "network": {"allowedRegions": ["East US", "westeurope", "swedencentral"]},
+                        "deniedRegions": ["westeurope"],
+                    }
+                }
+            )
+        )
+        return str(path)
+
+    @pytest.mark.asyncio
+    async def test_allowed_regions_are_pushed_into_the_filter(self, pricing_server, constraints):
+        session = _streaming_session({"Items": self.ITEMS, "NextPageLink": None})
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            result = await pricing_server.recommend_regions("Virtual Machines", "D4s v5", constraints_file=constraints)
+
+        request_filter = session.get.call_args.kwargs["params"]["$filter"]
+        assert "(armRegionName eq 'eastus' or armRegionName eq 'swedencentral')" in request_filter
+        assert "westeurope" not in request_filter
+        assert [rec["region"] for rec in result["recommendations"]] == ["eastus", "swedencentral"]
+        assert result["region_policy"]["allowed_regions"] == ["eastus", "swedencentral"]
+
+    @pytest.mark.asyncio
+    async def test_handler_names_the_policy(self, pricing_server, constraints):
+        session = _streaming_session({"Items": self.ITEMS, "NextPageLink": None})
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            result = await _handle_region_recommend(
+                pricing_server,
+                {"service_name": "Virtual Machines", "sku_name": "D4s v5", "constraints_file": constraints},
+            )
+
+        assert f"🛡️ Region policy ({constraints}): allowed eastus, swedencentral; denied westeurope" in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_configured_policy_applies_to_workload_optimization(self, pricing_server, constraints):
+        AzurePricingServer.configure_region_policy(constraints)
+        try:
+            with patch.object(
+                pricing_server, "_discover_region_prices", side_effect=TestWorkloadOptimization()._discover
+            ):
+                result = await pricing_server.optimize_workload_region(TestWorkloadOptimization.RESOURCES)
+        finally:
+            AzurePricingServer.configure_region_policy(None)
+
+        assert [rec["region"] for rec in result["recommendations"]] == ["eastus"]
+        assert result["partial_regions"] == []
+        assert result["region_policy"]["denied_regions"] == ["westeurope"]
+
+    @pytest.mark.asyncio
+    async def test_policy_permitting_no_region(self, pricing_server, tmp_path):
+        path = tmp_path / "constraints.json"
+        path.write_text(json.dumps({"allowedLocations": ["westeurope"], "deniedLocations": ["West Europe"]}))
+
+        with patch.object(pricing_server, "get_session") as mock_session:
+            result = await pricing_server.recommend_regions("Virtual Machines", "D4s v5", constraints_file=str(path))
+
+        mock_session.assert_not_called()
+        assert result["error"] == "The region policy permits no regions"
+
+    @pytest.mark.asyncio
+    async def test_constraints_outside_the_workspace_root_are_not_read(self, pricing_server, tmp_path):
+        (tmp_path.parent / "constraints.json").write_text(json.dumps({"allowedRegions": ["westus"]}))
+
+        with patch("azure_pricing_mcp.server.load_region_policy") as load:
+            result = await pricing_server.recommend_regions(
+                "Virtual Machines", "D4s v5", constraints_file="../constraints.json"
+            )
+
+        load.assert_not_called()
+        assert result == {
+            "error": f"../constraints.json is outside the workspace root {tmp_path}",
+            "recommendations": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_missing_constraints_file_is_a_tool_error(self, pricing_server, tmp_path):
+        with patch.object(pricing_server, "get_session") as mock_session:
+            recommended = await pricing_server.recommend_regions(
+                "Virtual Machines", "D4s v5", constraints_file="missing.json"
+            )
+            optimized = await pricing_server.optimize_workload_region(
+                [{"service_name": "Virtual Machines", "sku_name": "D4s v5"}], constraints_file="missing.json"
+            )
+
+        mock_session.assert_not_called()
+        for result in (recommended, optimized):
+            assert result["recommendations"] == []
+            assert "missing.json" in result["error"]
+
+
+class TestStreamedItems:
+    """Test items yielded while page bodies stream in."""
+
+    PAGES = [
+        {"Items": [{"serviceName": "Virtual Machines", "skuName": "A"}] * 3, "NextPageLink": "https://next/page2"},
+        {"Items": [{"serviceName": "Virtual Machines", "skuName": "B"}] * 3, "NextPageLink": None},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_streamed_pages_are_cached_and_observed(self, pricing_server):
+        params = {"$filter": "serviceName eq 'Virtual Machines'"}
+        session = _streaming_session(*self.PAGES)
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            items = [item async for item in pricing_server.iter_streamed_items(params)]
+            again = [item async for item in pricing_server.iter_streamed_items(params)]
+
+        assert [item["skuName"] for item in items] == ["A"] * 3 + ["B"] * 3
+        assert again == items
+        assert session.get.call_count == 2
+        assert session.get.call_args_list[1].args == ("https://next/page2",)
+        assert AzurePricingServer._sku_index.skus("Virtual Machines") == ["A", "B"]
+        assert AzurePricingServer.get_request_stats()["streamed_pages"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_stops_reading_at_the_limit(self, pricing_server):
+        session = _streaming_session(*self.PAGES)
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            items = [item async for item in pricing_server.iter_streamed_items({"$filter": "x"}, limit=2)]
+
+        assert len(items) == 2
+        assert session.get.call_count == 1
+        # A page abandoned part-way is not cached
+        assert pricing_server._cache_key("https://prices.azure.com/api/retail/prices", {"$filter": "x"}) not in (
+            AzurePricingServer._cache
+        )
+
+    @pytest.mark.asyncio
+    async def test_complete_streams_answer_narrower_queries(self, pricing_server):
+        params = {"$filter": "serviceName eq 'Virtual Machines'"}
+        narrower = {"$filter": "serviceName eq 'Virtual Machines' and skuName eq 'B'"}
+        # The second page is abandoned part-way by the first stream and fetched again
+        session = _streaming_session(*self.PAGES, self.PAGES[1])
+
+        with patch.object(pricing_server, "get_session", AsyncMock(return_value=session)):
+            [item async for item in pricing_server.iter_streamed_items(params, limit=4)]
+            assert AzurePricingServer._query_cache.stats()["result_sets"] == 0
+
+            [item async for item in pricing_server.iter_streamed_items(params, fields=frozenset({"skuName"}))]
+            items = [item async for item in pricing_server.iter_streamed_items(narrower)]
+
+        assert [item["skuName"] for item in items] == ["B"] * 3
+        assert items[0]["serviceName"] == "Virtual Machines"
+        assert session.get.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cached_pages_are_not_refetched(self, pricing_server):
+        params = {"$filter": "x"}
+        key = pricing_server._cache_key("https://prices.azure.com/api/retail/prices", params)
+        AzurePricingServer._cache[key] = {"Items": [{"skuName": "Cached"}], "NextPageLink": None}
+
+        with patch.object(pricing_server, "get_session") as mock_session:
+            items = [item async for item in pricing_server.iter_streamed_items(params)]
+
+        mock_session.assert_not_called()
+        assert items == [{"skuName": "Cached"}]
+
+
+class TestWorkloadOptimization:
+    """Test ranking regions by the total cost of several SKUs."""
+
+    PRICES = {
+        "D4s v5": [("eastus", 0.2, "1 Hour"), ("westus", 0.25, "1 Hour"), ("uksouth", 0.3, "1 Hour")],
+        "P10": [("eastus", 20.0, "1/Month"), ("westus", 10.0, "1/Month")],
+        "Hot LRS": [("eastus", 0.02, "1 GB/Month"), ("westus", 0.02, "1 GB/Month"), ("uksouth", 0.02, "1 GB/Month")],
+    }
+
+    async def _discover(self, service_name, search_terms, currency_code="USD", policy=None):
+        ranking = RegionRanking(policy.permits if policy else None)
+        for region, price, unit in self.PRICES.get(search_terms[-1], []):
+            ranking.add(
+                {"armRegionName": region, "location": region.upper(), "retailPrice": price, "unitOfMeasure": unit}
+            )
+        return ranking
+
+    RESOURCES = [
+        {"service_name": "Virtual Machines", "sku_name": "D4s v5", "quantity": 2},
+        {"service_name": "Storage", "sku_name": "P10", "quantity": 3},
+        {"service_name": "Storage", "sku_name": "Hot LRS", "quantity": 500},
+        {"service_name": "Virtual Machines", "sku_name": "D4s v5", "hours_per_month": 100},
+        {"service_name": "Virtual Machines", "sku_name": "Nope"},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_ranks_regions_by_total_monthly_cost(self, pricing_server):
+        with patch.object(pricing_server, "_discover_region_prices", side_effect=self._discover) as mock_discover:
+            result = await pricing_server.optimize_workload_region(self.RESOURCES)
+
+        # Each distinct SKU is priced once
+        assert mock_discover.call_count == 4
+        assert [rec["region"] for rec in result["recommendations"]] == ["eastus", "westus"]
+        eastus = result["recommendations"][0]
+        assert eastus["line_costs"] == [292.0, 60.0, 10.0, 20.0]
+        assert eastus["monthly_cost"] == 382.0
+        assert result["summary"]["max_monthly_savings"] == 48.0
+        assert result["partial_regions"] == [
+            {"region": "uksouth", "monthly_cost_available": 478.0, "location": "UKSOUTH", "missing": ["P10"]}
+        ]
+        assert result["unpriced_resources"][0]["sku_name"] == "Nope"
+        assert result["total_regions_found"] == 3
+        assert result["complete_regions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_handler_renders_the_ranking(self, pricing_server):
+        with patch.object(pricing_server, "_discover_region_prices", side_effect=self._discover):
+            result = await _handle_workload_region_optimize(
+                pricing_server, {"resources": self.RESOURCES, "discount_percentage": 10}
+            )
+
+        text = result[0].text
+        assert "Regions offering every resource: 2 of 3" in text
+        assert "No pricing found for: Nope (Virtual Machines)" in text
+        assert "$343.80" in text
+        assert "UKSOUTH (uksouth): missing P10" in text
+
+
+class TestBatchCostEstimate:
+    """Test pricing a bill of materials in one call."""
+
+    PRICES = {
+        "D4s v5": [
+            {"skuName": "D4s v5 Spot", "retailPrice": 0.05, "unitOfMeasure": "1 Hour"},
+            {"skuName": "D4s v5", "retailPrice": 0.2, "unitOfMeasure": "1 Hour", "productName": "Dsv5 Series"},
+        ],
+        "Standard": [{"skuName": "Standard", "retailPrice": 9.0, "unitOfMeasure": "1/Month"}],
+    }
+
+    LINE_ITEMS = [
+        {"service_name": "Virtual Machines", "sku_name": "D4s v5", "region": "westeurope", "quantity": 2},
+        {"service_name": "Virtual Machines", "sku_name": "D4s v5", "region": "swedencentral"},
+        {"service_name": "Virtual Machines", "sku_name": "D4s v5", "region": "WestEurope", "hours_per_month": 100},
+        {"service_name": "Azure Static Web Apps", "sku_name": "Standard", "region": "westeurope", "description": "Web"},
+        {"service_name": "Virtual Machines", "sku_name": "Nope", "region": "westeurope"},
+    ]
+
+    async def _fetch_folded(self, query, max_pages=20):
+        sku = next(condition for condition in query.conditions if condition.startswith("contains"))
+        items = next((items for name, items in self.PRICES.items() if f"'{name}'" in sku), [])
+        return {region: [{**item, "armRegionName": region} for item in items] for region in query.values}
+
+    @pytest.mark.asyncio
+    async def test_dedupes_and_folds_lookups(self, pricing_server):
+        with patch.object(pricing_server, "fetch_folded", side_effect=self._fetch_folded) as mock_fetch:
+            result = await pricing_server.estimate_costs_batch(self.LINE_ITEMS)
+
+        assert result["lookups"] == {"line_items": 5, "distinct_lookups": 4, "upstream_queries": 3}
+        assert mock_fetch.call_args_list[0].args[0].values == ["westeurope", "swedencentral"]
+        assert "priceType eq 'Consumption'" in mock_fetch.call_args_list[0].args[0].params["$filter"]
+        assert [line.get("monthly_cost") for line in result["lines"]] == [292.0, 146.0, 20.0, 9.0, None]
+        assert result["lines"][0]["matched_sku"] == "D4s v5"
+        assert result["lines"][3]["description"] == "Web"
+        assert result["unpriced_lines"] == [5]
+        assert result["totals"] == {
+            "monthly_cost": 467.0,
+            "yearly_cost": 5604.0,
+            "by_service": {"Virtual Machines": 458.0, "Azure Static Web Apps": 9.0},
+            "by_region": {"westeurope": 321.0, "swedencentral": 146.0},
+        }
+
+    @pytest.mark.asyncio
+    async def test_incomplete_lines_and_missing_regions_are_unpriced(self, pricing_server):
+        async def fetch_folded(query, max_pages=20):
+            found = await self._fetch_folded(query)
+            found.pop("swedencentral", None)
+            return found
+
+        line_items = [*self.LINE_ITEMS[:2], {"service_name": "Virtual Machines", "sku_name": "D4s v5"}]
+        with patch.object(pricing_server, "fetch_folded", side_effect=fetch_folded):
+            result = await pricing_server.estimate_costs_batch(line_items)
+
+        assert [line.get("monthly_cost") for line in result["lines"]] == [292.0, None, None]
+        assert result["lines"][1]["error"] == "No pricing found for D4s v5 in swedencentral"
+        assert result["lines"][2]["error"] == "No pricing found for D4s v5 in None"
+        assert result["lookups"]["distinct_lookups"] == 2
+
+    @pytest.mark.asyncio
+    async def test_handler_renders_totals_and_lines(self, pricing_server):
+        with patch.object(pricing_server, "fetch_folded", side_effect=self._fetch_folded):
+            result = await _handle_cost_estimate_batch(
+                pricing_server, {"line_items": self.LINE_ITEMS, "discount_percentage": 10}
+            )
+
+        text = result[0].text
+        assert "| **Total** | **$420.30** | **$5,043.60** |" in text
+        assert "| 4 | Web (Azure Static Web Apps Standard) | westeurope | 1 | $8.100000/1/Month | $8.10 |" in text
+        assert "No pricing found for line(s) 5" in text
+
+
+class TestBicepCostEstimate:
+    """Test pricing the resources Bicep templates deploy."""
+
+    TEMPLATES = Path(__file__).resolve().parents[3] / "infra" / "bicep" / "rebel-tactical"
+
+    @pytest.fixture(autouse=True)
+    def workspace_root(self):
+        yield AzurePricingServer.configure_workspace_root(str(self.TEMPLATES.parents[2]))
+        AzurePricingServer.configure_workspace_root(None)
+
+    async def _fetch_folded(self, query, max_pages=20):
+        prices = {"'Pay-as-you-go'": 2.3, "'Standard'": 9.0}
+        sku = next(condition for condition in query.conditions if condition.startswith("contains"))
+        price = next((price for name, price in prices.items() if name in sku), None)
+        if price is None:
+            return {}
+        item = {"skuName": sku.split("'")[1], "retailPrice": price, "unitOfMeasure": "1/Month"}
+        return {region: [{**item, "armRegionName": region}] for region in query.values}
+
+    @pytest.mark.asyncio
+    async def test_prices_the_repository_templates(self, pricing_server):
+        with patch.object(pricing_server, "fetch_folded", side_effect=self._fetch_folded) as mock_fetch:
+            result = await pricing_server.estimate_bicep_costs([str(self.TEMPLATES)])
+
+        assert [(line["service_name"], line["sku_name"], line["region"]) for line in result["lines"]] == [
+            ("Static Web Apps", "Standard", "westeurope"),
+        ]
+        assert result["totals"]["monthly_cost"] == 9.0
+        assert mock_fetch.call_count == 1
+        assert len(result["scan"]["files"]) == 5
+        skipped = {entry["resource"]: entry["reason"] for entry in result["scan"]["skipped"]}
+        assert set(skipped) == {
+            "main.bicep:resourceGroup",
+            "app-insights.bicep:applicationInsights",
+            "log-analytics.bicep:logAnalyticsWorkspace",
+            "static-web-app.bicep:staticWebAppSettings",
+        }
+        assert skipped["log-analytics.bicep:logAnalyticsWorkspace"].startswith(
+            "needs usage quantity: Log Analytics Pay-as-you-go in westeurope is billed per GB ingested"
+        )
+        assert AzurePricingServer.get_request_stats()["bicep_scanner"]["cached_files"] == 5
+
+    @pytest.mark.asyncio
+    async def test_no_billable_resources(self, pricing_server, tmp_path):
+        (tmp_path / "main.bicep").write_text("param location string = resourceGroup().location\n")
+
+        AzurePricingServer.configure_workspace_root(str(tmp_path))
+        result = await pricing_server.estimate_bicep_costs(["."])
+
+        assert "No billable resources" in result["error"]
+        assert await pricing_server.estimate_bicep_costs([str(tmp_path / "missing")]) == {
+            "error": f"No Bicep files found in {tmp_path / 'missing'}",
+            "scan": {
+                "files": [],
+                "resources": 0,
+                "skipped": [],
+                "warnings": [f"{tmp_path / 'missing'}: No such file or directory"],
+            },
+        }
+
+    @pytest.mark.asyncio
+    async def test_paths_outside_the_workspace_root_are_rejected(self, pricing_server, tmp_path):
+        AzurePricingServer.configure_workspace_root(str(tmp_path / "infra"))
+
+        for path in ("../secrets", "/etc", str(self.TEMPLATES)):
+            result = await pricing_server.estimate_bicep_costs([path])
+            assert result["error"].startswith(f"{path} is outside the workspace root")
+            assert result["scan"]["files"] == []
+
+    @pytest.mark.asyncio
+    async def test_handler_renders_estimate_and_skipped_resources(self, pricing_server):
+        with patch.object(pricing_server, "fetch_folded", side_effect=self._fetch_folded):
+            result = await _handle_bicep_cost_estimate(pricing_server, {"paths": [str(self.TEMPLATES)]})
+
+        text = result[0].text
+        assert "Bicep Cost Estimate, 5 files (1 line items)" in text
+        assert "| **Total** | **$9.00** | **$108.00** |" in text
+        assert "| app-insights.bicep:applicationInsights | Microsoft.Insights/components |" in text
+
+
 class TestToolHandlers:
     """Test suite for tool handler functions."""
 
@@ -519,6 +1313,53 @@ class TestServiceNameMappings:
 
             assert mock_search.called
 
+    @pytest.mark.asyncio
+    async def test_similar_services_are_probed_concurrently_in_deterministic_order(self, pricing_server):
+        """Test candidate probes run in parallel, stop once enough match and keep sorted order."""
+        active = 0
+        peak = 0
+        names = ["Application Gateway", "Azure AI services", "Azure App Service", "Azure Cache for Redis"]
+
+        async def fake_search(service_name=None, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            # Later candidates answer first; the order of results must not depend on it
+            await asyncio.sleep(0.02 if service_name in names else 0.001)
+            active -= 1
+            has_prices = service_name != "Azure AI services"
+            return {"items": [{"serviceName": service_name}] if has_prices else [], "count": int(has_prices)}
+
+        with patch.object(pricing_server, "search_azure_prices", side_effect=fake_search):
+            result = await pricing_server._find_similar_services(service_name="a")
+
+        assert [s["service_name"] for s in result["suggestions"]] == [
+            "Application Gateway",
+            "Azure App Service",
+            "Azure Cache for Redis",
+            "Azure Functions",
+            "Azure Kubernetes Service",
+        ]
+        assert 1 < peak <= 4
+
+    @pytest.mark.asyncio
+    async def test_first_results_cancels_lookups_no_longer_needed(self):
+        """Test outstanding lookups are cancelled once enough results are in."""
+        finished = []
+
+        async def lookup(index):
+            await asyncio.sleep(10 if index >= 2 else 0)
+            finished.append(index)
+            return index
+
+        results = await asyncio.wait_for(
+            AzurePricingServer._first_results([partial(lookup, i) for i in range(6)], wanted=2), timeout=1
+        )
+        await asyncio.sleep(0)
+
+        assert results == [0, 1]
+        assert finished == [0, 1]
+
 
 class TestErrorHandling:
     """Test error handling scenarios."""
@@ -0,0 +1,177 @@
+"""Tests for the cross-caller micro-batcher."""
+
+import asyncio
+
+import pytest
+
+from azure_pricing_mcp.batcher import MicroBatcher
+from azure_pricing_mcp.server import AZURE_PRICING_BASE_URL, AzurePricingServer
+
+ITEMS = [
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "eastus", "type": "Consumption"},
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "westus2", "type": "Consumption"},
+    {"serviceName": "Virtual Machines", "skuName": "E8s v5", "armRegionName": "eastus", "type": "Reservation"},
+]
+BASE = {"api-version": "2023-01-01-preview", "currencyCode": "USD"}
+
+
+def _params(filter_text: str, top: int = 100, **extra) -> dict:
+    return {**BASE, "$filter": filter_text, "$top": str(top), **extra}
+
+
+class FakeUpstream:
+    def __init__(self, items=ITEMS, fail=False):
+        self.items = items
+        self.fail = fail
+        self.calls: list[dict | None] = []
+
+    async def __call__(self, url, params):
+        self.calls.append(params)
+        if self.fail:
+            raise RuntimeError("upstream error")
+        return {"Items": self.items, "NextPageLink": None}
+
+
+class TestMicroBatcher:
+    """Test merging, demultiplexing and fallbacks."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_request(self):
+        upstream = FakeUpstream()
+        batcher = MicroBatcher(upstream, AZURE_PRICING_BASE_URL, window=0.01)
+
+        d4s, eastus, e8s = await asyncio.gather(
+            batcher.submit(_params("contains(skuName, 'D4s')")),
+            batcher.submit(_params("armRegionName eq 'EastUS'", top=2)),
+            batcher.submit(_params("skuName eq 'E8s v5'")),
+        )
+
+        assert len(upstream.calls) == 1
+        assert upstream.calls[0]["$filter"] == (
+            "(contains(skuName, 'D4s')) or (armRegionName eq 'EastUS') or (skuName eq 'E8s v5')"
+        )
+        assert upstream.calls[0]["$top"] == "100"
+        assert d4s["Items"] == ITEMS[:2]
+        assert eastus["Items"] == [ITEMS[0], ITEMS[2]]
+        assert eastus["NextPageLink"] is None
+        assert e8s["Items"] == ITEMS[2:]
+        assert batcher.stats()["merged_requests"] == 3
+        assert batcher.stats()["upstream_requests_saved"] == 2
+
+    @pytest.mark.asyncio
+    async def test_different_currencies_are_not_merged(self):
+        batcher = MicroBatcher(FakeUpstream(), AZURE_PRICING_BASE_URL, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.submit(_params("skuName eq 'E8s v5'")),
+            batcher.submit({**_params("skuName eq 'E8s v5'"), "currencyCode": "EUR"}),
+        )
+
+        assert results == [None, None]
+        assert batcher.stats()["solo_requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting_for_the_window(self):
+        upstream = FakeUpstream()
+        batcher = MicroBatcher(upstream, AZURE_PRICING_BASE_URL, window=10, max_batch_size=2)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit(_params("skuName eq 'E8s v5'")), batcher.submit(_params("skuName eq 'D4s v5'"))
+            ),
+            timeout=1,
+        )
+
+        assert len(upstream.calls) == 1
+        assert [len(result["Items"]) for result in results] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_failed_or_oversized_merges_fall_back(self):
+        failing = MicroBatcher(FakeUpstream(fail=True), AZURE_PRICING_BASE_URL, window=0.01)
+        oversized = MicroBatcher(FakeUpstream(), AZURE_PRICING_BASE_URL, window=0.01, max_items=2)
+
+        for batcher in (failing, oversized):
+            results = await asyncio.gather(
+                batcher.submit(_params("skuName eq 'E8s v5'")), batcher.submit(_params("skuName eq 'D4s v5'"))
+            )
+            assert results == [None, None]
+            assert batcher.stats()["fallback_requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_merges_reaching_the_top_fall_back(self):
+        upstream = FakeUpstream()
+        batcher = MicroBatcher(upstream, AZURE_PRICING_BASE_URL, window=0.01)
+
+        results = await asyncio.gather(
+            batcher.submit(_params("contains(skuName, 'D4s')", top=2)),
+            batcher.submit(_params("skuName eq 'E8s v5'", top=1)),
+        )
+
+        # The merged $top of 2 was reached, so items may have been cut off
+        assert upstream.calls[0]["$top"] == "2"
+        assert results == [None, None]
+        assert batcher.stats()["merged_requests"] == 0
+        assert batcher.stats()["fallback_requests"] == 2
+
+    @pytest.mark.asyncio
+    async def test_callers_with_more_matches_than_their_top_fall_back(self):
+        batcher = MicroBatcher(FakeUpstream(), AZURE_PRICING_BASE_URL, window=0.01)
+
+        d4s, e8s = await asyncio.gather(
+            batcher.submit(_params("contains(skuName, 'D4s')", top=1)),
+            batcher.submit(_params("skuName eq 'E8s v5'")),
+        )
+
+        # Its own request would have linked to a next page
+        assert d4s is None
+        assert e8s["Items"] == ITEMS[2:]
+        assert batcher.stats()["fallback_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_price_type_lookups(self):
+        batcher = MicroBatcher(FakeUpstream(), AZURE_PRICING_BASE_URL, window=0.01)
+
+        consumption, reservation = await asyncio.gather(
+            batcher.submit(_params("skuName eq 'D4s v5' and priceType eq 'Consumption'")),
+            batcher.submit(_params("priceType eq 'Reservation'")),
+        )
+
+        assert consumption["Items"] == ITEMS[:2]
+        assert reservation["Items"] == ITEMS[2:]
+
+    @pytest.mark.asyncio
+    async def test_unbatchable_requests_are_passed_through(self):
+        batcher = MicroBatcher(FakeUpstream(), AZURE_PRICING_BASE_URL, window=0.01)
+
+        assert await batcher.submit(BASE) is None
+        assert await batcher.submit(_params("skuName eq 'x'", **{"$skip": "1000"})) is None
+        assert await batcher.submit(_params("retailPrice gt 1")) is None
+        assert await batcher.submit({**BASE, "$filter": "serviceName eq 'Virtual Machines'"}) is None
+
+
+class TestServerBatching:
+    """Test the batcher sits behind the response cache in AzurePricingServer."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_are_merged_and_cached(self):
+        server = AzurePricingServer()
+        upstream = FakeUpstream()
+        try:
+            batcher = AzurePricingServer.configure_batching(window_ms=10)
+            assert batcher is not None
+            batcher._fetch_page = upstream
+
+            d4s, e8s = await asyncio.gather(
+                server.search_azure_prices(service_name="Virtual Machines", sku_name="D4s", validate_sku=False),
+                server.search_azure_prices(service_name="Virtual Machines", sku_name="E8s", validate_sku=False),
+            )
+            again = await server.search_azure_prices(
+                service_name="Virtual Machines", sku_name="E8s", validate_sku=False
+            )
+        finally:
+            AzurePricingServer.configure_batching(0)
+
+        assert len(upstream.calls) == 1
+        assert d4s["items"] == ITEMS[:2]
+        assert e8s["items"] == again["items"] == ITEMS[2:]
+        assert AzurePricingServer.get_request_stats()["micro_batcher"] is None
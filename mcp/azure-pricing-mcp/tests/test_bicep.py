@@ -0,0 +1,265 @@
+"""Tests for the Bicep template scanner."""
+
+import os
+from dataclasses import replace
+
+from azure_pricing_mcp import bicep
+from azure_pricing_mcp.bicep import BicepScanner, evaluate, line_items, parse_file
+
+MAIN = """
+// Entry template; 'quotes' in comments are ignored
+param location string = 'westeurope'
+param env string = 'dev'
+param planSku string = 'P1v3'
+param zones int = 2
+
+var prefix = 'app-${env}'
+var url = 'https://example.com/a' // not a comment start inside the string
+
+resource plan 'Microsoft.Web/serverfarms@2023-12-01' = {
+  name: '${prefix}-plan'
+  location: location
+  sku: {
+    name: planSku
+    capacity: zones
+  }
+}
+
+resource existingVault 'Microsoft.KeyVault/vaults@2023-07-01' existing = {
+  name: 'kv-shared'
+}
+
+module vms 'modules/vm.bicep' = [for i in range(0, 3): {
+  name: 'vm-${i}'
+  params: {
+    location: location
+    size: 'Standard_D4s_v5'
+  }
+}]
+
+module registry 'br/public:avm/res/web/static-site:0.9.3' = {
+  name: 'swa'
+  params: {}
+}
+"""
+
+VM = """
+param location string = resourceGroup().location
+param size string
+param withDisk bool = false
+
+resource vm 'Microsoft.Compute/virtualMachines@2024-03-01' = {
+  name: 'vm'
+  location: location
+  properties: {
+    hardwareProfile: { vmSize: size }
+  }
+}
+
+resource ip 'Microsoft.Network/publicIPAddresses@2023-11-01' = if (withDisk) {
+  name: 'ip'
+  location: location
+  sku: { name: 'Standard', tier: 'Regional' }
+}
+"""
+
+
+def _write(root, files: dict[str, str]) -> None:
+    for name, text in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+
+class TestParse:
+    """Test reading declarations from one file."""
+
+    def test_declarations(self, tmp_path):
+        _write(tmp_path, {"main.bicep": MAIN})
+
+        parsed = parse_file(str(tmp_path / "main.bicep"))
+
+        assert parsed.params == {"location": "'westeurope'", "env": "'dev'", "planSku": "'P1v3'", "zones": "2"}
+        assert parsed.variables["url"] == "'https://example.com/a'"
+        assert [(r.symbol, r.target, r.existing) for r in parsed.resources] == [
+            ("plan", "Microsoft.Web/serverfarms", False),
+            ("existingVault", "Microsoft.KeyVault/vaults", True),
+        ]
+        assert [(m.symbol, m.count) for m in parsed.modules] == [("vms", 3), ("registry", 1)]
+        assert parsed.module_path("br/public:avm/res/web/static-site:0.9.3") is None
+
+    def test_evaluate(self):
+        scope = {"env": "prod", "count": 2}
+        assert evaluate("'rg-${env}-${count}'", scope) == "rg-prod-2"
+        assert evaluate("'it\\'s'", scope) == "it's"
+        assert evaluate("'${missing}'", scope) is None
+        assert evaluate("env", scope) == "prod"
+        assert evaluate("42", scope) == 42
+        assert evaluate("true", scope) is True
+        assert evaluate("resourceGroup().location", scope) is None
+        assert evaluate("env == 'prod' ? 'P1v3' : 'B1'", scope) is None
+
+
+class TestScan:
+    """Test resolving the resources a set of files deploys."""
+
+    def test_modules_receive_caller_values(self, tmp_path):
+        _write(tmp_path, {"main.bicep": MAIN, "modules/vm.bicep": VM})
+
+        scan = BicepScanner().scan([str(tmp_path)])
+
+        resources = {resource.symbol: resource for resource in scan.resources}
+        assert set(resources) == {"plan", "vm", "ip"}
+        assert (resources["plan"].sku, resources["plan"].location, resources["plan"].quantity) == (
+            "P1v3",
+            "westeurope",
+            2,
+        )
+        assert (resources["vm"].sku, resources["vm"].location, resources["vm"].count) == (
+            "Standard_D4s_v5",
+            "westeurope",
+            3,
+        )
+        assert resources["ip"].conditional
+        assert resources["vm"].deployment == os.path.join(str(tmp_path), "main.bicep")
+        assert scan.warnings == [
+            f"{tmp_path / 'main.bicep'}: module registry uses registry module br/public:avm/res/web/static-site:0.9.3"
+        ]
+
+    def test_bicepparam_overrides_defaults(self, tmp_path):
+        _write(
+            tmp_path,
+            {
+                "main.bicep": MAIN,
+                "modules/vm.bicep": VM,
+                "prod.bicepparam": "using './main.bicep'\nparam location = 'swedencentral'\nparam planSku = 'P2v3'\n",
+                "dev.bicepparam": "using 'main.bicep'\n",
+            },
+        )
+
+        scan = BicepScanner().scan([str(tmp_path)])
+
+        plans = {os.path.basename(r.deployment): (r.sku, r.location) for r in scan.resources if r.symbol == "plan"}
+        assert plans == {"prod.bicepparam": ("P2v3", "swedencentral"), "dev.bicepparam": ("P1v3", "westeurope")}
+
+    def test_referenced_modules_outside_the_paths_are_followed(self, tmp_path):
+        _write(tmp_path, {"main.bicep": MAIN, "modules/vm.bicep": VM})
+
+        scan = BicepScanner().scan([str(tmp_path / "main.bicep")])
+
+        assert {resource.symbol for resource in scan.resources} == {"plan", "vm", "ip"}
+        assert len(scan.files) == 2
+
+    def test_unknown_loop_length_and_recursion(self, tmp_path):
+        _write(
+            tmp_path,
+            {
+                "main.bicep": "param names array\nmodule m 'self.bicep' = [for name in names: {\n  name: name\n}]\n",
+                "self.bicep": "module again 'self.bicep' = {\n  name: 'again'\n}\n"
+                "resource kv 'Microsoft.KeyVault/vaults@2023-07-01' = {\n  name: 'kv'\n}\n",
+            },
+        )
+
+        scan = BicepScanner().scan([str(tmp_path)])
+
+        assert [(resource.symbol, resource.count) for resource in scan.resources] == [("kv", None)]
+        assert any("recursive" in warning for warning in scan.warnings)
+
+    def test_rescans_reuse_unchanged_files(self, tmp_path):
+        _write(tmp_path, {"main.bicep": MAIN, "modules/vm.bicep": VM})
+        scanner = BicepScanner()
+
+        scanner.scan([str(tmp_path)])
+        scanner.scan([str(tmp_path)])
+        assert scanner.files_parsed == 2
+
+        (tmp_path / "modules" / "vm.bicep").write_text(VM.replace("size string", "size string = 'Standard_B2s'"))
+        scanner.scan([str(tmp_path)])
+        assert scanner.files_parsed == 3
+        assert scanner.stats() == {"cached_files": 2, "files_parsed": 3}
+
+    def test_nothing_outside_the_root_is_read(self, tmp_path):
+        _write(tmp_path, {"project/main.bicep": MAIN.replace("modules/vm.bicep", "../outside/vm.bicep")})
+        _write(tmp_path, {"outside/vm.bicep": VM})
+        (tmp_path / "project" / "linked.bicep").symlink_to(tmp_path / "outside" / "vm.bicep")
+        root = str(tmp_path / "project")
+
+        scan = BicepScanner().scan([root], root=root)
+
+        assert scan.files == [os.path.join(root, "main.bicep")]
+        assert {resource.symbol for resource in scan.resources} == {"plan"}
+        assert f"{tmp_path / 'outside' / 'vm.bicep'}: outside {root}, not read" in scan.warnings
+        assert f"{tmp_path / 'project' / 'linked.bicep'}: outside {root}, not read" in scan.warnings
+
+    def test_large_scans_parse_in_worker_processes(self, tmp_path):
+        for i in range(bicep.PARALLEL_SCAN_MIN_FILES + 4):
+            _write(
+                tmp_path, {f"stack{i}/main.bicep": MAIN.replace("'dev'", f"'env{i}'"), f"stack{i}/modules/vm.bicep": VM}
+            )
+
+        parallel = BicepScanner().scan([str(tmp_path)], max_workers=2)
+        sequential = BicepScanner().scan([str(tmp_path)], max_workers=1)
+
+        assert parallel == sequential
+        assert len(parallel.resources) == 3 * (bicep.PARALLEL_SCAN_MIN_FILES + 4)
+
+
+class TestLineItems:
+    """Test mapping resources to batch estimate line items."""
+
+    def test_normalises_skus_and_skips_what_cannot_be_priced(self, tmp_path):
+        _write(tmp_path, {"main.bicep": MAIN, "modules/vm.bicep": VM.replace("= resourceGroup().location", "")})
+        scan = BicepScanner().scan([str(tmp_path)])
+        unlocated = [replace(resource, location=None) for resource in scan.resources if resource.symbol == "vm"]
+
+        lines, skipped = line_items(scan.resources)
+
+        assert [(line["service_name"], line["sku_name"], line["quantity"]) for line in lines] == [
+            ("Azure App Service", "P1 v3", 2),
+            ("Virtual Machines", "D4s v5", 3),
+            ("Virtual Network", "Standard", 3),
+        ]
+        assert skipped == []
+        assert lines[2]["description"] == "vm.bicep:ip (conditional)"
+        assert line_items(unlocated)[1][0]["reason"].startswith("location could not be resolved")
+        assert line_items(unlocated, default_region="eastus")[0][0]["region"] == "eastus"
+
+    def test_usage_billed_resources_need_a_quantity(self, tmp_path):
+        _write(
+            tmp_path,
+            {
+                "main.bicep": "resource logs 'Microsoft.OperationalInsights/workspaces@2023-09-01' = {\n"
+                "  location: 'westeurope'\n  properties: { sku: { name: 'PerGB2018' } }\n}\n"
+                "resource sa 'Microsoft.Storage/storageAccounts@2023-05-01' = {\n"
+                "  location: 'westeurope'\n  sku: { name: 'Standard_LRS' }\n}\n"
+            },
+        )
+
+        lines, skipped = line_items(BicepScanner().scan([str(tmp_path)]).resources)
+
+        assert lines == []
+        assert [entry["reason"].split(";")[0] for entry in skipped] == [
+            "needs usage quantity: Log Analytics Pay-as-you-go in westeurope is billed per GB ingested",
+            "needs usage quantity: Storage Hot LRS in westeurope is billed per GB stored and operations",
+        ]
+
+    def test_free_and_indirectly_billed_resources(self, tmp_path):
+        _write(
+            tmp_path,
+            {
+                "main.bicep": "resource swa 'Microsoft.Web/staticSites@2023-12-01' = {\n"
+                "  location: 'westeurope'\n  sku: { name: 'Free' }\n}\n"
+                "resource ai 'Microsoft.Insights/components@2020-02-02' = {\n  location: 'westeurope'\n}\n"
+                "resource id 'Microsoft.ManagedIdentity/userAssignedIdentities@2023-01-31' = {\n"
+                "  location: 'westeurope'\n}\n"
+            },
+        )
+
+        lines, skipped = line_items(BicepScanner().scan([str(tmp_path)]).resources)
+
+        assert lines == []
+        assert [entry["reason"] for entry in skipped] == [
+            "Free SKU has no charge",
+            "workspace-based; ingestion is billed by its Log Analytics workspace",
+            "no pricing mapping for this resource type",
+        ]
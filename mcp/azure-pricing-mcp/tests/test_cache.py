@@ -0,0 +1,109 @@
+"""Tests for the byte-bounded in-memory response cache."""
+
+import pytest
+
+from azure_pricing_mcp.cache import ResponseCache, estimate_size
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _page(n: int, sku: str = "D4s v3") -> dict:
+    return {"Items": [{"skuName": sku, "retailPrice": 0.192, "armRegionName": "eastus"} for _ in range(n)]}
+
+
+class TestEstimateSize:
+    """Test size estimation."""
+
+    def test_large_pages_are_bigger_than_small_ones(self):
+        assert estimate_size(_page(1000)) > 50 * estimate_size(_page(5))
+
+    def test_sampled_estimate_is_close_to_exact(self):
+        page = _page(200)
+        exact = estimate_size(_page(20)) * 10
+        assert estimate_size(page) == pytest.approx(exact, rel=0.2)
+
+
+class TestResponseCache:
+    """Test LRU/TTL eviction, byte budget and compression."""
+
+    def test_get_and_set(self):
+        cache = ResponseCache()
+        cache["a"] = _page(3)
+
+        assert "a" in cache
+        assert cache["a"] == _page(3)
+        assert cache.get("b") is None
+        with pytest.raises(KeyError):
+            cache["b"]
+
+    def test_entries_expire(self):
+        timer = FakeTimer()
+        cache = ResponseCache(ttl=10, timer=timer)
+        cache["a"] = _page(1)
+
+        timer.now = 11
+        assert "a" not in cache
+        assert len(cache) == 0
+        assert cache.currsize == 0
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        small = estimate_size(_page(10))
+        cache = ResponseCache(max_bytes=int(small * 2.5), compress=False)
+        cache["a"] = _page(10)
+        cache["b"] = _page(10)
+        cache.get("a")  # a is now most recently used
+        cache["c"] = _page(10)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_values_are_not_cached(self):
+        cache = ResponseCache(max_bytes=100)
+        cache["big"] = _page(100)
+
+        assert "big" not in cache
+        assert cache.currsize == 0
+
+    def test_cold_entries_are_compressed_and_restored(self):
+        one = estimate_size(_page(100))
+        cache = ResponseCache(max_bytes=one * 10, hot_bytes=int(one * 1.5))
+        cache["a"] = _page(100, "A")
+        cache["b"] = _page(100, "B")
+
+        stats = cache.stats()
+        assert stats["compressed_entries"] == 1
+        assert stats["bytes"] < 2 * one
+
+        assert cache["a"] == _page(100, "A")
+        # Reading a brings it back hot and pushes b out of the hot window
+        assert cache.stats()["hot_entries"] == 1
+        assert cache["b"] == _page(100, "B")
+
+    def test_many_small_entries_fit_alongside_a_large_one(self):
+        large = estimate_size(_page(1000))
+        cache = ResponseCache(max_bytes=large * 2)
+        cache["large"] = _page(1000)
+        for i in range(200):
+            cache[f"small-{i}"] = _page(5, f"S{i}")
+
+        assert len(cache) == 201
+        assert cache.currsize <= cache.max_bytes
+
+    def test_pop_and_clear(self):
+        cache = ResponseCache()
+        cache["a"] = _page(1)
+        cache["b"] = _page(1)
+
+        assert cache.pop("a") == _page(1)
+        assert cache.pop("a", "gone") == "gone"
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.currsize == 0
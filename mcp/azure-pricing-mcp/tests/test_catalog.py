@@ -0,0 +1,257 @@
+"""Tests for the offline price catalog."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PAGE_SIZE, PriceCatalog, fetch_all_items, refresh_catalog, sync_catalog
+from azure_pricing_mcp.odata import compile_filter, parse_conjunction, parse_filter
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+def _item(service: str, sku: str, region: str, price: float, **extra) -> dict:
+    return {
+        "currencyCode": "USD",
+        "serviceName": service,
+        "skuName": sku,
+        "armRegionName": region,
+        "retailPrice": price,
+        "unitOfMeasure": "1 Hour",
+        "type": "Consumption",
+        "isPrimaryMeterRegion": True,
+        **extra,
+    }
+
+
+ITEMS = [
+    _item("Virtual Machines", "D4s v5", "eastus", 0.192, savingsPlan=[{"term": "1 Year", "retailPrice": 0.13}]),
+    _item("Virtual Machines", "D4s v5 Spot", "eastus", 0.04),
+    _item("Virtual Machines", "D4s v5", "westeurope", 0.21),
+    _item("Storage", "Hot LRS", "eastus", 0.018),
+]
+
+
+@pytest.fixture
+def catalog() -> PriceCatalog:
+    catalog = PriceCatalog()
+    catalog.extend(ITEMS)
+    return catalog
+
+
+class TestPriceCatalog:
+    """Test columnar storage and filtering."""
+
+    def test_rows_round_trip(self, catalog):
+        assert len(catalog) == 4
+        assert [catalog.row(i) for i in range(4)] == ITEMS
+
+    def test_eq_filters(self, catalog):
+        terms = parse_conjunction("serviceName eq 'Virtual Machines' and armRegionName eq 'eastus'")
+        assert catalog.query(terms) == ITEMS[:2]
+
+    def test_contains_filter(self, catalog):
+        assert catalog.select(parse_conjunction("contains(skuName, 'Spot')")) == [1]
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "armRegionName eq 'westeurope' or contains(skuName, 'Spot')",
+            "serviceName eq 'Virtual Machines' and armRegionName ne 'eastus'",
+            "armRegionName in ('eastus', 'mars') and startswith(skuName, 'D4s')",
+            "serviceName eq 'Virtual Machines' and retailPrice ne 0.04",
+            "reservationTerm eq null and (serviceName eq 'Storage' or retailPrice eq 0.21)",
+        ],
+    )
+    def test_full_filters_match_row_by_row_evaluation(self, catalog, text):
+        predicate = compile_filter(text)
+        assert catalog.query(parse_filter(text)) == [item for item in ITEMS if predicate(item)]
+
+    def test_eq_ignores_case(self, catalog):
+        assert catalog.select(parse_conjunction("armRegionName eq 'WestEurope' and skuName eq 'd4s V5'")) == [2]
+
+    def test_price_type_filter(self, catalog):
+        reservation = _item("Virtual Machines", "D4s v5", "eastus", 1200.0, type="Reservation", reservationTerm="1 Year")
+        catalog.append(reservation)
+        params = {"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines' and priceType eq 'Reservation'"}
+
+        assert catalog.lookup(params) == [reservation]
+        assert catalog.select(parse_conjunction("priceType eq 'consumption' and skuName eq 'D4s v5'")) == [0, 2]
+
+    def test_unknown_value_matches_nothing(self, catalog):
+        assert catalog.select(parse_conjunction("armRegionName eq 'mars'")) == []
+
+    def test_lookup_respects_currency_and_service_scope(self):
+        catalog = PriceCatalog(currency="USD", services=["Storage"])
+        catalog.extend(ITEMS[3:])
+
+        assert catalog.lookup({"currencyCode": "USD", "$filter": "serviceName eq 'Storage'"}) == ITEMS[3:]
+        assert catalog.lookup({"currencyCode": "EUR", "$filter": "serviceName eq 'Storage'"}) is None
+        assert catalog.lookup({"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines'"}) is None
+        assert catalog.lookup({"currencyCode": "USD"}) is None
+
+    def test_lookup_decodes_only_top_rows(self, catalog):
+        params = {"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines'", "$top": "2"}
+
+        with patch.object(catalog, "row", wraps=catalog.row) as row:
+            assert catalog.lookup(params) == ITEMS[:2]
+        assert row.call_count == 2
+        assert catalog.lookup({**params, "$top": "many"}) is None
+
+    def test_save_and_load(self, catalog, tmp_path):
+        catalog.synced_at = "2026-01-01T00:00:00+00:00"
+        catalog.save(tmp_path / "catalog")
+
+        loaded = PriceCatalog.load(tmp_path / "catalog")
+        assert len(loaded) == 4
+        assert loaded.synced_at == catalog.synced_at
+        assert loaded.query(parse_conjunction("skuName eq 'D4s v5'")) == [ITEMS[0], ITEMS[2]]
+
+    def test_failed_save_keeps_the_previous_catalog(self, catalog, tmp_path):
+        path = tmp_path / "catalog"
+        catalog.save(path)
+        catalog.append(_item("Storage", "Cool LRS", "eastus", 0.01))
+
+        with patch.object(Path, "write_text", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                catalog.save(path)
+
+        assert len(PriceCatalog.load(path)) == 4
+        assert [child.name for child in tmp_path.iterdir()] == ["catalog"]
+
+        catalog.save(path)
+        assert len(PriceCatalog.load(path)) == 5
+        assert [child.name for child in tmp_path.iterdir()] == ["catalog"]
+
+
+class TestCatalogMerge:
+    """Test folding newer price versions into an existing catalog."""
+
+    def test_merge_counts_added_changed_unchanged(self):
+        base = _item("Virtual Machines", "D4s v5", "eastus", 0.192, meterId="m1", effectiveStartDate="2025-01-01")
+        catalog = PriceCatalog()
+        catalog.extend(
+            [base, _item("Storage", "Hot LRS", "eastus", 0.018, meterId="m2", effectiveStartDate="2025-02-01")]
+        )
+
+        repriced = {**base, "retailPrice": 0.18, "effectiveStartDate": "2026-03-01"}
+        new = _item("Storage", "Cool LRS", "eastus", 0.01, meterId="m3", effectiveStartDate="2026-03-01")
+        counts = catalog.merge([repriced, catalog.row(1), new])
+
+        assert counts == {"added": 1, "changed": 1, "unchanged": 1}
+        assert len(catalog) == 3
+        assert catalog.query(parse_conjunction("skuName eq 'D4s v5'")) == [repriced]
+        assert catalog.watermark == "2026-03-01"
+
+    def test_merge_keeps_tiers_and_reservation_terms_apart(self):
+        catalog = PriceCatalog()
+        catalog.extend([_item("Storage", "Hot LRS", "eastus", 0.02, meterId="m1", tierMinimumUnits=0.0)])
+
+        counts = catalog.merge([_item("Storage", "Hot LRS", "eastus", 0.019, meterId="m1", tierMinimumUnits=51200.0)])
+
+        assert counts["added"] == 1
+        assert len(catalog) == 2
+
+    def test_merge_ignores_older_versions(self):
+        current = _item("Storage", "Hot LRS", "eastus", 0.02, meterId="m1", effectiveStartDate="2026-01-01")
+        catalog = PriceCatalog()
+        catalog.append(current)
+
+        counts = catalog.merge([{**current, "retailPrice": 0.03, "effectiveStartDate": "2025-01-01"}])
+
+        assert counts["unchanged"] == 1
+        assert catalog.row(0) == current
+
+
+class TestCatalogSync:
+    """Test bulk downloads."""
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_items_requests_pages_in_parallel_waves(self):
+        total = PAGE_SIZE * 2 + 10
+        requested = []
+
+        async def fake_fetch(url, params):
+            skip = int(params["$skip"])
+            requested.append(skip)
+            count = max(0, min(PAGE_SIZE, total - skip))
+            return {"Items": [{"n": skip + i} for i in range(count)], "NextPageLink": "next" if count else None}
+
+        server = AzurePricingServer()
+        with patch.object(server, "fetch_uncached", side_effect=fake_fetch):
+            items = await fetch_all_items(server, {"currencyCode": "USD"}, concurrency=2)
+
+        assert [item["n"] for item in items] == list(range(total))
+        assert sorted(requested) == [0, PAGE_SIZE, PAGE_SIZE * 2, PAGE_SIZE * 3]
+
+    @pytest.mark.asyncio
+    async def test_sync_writes_scoped_catalog(self, tmp_path):
+        async def fake_fetch(url, params):
+            assert params["$filter"] == "serviceName eq 'Virtual Machines'"
+            return {"Items": ITEMS[:3], "NextPageLink": None}
+
+        server = AzurePricingServer()
+        with patch.object(server, "fetch_uncached", side_effect=fake_fetch):
+            result = await sync_catalog(server, tmp_path / "catalog", services=["Virtual Machines"])
+
+        assert result["rows"] == 3
+        assert PriceCatalog.load(tmp_path / "catalog").services == ["Virtual Machines"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_fetches_from_watermark(self, tmp_path):
+        old = _item("Storage", "Hot LRS", "eastus", 0.02, meterId="m1", effectiveStartDate="2025-06-01T00:00:00Z")
+        catalog = PriceCatalog(services=["Storage"])
+        catalog.append(old)
+        catalog.save(tmp_path / "catalog")
+
+        filters = []
+
+        async def fake_fetch(url, params):
+            filters.append(params["$filter"])
+            return {"Items": [{**old, "retailPrice": 0.018, "effectiveStartDate": "2026-01-01T00:00:00Z"}]}
+
+        server = AzurePricingServer()
+        with patch.object(server, "fetch_uncached", side_effect=fake_fetch):
+            result = await refresh_catalog(server, tmp_path / "catalog")
+
+        assert set(filters) == {"serviceName eq 'Storage' and effectiveStartDate ge 2025-06-01T00:00:00Z"}
+        assert (result["added"], result["changed"], result["unchanged"]) == (0, 1, 0)
+        reloaded = PriceCatalog.load(tmp_path / "catalog")
+        assert reloaded.row(0)["retailPrice"] == 0.018
+        assert reloaded.watermark == "2026-01-01T00:00:00Z"
+
+
+class TestServerCatalogMode:
+    """Test the server answers from the catalog instead of the API."""
+
+    @pytest.mark.asyncio
+    async def test_search_uses_catalog(self, catalog, tmp_path):
+        catalog.save(tmp_path / "catalog")
+        server = AzurePricingServer()
+        try:
+            AzurePricingServer.configure_catalog(str(tmp_path / "catalog"))
+            with patch.object(server, "_make_request") as mock_request:
+                result = await server.search_azure_prices(
+                    service_name="Virtual Machines", region="westeurope", sku_name="D4s", limit=10
+                )
+
+            mock_request.assert_not_called()
+            assert result["items"] == [ITEMS[2]]
+        finally:
+            AzurePricingServer.configure_catalog(None)
+
+    @pytest.mark.asyncio
+    async def test_price_type_search_uses_catalog(self, catalog, tmp_path):
+        catalog.save(tmp_path / "catalog")
+        server = AzurePricingServer()
+        try:
+            AzurePricingServer.configure_catalog(str(tmp_path / "catalog"))
+            with patch.object(server, "_make_request") as mock_request:
+                result = await server.search_azure_prices(
+                    service_name="Storage", price_type="Consumption", validate_sku=False, limit=10
+                )
+
+            mock_request.assert_not_called()
+            assert result["items"] == [ITEMS[3]]
+        finally:
+            AzurePricingServer.configure_catalog(None)
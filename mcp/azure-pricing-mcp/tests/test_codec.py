@@ -0,0 +1,83 @@
+"""Tests for the pluggable JSON codec."""
+
+import pytest
+
+from azure_pricing_mcp import codec
+from azure_pricing_mcp.models import PriceItem
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+def _installed(name: str) -> bool:
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+@pytest.fixture(params=[name for name in codec.BACKENDS if _installed(name)])
+def backend(request):
+    previous = codec.backend()
+    codec.use_backend(request.param)
+    yield request.param
+    codec.use_backend(previous)
+
+
+VALUE = {"b": [1, 2.5, None, True], "a": "Sweden Central → ÅÄÖ", "nested": {"z": 1, "y": "x"}}
+
+
+class TestCodec:
+    """Test that every installed backend encodes and decodes alike."""
+
+    def test_round_trip(self, backend):
+        assert codec.loads(codec.dumps(VALUE)) == VALUE
+        assert codec.loads(codec.dumps_bytes(VALUE)) == VALUE
+
+    def test_output_is_identical_across_backends(self, backend):
+        assert codec.dumps(VALUE, sort_keys=True) == (
+            '{"a":"Sweden Central → ÅÄÖ","b":[1,2.5,null,true],"nested":{"y":"x","z":1}}'
+        )
+        assert codec.dumps({"k": [1]}, indent=True) == '{\n  "k": [\n    1\n  ]\n}'
+
+    def test_encodes_price_items(self, backend):
+        item = PriceItem.from_dict({"skuName": "D4s v5", "retailPrice": 0.192})
+        assert codec.loads(codec.dumps_bytes({"Items": [item]})) == {
+            "Items": [{"skuName": "D4s v5", "retailPrice": 0.192}]
+        }
+
+    def test_loads_page_projects_items(self, backend):
+        body = codec.dumps_bytes(
+            {
+                "BillingCurrency": "USD",
+                "Items": [{"skuName": "D4s v5", "retailPrice": 0.192, "meterId": "m", "reservationTerm": None}],
+                "NextPageLink": "https://next",
+                "Count": 1,
+            }
+        )
+
+        page = codec.loads_page(body, frozenset({"skuName", "reservationTerm", "armRegionName"}))
+
+        assert page["Items"] == [{"skuName": "D4s v5", "reservationTerm": None}]
+        assert isinstance(page["Items"][0], PriceItem)
+        assert page["NextPageLink"] == "https://next"
+        assert codec.loads_page(body)["Items"][0]["meterId"] == "m"
+
+    def test_cache_keys_do_not_depend_on_the_backend(self, backend):
+        params = {"currencyCode": "USD", "$filter": "serviceName eq 'Storage'"}
+        key = AzurePricingServer()._cache_key("https://prices.azure.com/api/retail/prices", params)
+        codec.use_backend("json")
+        assert AzurePricingServer()._cache_key("https://prices.azure.com/api/retail/prices", params) == key
+
+    def test_unknown_or_missing_backend(self):
+        with pytest.raises(ValueError, match="Unknown"):
+            codec.use_backend("yaml")
+        if not _installed("msgspec"):
+            with pytest.raises(ValueError, match="not installed"):
+                codec.use_backend("msgspec")
+
+    def test_default_picks_the_fastest_installed(self):
+        previous = codec.backend()
+        try:
+            assert codec.use_backend() == next(name for name in codec.BACKENDS if _installed(name))
+        finally:
+            codec.use_backend(previous)
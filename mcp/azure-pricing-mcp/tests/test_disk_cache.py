@@ -0,0 +1,114 @@
+"""Tests for the persistent SQLite response cache."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from azure_pricing_mcp.disk_cache import DiskCache
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    cache = DiskCache(tmp_path / "prices.db")
+    yield cache
+    cache.close()
+
+
+class TestDiskCache:
+    """Test DiskCache storage, expiry and eviction."""
+
+    def test_round_trip(self, disk_cache):
+        value = {"Items": [{"skuName": "D4s v3", "retailPrice": 0.192}], "NextPageLink": None}
+        disk_cache.set("key", value)
+
+        assert disk_cache.get("key") == value
+        assert disk_cache.get("missing") is None
+
+    def test_uses_wal_journal(self, disk_cache):
+        mode = disk_cache._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_expired_entries_are_not_returned(self, tmp_path):
+        cache = DiskCache(tmp_path / "expired.db", ttl=0)
+        cache.set("key", {"Items": []})
+
+        assert cache.get("key") is None
+        assert cache.load_recent(10) == []
+        cache.close()
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self, tmp_path):
+        cache = DiskCache(tmp_path / "small.db")
+        cache.set("old", {"Items": ["x" * 50]})
+        cache.max_bytes = cache.stats()["bytes"] + 10
+
+        cache.set("new", {"Items": ["y" * 50]})
+
+        assert cache.get("old") is None
+        assert cache.get("new") is not None
+        cache.close()
+
+    def test_survives_reopen(self, tmp_path):
+        path = tmp_path / "persist.db"
+        first = DiskCache(path)
+        first.set("key", {"Items": [1, 2, 3]})
+        first.close()
+
+        second = DiskCache(path)
+        assert second.load_recent(10) == [("key", {"Items": [1, 2, 3]})]
+        second.close()
+
+
+class TestServerDiskCache:
+    """Test the disk cache is used as an L2 behind the in-memory cache."""
+
+    @pytest.mark.asyncio
+    async def test_configure_warms_memory_cache(self, tmp_path):
+        path = tmp_path / "warm.db"
+        seed = DiskCache(path)
+        seed.set("warm-start-key", {"Items": [{"skuName": "B2s"}]})
+        seed.close()
+
+        try:
+            AzurePricingServer.configure_disk_cache(str(path))
+            assert AzurePricingServer._cache["warm-start-key"] == {"Items": [{"skuName": "B2s"}]}
+        finally:
+            AzurePricingServer.configure_disk_cache(None)
+            AzurePricingServer._cache.pop("warm-start-key", None)
+
+    @pytest.mark.asyncio
+    async def test_warm_start_indexes_only_full_pages(self, tmp_path):
+        server = AzurePricingServer()
+        path = tmp_path / "warm.db"
+        full = {"Items": [{"serviceName": "Storage", "skuName": "Hot LRS", "productName": "Blob Storage"}]}
+        projected = {"Items": [{"skuName": "Cold LRS", "productName": "Blob Storage"}]}
+        seed = DiskCache(path)
+        seed.set(server._cache_key("https://test.com/full", None), full)
+        seed.set(
+            server._cache_key("https://test.com/projected", None, frozenset({"skuName", "productName"})), projected
+        )
+        seed.close()
+
+        try:
+            AzurePricingServer.configure_disk_cache(str(path))
+        finally:
+            AzurePricingServer.configure_disk_cache(None)
+
+        assert [item["skuName"] for item in AzurePricingServer._fulltext_index.search("blob")] == ["Hot LRS"]
+
+    @pytest.mark.asyncio
+    async def test_fetch_reads_disk_before_network(self, tmp_path):
+        server = AzurePricingServer()
+        try:
+            disk_cache = AzurePricingServer.configure_disk_cache(str(tmp_path / "l2.db"))
+            disk_cache.set("l2-key", {"Items": [{"skuName": "E2s v5"}]})
+
+            with patch.object(server, "get_session", AsyncMock()) as mock_session:
+                result = await server._fetch("https://test.com/l2", None, "l2-key")
+
+            assert result == {"Items": [{"skuName": "E2s v5"}]}
+            mock_session.assert_not_called()
+            assert AzurePricingServer._cache["l2-key"] == result
+        finally:
+            AzurePricingServer.configure_disk_cache(None)
+            AzurePricingServer._cache.pop("l2-key", None)
@@ -0,0 +1,175 @@
+"""Tests for the full-text price index."""
+
+from unittest.mock import patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PriceCatalog
+from azure_pricing_mcp.fulltext import FullTextIndex, tokenize
+from azure_pricing_mcp.handlers import _handle_fulltext_search
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+def _item(
+    product: str,
+    meter: str,
+    sku: str,
+    service: str = "Storage",
+    region: str = "eastus",
+    price: float = 1.0,
+) -> dict:
+    return {
+        "serviceName": service,
+        "productName": product,
+        "meterName": meter,
+        "skuName": sku,
+        "armRegionName": region,
+        "retailPrice": price,
+        "unitOfMeasure": "1/Month",
+        "type": "Consumption",
+        "currencyCode": "USD",
+        "meterId": f"{product}-{meter}-{sku}-{region}",
+        "skuId": sku,
+    }
+
+
+ITEMS = [
+    _item("Premium SSD Managed Disks", "P10 LRS Disk", "P10 LRS"),
+    _item("Premium SSD Managed Disks", "P10 ZRS Disk", "P10 ZRS"),
+    _item("Standard SSD Managed Disks", "E10 LRS Disk", "E10 LRS"),
+    _item("Standard HDD Managed Disks", "S10 LRS Disk", "S10 LRS"),
+    _item("Premium SSD Managed Disks", "P10 LRS Disk", "P10 LRS", region="westeurope", price=1.2),
+    _item("Virtual Machines Dpsv5 Series", "D4ps v5", "D4ps v5", service="Virtual Machines", price=0.15),
+    _item("Virtual Machines Dsv5 Series", "D4s v5", "D4s v5", service="Virtual Machines", price=0.19),
+]
+
+
+@pytest.fixture
+def index() -> FullTextIndex:
+    index = FullTextIndex()
+    index.add_items(ITEMS)
+    return index
+
+
+class TestTokenize:
+    """Test text normalisation."""
+
+    def test_splits_lowercases_and_folds_plurals(self):
+        assert tokenize("Standard_D4s_v5 Managed Disks") == ["standard", "d4s", "v5", "managed", "disk"]
+
+    def test_keeps_sku_like_and_short_tokens(self):
+        assert tokenize("LRS d4s class") == ["lrs", "d4s", "class"]
+
+
+class TestFullTextIndex:
+    """Test BM25-ranked search."""
+
+    def test_all_query_words_rank_above_partial_matches(self, index):
+        results = index.search("premium ssd lrs")
+        assert results[0]["skuName"] == "P10 LRS"
+        assert results[0]["match_score"] > results[-1]["match_score"]
+        assert {item["skuName"] for item in results[:3]} >= {"P10 LRS", "P10 ZRS"}
+
+    def test_words_match_across_fields(self, index):
+        assert index.search("dpsv5 d4ps")[0]["skuName"] == "D4ps v5"
+
+    def test_filters_narrow_results(self, index):
+        results = index.search("premium lrs", service_name="storage", region="WestEurope")
+        assert [(item["skuName"], item["armRegionName"]) for item in results] == [("P10 LRS", "westeurope")]
+        assert index.search("disk", service_name="Virtual Machines") == []
+        assert index.search("disk", price_type="Reservation") == []
+
+    def test_limit_and_unknown_words(self, index):
+        assert len(index.search("disk", limit=2)) == 2
+        assert index.search("nonexistent words") == []
+        assert index.search("  ") == []
+
+    def test_same_price_is_indexed_once(self, index):
+        index.add_items(ITEMS)
+        assert len(index) == len(ITEMS)
+
+    def test_respects_size_limit(self):
+        index = FullTextIndex(max_bytes=1)
+        index.add_items(ITEMS)
+        assert len(index) == 1
+        assert index.stats()["estimated_bytes"] > 1
+
+    def test_stores_only_projected_fields(self):
+        item = {**ITEMS[0], "productId": "DZH318Z0BQ4L", "effectiveStartDate": "2024-01-01T00:00:00Z"}
+        index = FullTextIndex()
+        index.add(item)
+
+        result = index.search("premium")[0]
+        assert "productId" not in result and "effectiveStartDate" not in result
+        assert result["skuName"] == "P10 LRS"
+
+    def test_catalog_rows_are_searchable_and_merge_with_fetched_items(self):
+        catalog = PriceCatalog()
+        catalog.extend(ITEMS[:4])
+        index = FullTextIndex()
+
+        index.add_catalog(catalog)
+        index.add_items(ITEMS[:1])
+
+        results = index.search("premium lrs")
+        assert [item["skuName"] for item in results].count("P10 LRS") == 1
+        assert index.stats()["catalog_rows"] == 4
+        assert index.has_service("STORAGE")
+
+
+class TestServerFullTextSearch:
+    """Test the server's full-text search path."""
+
+    @pytest.mark.asyncio
+    async def test_fetched_pages_are_searchable_without_another_request(self):
+        server = AzurePricingServer()
+        page = {"Items": ITEMS, "NextPageLink": None}
+
+        with patch.object(server, "_make_request", return_value=page):
+            await server.search_azure_prices(service_name="Storage", validate_sku=False)
+
+        with patch.object(server, "_make_request") as mock_request:
+            result = await server.fulltext_search("premium ssd lrs", service_name="Storage")
+
+        mock_request.assert_not_called()
+        assert result["items"][0]["skuName"] == "P10 LRS"
+        assert result["indexed_prices"] == len(ITEMS)
+
+    @pytest.mark.asyncio
+    async def test_unseen_service_is_fetched_first(self):
+        server = AzurePricingServer()
+        page = {"Items": ITEMS[5:], "NextPageLink": None}
+
+        with patch.object(server, "_make_request", return_value=page) as mock_request:
+            result = await server.fulltext_search("d4ps", service_name="Virtual Machines")
+
+        mock_request.assert_called_once()
+        assert result["items"][0]["skuName"] == "D4ps v5"
+
+    def test_budget_is_configurable(self):
+        try:
+            index = AzurePricingServer.configure_fulltext_index(max_bytes=1)
+            AzurePricingServer._observe_items(ITEMS)
+        finally:
+            AzurePricingServer.configure_fulltext_index()
+
+        assert AzurePricingServer._fulltext_index is not index
+        assert len(index) == 1
+
+    @pytest.mark.asyncio
+    async def test_handler_formats_ranked_prices(self):
+        server = AzurePricingServer()
+        AzurePricingServer._fulltext_index.add_items(ITEMS)
+
+        result = await _handle_fulltext_search(server, {"query": "premium ssd lrs"})
+
+        assert "known prices for 'premium ssd lrs'" in result[0].text
+        assert '"sku": "P10 LRS"' in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_handler_explains_an_empty_index(self):
+        server = AzurePricingServer()
+
+        result = await _handle_fulltext_search(server, {"query": "premium ssd"})
+
+        assert "Nothing has been fetched yet" in result[0].text
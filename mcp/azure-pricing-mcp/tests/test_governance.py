@@ -0,0 +1,75 @@
+"""Tests for region constraints loaded from governance output."""
+
+from pathlib import Path
+
+import pytest
+
+from azure_pricing_mcp.governance import load_region_policy, normalise_region, region_policy_from_dict
+
+EXAMPLE = (
+    Path(__file__).resolve().parents[3] / "agent-output" / "rebel-tactical-platform" / "04-governance-constraints.json"
+)
+
+
+class TestRegionPolicy:
+    """Test reading allowed and denied regions."""
+
+    def test_bicep_plan_schema(self):
+        policy = region_policy_from_dict(
+            {"constraints": {"network": {"allowedRegions": ["swedencentral", "germanywestcentral"]}}}
+        )
+
+        assert policy.allowed_regions() == ["germanywestcentral", "swedencentral"]
+        assert policy.permits("SwedenCentral")
+        assert not policy.permits("eastus")
+        assert not policy.permits(None)
+
+    def test_policy_assignment_parameters(self):
+        policy = region_policy_from_dict(
+            {
+                "policies": [
+                    {
+                        "name": "Allowed locations",
+                        "parameters": {"listOfAllowedLocations": {"value": ["West Europe", "North Europe"]}},
+                    },
+                    {
+                        "name": "EU only",
+                        "parameters": {"listOfAllowedLocations": {"value": ["westeurope", "swedencentral"]}},
+                    },
+                    {"name": "No Ireland", "parameters": {"listOfNotAllowedLocations": {"value": ["north_europe"]}}},
+                ]
+            }
+        )
+
+        # Every allow-list must permit a region
+        assert policy.allowed_regions() == ["westeurope"]
+        assert policy.denied == frozenset({"northeurope"})
+
+    def test_deny_list_only(self):
+        policy = region_policy_from_dict({"deniedLocations": ["eastus"]})
+
+        assert policy.restricted
+        assert policy.allowed_regions() is None
+        assert policy.permits("westus") and not policy.permits("eastus")
+
+    def test_unrelated_values_are_ignored(self):
+        policy = region_policy_from_dict({"allowedRegions": "westeurope", "resourceTypes": ["Microsoft.Web/*"]})
+        assert not policy.restricted
+
+    def test_repository_example_has_no_region_constraints(self):
+        policy = load_region_policy(str(EXAMPLE))
+
+        assert not policy.restricted
+        assert policy.describe() == {"source": str(EXAMPLE), "allowed_regions": None, "denied_regions": []}
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "constraints.json"
+        path.write_text("{not json")
+        with pytest.raises(ValueError):
+            load_region_policy(str(path))
+        with pytest.raises(OSError):
+            load_region_policy(str(tmp_path / "missing.json"))
+
+    def test_normalise_region(self):
+        assert normalise_region("Germany West Central") == "germanywestcentral"
+        assert normalise_region("east-us_2") == "eastus2"
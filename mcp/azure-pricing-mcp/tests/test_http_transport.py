@@ -70,8 +70,12 @@ class TestHTTPTransportTools:
             "azure_price_search",
             "azure_price_compare",
             "azure_cost_estimate",
+            "azure_cost_estimate_batch",
+            "azure_bicep_cost_estimate",
             "azure_discover_skus",
             "azure_sku_discovery",
+            "azure_workload_region_optimize",
+            "azure_price_fulltext_search",
             "get_customer_discount",
         ]
 
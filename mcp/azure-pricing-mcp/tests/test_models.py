@@ -0,0 +1,125 @@
+"""Tests for the compact price item model."""
+
+import json
+
+import pytest
+
+from azure_pricing_mcp.cache import ResponseCache, estimate_size
+from azure_pricing_mcp.models import PriceItem, as_dict, compact_page, json_default
+
+
+def _item(i: int = 0, **overrides) -> dict:
+    item = {
+        "currencyCode": "USD",
+        "retailPrice": 0.192 + i,
+        "armRegionName": "eastus",
+        "location": "US East",
+        "meterId": f"meter-{i}",
+        "meterName": "D4s v5",
+        "productName": "Virtual Machines Dsv5 Series",
+        "skuName": "D4s v5",
+        "serviceName": "Virtual Machines",
+        "serviceFamily": "Compute",
+        "unitOfMeasure": "1 Hour",
+        "type": "Consumption",
+        "reservationTerm": None,
+        "savingsPlan": [{"term": "1 Year", "retailPrice": 0.15}],
+    }
+    item.update(overrides)
+    return item
+
+
+class TestPriceItem:
+    """Test that PriceItem reads like the decoded dict."""
+
+    def test_reads_like_a_dict(self):
+        item = PriceItem.from_dict(_item())
+
+        assert item["skuName"] == "D4s v5"
+        assert item.get("unitPrice") is None
+        assert item.get("unitPrice", 1) == 1
+        assert "reservationTerm" in item and item["reservationTerm"] is None
+        assert "unitPrice" not in item
+        with pytest.raises(KeyError):
+            item["unitPrice"]
+        assert item == _item()
+        assert len(item) == len(_item())
+        assert set(item) == set(_item())
+
+    def test_method_names_are_not_fields(self):
+        item = PriceItem.from_dict(_item())
+        assert item.get("to_dict") is None
+        assert "copy" not in item
+
+    def test_unknown_fields_are_kept(self):
+        item = PriceItem.from_dict(_item(newField="x"))
+        assert item["newField"] == "x"
+        assert item.to_dict()["newField"] == "x"
+
+    def test_repeated_strings_are_shared(self):
+        first, second = (PriceItem.from_dict(json.loads(json.dumps(_item(i)))) for i in range(2))
+        assert first["serviceName"] is second["serviceName"]
+        assert first["unitOfMeasure"] is second["unitOfMeasure"]
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(PriceItem.from_dict(_item()), "__dict__")
+
+    def test_to_dict_is_an_independent_copy(self):
+        item = PriceItem.from_dict(_item())
+
+        data = item.copy()
+        data["retailPrice"] = 0
+        data["savingsPlan"][0]["retailPrice"] = 0
+
+        assert isinstance(data, dict)
+        assert item["retailPrice"] == 0.192
+        assert item["savingsPlan"][0]["retailPrice"] == 0.15
+
+    def test_json_encoding(self):
+        page = compact_page({"Items": [_item()]})
+        assert json.loads(json.dumps(page, default=json_default)) == {"Items": [_item()]}
+        with pytest.raises(TypeError):
+            json.dumps(object(), default=json_default)
+
+
+class TestCompactPage:
+    """Test page conversion and its memory footprint."""
+
+    def test_converts_items_in_place(self):
+        page = {"Items": [_item(), PriceItem.from_dict(_item(1))], "NextPageLink": None}
+        assert compact_page(page) is page
+        assert all(isinstance(item, PriceItem) for item in page["Items"])
+        assert compact_page({"Items": []}) == {"Items": []}
+
+    def test_projection_keeps_only_the_named_fields(self):
+        fields = frozenset({"skuName", "retailPrice", "unitPrice"})
+        page = compact_page({"Items": [_item(), PriceItem.from_dict(_item(1))]}, fields)
+        assert [dict(item) for item in page["Items"]] == [
+            {"skuName": "D4s v5", "retailPrice": 0.192},
+            {"skuName": "D4s v5", "retailPrice": 1.192},
+        ]
+
+    def test_as_dict(self):
+        assert as_dict(PriceItem.from_dict(_item())) == _item()
+        plain = _item()
+        assert as_dict(plain) is plain
+
+    def test_compact_page_is_several_times_smaller(self):
+        raw = [json.loads(json.dumps(_item(i))) for i in range(200)]
+        compact = compact_page({"Items": [json.loads(json.dumps(_item(i))) for i in range(200)]})["Items"]
+        assert estimate_size(raw) > 2 * estimate_size(compact)
+
+
+class TestCacheRoundTrip:
+    """Test that compressed cache entries come back compact."""
+
+    def test_cold_entries_are_restored_as_price_items(self):
+        cache = ResponseCache(hot_bytes=0, restore=compact_page)
+        cache["a"] = compact_page({"Items": [_item()]})
+        cache["b"] = compact_page({"Items": [_item(1)]})
+        assert cache.stats()["compressed_entries"] == 1
+
+        page = cache["a"]
+
+        assert isinstance(page["Items"][0], PriceItem)
+        assert page["Items"][0] == _item()
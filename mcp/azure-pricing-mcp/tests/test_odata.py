@@ -0,0 +1,75 @@
+"""Tests for the local OData $filter evaluator."""
+
+import pytest
+
+from azure_pricing_mcp.odata import BoolOp, ODataParseError, Term, compile_filter, filter_items, parse_filter
+
+ITEMS = [
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "eastus", "retailPrice": 0.192},
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5 Spot", "armRegionName": "westus2", "retailPrice": 0.04},
+    {"serviceName": "Virtual Machines", "skuName": "E8s v5", "armRegionName": "westeurope", "retailPrice": 0.504},
+    {"serviceName": "Storage", "skuName": "Hot LRS", "armRegionName": "eastus", "retailPrice": 0.018},
+]
+
+
+class TestParseFilter:
+    """Test parsing the supported OData subset."""
+
+    def test_or_binds_looser_than_and(self):
+        expr = parse_filter("serviceName eq 'A' and skuName eq 'x' or skuName eq 'y'")
+        assert expr == BoolOp(
+            "or",
+            (BoolOp("and", (Term("eq", "serviceName", "A"), Term("eq", "skuName", "x"))), Term("eq", "skuName", "y")),
+        )
+
+    def test_in_and_literals(self):
+        assert parse_filter("armRegionName in ('eastus', 'westus2')") == Term(
+            "in", "armRegionName", ("eastus", "westus2")
+        )
+        assert parse_filter("retailPrice ne 0") == Term("ne", "retailPrice", 0)
+        assert parse_filter("isPrimaryMeterRegion eq true") == Term("eq", "isPrimaryMeterRegion", True)
+
+    def test_price_type_reads_the_type_key(self):
+        assert parse_filter("priceType eq 'Consumption'") == Term("eq", "type", "Consumption")
+        assert parse_filter("contains(priceType, 'Reserv')") == Term("contains", "type", "Reserv")
+
+    @pytest.mark.parametrize(
+        "text", ["retailPrice gt 1", "(serviceName eq 'A'", "endswith(skuName, 'v5')", "skuName in ()", "skuName eq"]
+    )
+    def test_rejects_unsupported_syntax(self, text):
+        with pytest.raises(ODataParseError):
+            parse_filter(text)
+
+
+class TestCompileFilter:
+    """Test compiled predicates agree with the API's semantics."""
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ("serviceName eq 'Virtual Machines' and contains(skuName, 'D4s')", [0, 1]),
+            ("armRegionName eq 'eastus' or armRegionName eq 'westeurope'", [0, 2, 3]),
+            (
+                "serviceName eq 'Virtual Machines' and (startswith(skuName, 'E') or armRegionName in ('westus2'))",
+                [1, 2],
+            ),
+            ("serviceName ne 'Storage' and not_a_field eq null", [0, 1, 2]),
+            ("retailPrice eq 0.018", [3]),
+            ("armRegionName eq 'EastUS' and contains(skuName, 'd4S')", [0]),
+            ("armRegionName in ('WestEurope') and startswith(skuName, 'e8')", [2]),
+            ("serviceName ne 'virtual machines'", [3]),
+        ],
+    )
+    def test_filters(self, text, expected):
+        assert filter_items(ITEMS, text) == [ITEMS[i] for i in expected]
+
+    def test_compiles_each_filter_once(self):
+        text = "serviceName eq 'Storage'"
+        assert compile_filter(text) is compile_filter(text)
+
+    def test_price_type_filter(self):
+        items = [{"skuName": "D4s v5", "type": "Consumption"}, {"skuName": "D4s v5", "type": "Reservation"}]
+        assert filter_items(items, "skuName eq 'D4s v5' and priceType eq 'Consumption'") == items[:1]
+
+    def test_no_filter_returns_everything(self):
+        assert filter_items(ITEMS, None) == ITEMS
@@ -0,0 +1,93 @@
+"""Tests for the multi-region query planner."""
+
+from urllib.parse import quote, urlencode
+
+from azure_pricing_mcp.odata import compile_filter
+from azure_pricing_mcp.planner import FoldedQuery, fold_filter, plan_folded_queries
+
+BASE_URL = "https://prices.azure.com/api/retail/prices"
+BASE_PARAMS = {"api-version": "2023-01-01-preview", "currencyCode": "USD"}
+VM_D4S = ("serviceName eq 'Virtual Machines'", "contains(skuName, 'D4s v5')")
+
+REGIONS = [f"region{i:02d}" for i in range(40)]
+
+
+class TestFoldFilter:
+    """Test building folded filters."""
+
+    def test_ors_values_inside_the_shared_conditions(self):
+        text = fold_filter(VM_D4S, "armRegionName", ["eastus", "westus"])
+        assert text == (
+            "serviceName eq 'Virtual Machines' and contains(skuName, 'D4s v5') "
+            "and (armRegionName eq 'eastus' or armRegionName eq 'westus')"
+        )
+        predicate = compile_filter(text)
+        assert predicate({"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "westus"})
+        assert not predicate({"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "uksouth"})
+
+    def test_single_value_needs_no_parentheses(self):
+        assert fold_filter((), "armRegionName", ["o'hare"]) == "armRegionName eq 'o''hare'"
+
+
+class TestPlanFoldedQueries:
+    """Test chunking and grouping of lookups."""
+
+    def test_forty_regions_fit_in_a_few_requests(self):
+        queries = plan_folded_queries(BASE_URL, BASE_PARAMS, [(VM_D4S, region) for region in REGIONS])
+
+        assert len(queries) <= 3
+        assert [value for query in queries for value in query.values] == REGIONS
+
+    def test_chunks_stay_under_the_url_limit(self):
+        queries = plan_folded_queries(
+            BASE_URL, BASE_PARAMS, [(VM_D4S, region) for region in REGIONS], max_url_length=800
+        )
+
+        assert len(queries) > 1
+        assert [value for query in queries for value in query.values] == REGIONS
+        for query in queries:
+            assert len(BASE_URL) + 1 + len(urlencode(query.params, quote_via=quote)) <= 800
+
+    def test_groups_by_conditions_and_merges_duplicates(self):
+        storage = ("serviceName eq 'Storage'",)
+        lookups = [(VM_D4S, "eastus"), (storage, "eastus"), (VM_D4S, "westus"), (VM_D4S, "eastus")]
+
+        queries = plan_folded_queries(BASE_URL, BASE_PARAMS, lookups)
+
+        assert [(query.conditions, query.values) for query in queries] == [
+            (VM_D4S, ["eastus", "westus"]),
+            (storage, ["eastus"]),
+        ]
+
+    def test_oversized_value_gets_its_own_query(self):
+        queries = plan_folded_queries(BASE_URL, BASE_PARAMS, [((), "a"), ((), "b" * 500)], max_url_length=300)
+        assert [query.values for query in queries] == [["a"], ["b" * 500]]
+
+
+class TestDemultiplex:
+    """Test splitting merged results per value."""
+
+    def test_splits_items_and_keeps_empty_values(self):
+        query = FoldedQuery(
+            params={}, conditions=(), field_name="armRegionName", values=["EastUS", "westus", "uksouth"]
+        )
+        items = [
+            {"armRegionName": "eastus", "retailPrice": 1},
+            {"armRegionName": "westus", "retailPrice": 2},
+            {"armRegionName": "eastus", "retailPrice": 3},
+            {"armRegionName": "japaneast", "retailPrice": 4},
+        ]
+
+        assert query.demultiplex(items) == {
+            "EastUS": [items[0], items[2]],
+            "westus": [items[1]],
+            "uksouth": [],
+        }
+
+    def test_split_gives_each_value_its_own_query(self):
+        query = plan_folded_queries(BASE_URL, BASE_PARAMS, [(VM_D4S, "eastus"), (VM_D4S, "westus")])[0]
+
+        singles = query.split()
+
+        assert [single.values for single in singles] == [["eastus"], ["westus"]]
+        assert singles[1].params == {**BASE_PARAMS, "$filter": fold_filter(VM_D4S, "armRegionName", ["westus"])}
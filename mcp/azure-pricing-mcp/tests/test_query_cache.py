@@ -0,0 +1,146 @@
+"""Tests for filter parsing and query subsumption."""
+
+from unittest.mock import patch
+
+import pytest
+
+from azure_pricing_mcp.odata import ODataParseError, Term, conjunction_implies, parse_conjunction
+from azure_pricing_mcp.query_cache import SubsumptionCache, split_query
+from azure_pricing_mcp.server import AzurePricingServer
+
+ITEMS = [
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "eastus", "retailPrice": 0.192},
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5 Spot", "armRegionName": "eastus", "retailPrice": 0.04},
+    {"serviceName": "Virtual Machines", "skuName": "D4s v5", "armRegionName": "westeurope", "retailPrice": 0.21},
+]
+
+
+class TestParseConjunction:
+    """Test the $filter subset produced by the server."""
+
+    def test_parses_eq_and_contains(self):
+        terms = parse_conjunction("serviceName eq 'Virtual Machines' and contains(skuName, 'D4s')")
+
+        assert terms == (Term("eq", "serviceName", "Virtual Machines"), Term("contains", "skuName", "D4s"))
+
+    def test_unescapes_quotes(self):
+        assert parse_conjunction("productName eq 'O''Brien'") == (Term("eq", "productName", "O'Brien"),)
+
+    @pytest.mark.parametrize(
+        "text",
+        ["serviceName eq 'A' or serviceName eq 'B'", "retailPrice gt 1", "serviceName eq", "contains(skuName 'x')"],
+    )
+    def test_rejects_unsupported_syntax(self, text):
+        with pytest.raises(ODataParseError):
+            parse_conjunction(text)
+
+
+class TestImplication:
+    """Test predicate implication."""
+
+    def test_extra_terms_imply_broader_filter(self):
+        broad = parse_conjunction("serviceName eq 'Virtual Machines' and contains(skuName, 'D4s')")
+        narrow = parse_conjunction(
+            "serviceName eq 'Virtual Machines' and armRegionName eq 'eastus' and contains(skuName, 'D4s v5')"
+        )
+
+        assert conjunction_implies(narrow, broad)
+        assert not conjunction_implies(broad, narrow)
+
+    def test_eq_implies_contains_of_substring(self):
+        assert Term("eq", "skuName", "D4s v5").implies(Term("contains", "skuName", "D4s"))
+        assert not Term("contains", "skuName", "D4s").implies(Term("eq", "skuName", "D4s"))
+
+
+class TestSubsumptionCache:
+    """Test answering narrower queries locally."""
+
+    def test_filters_cached_superset(self):
+        cache = SubsumptionCache()
+        scope, broad = split_query({"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines'"})
+        cache.add(scope, broad, ITEMS)
+
+        _, narrow = split_query(
+            {
+                "currencyCode": "USD",
+                "$top": "5",
+                "$filter": "serviceName eq 'Virtual Machines' and armRegionName eq 'eastus'",
+            }
+        )
+
+        assert cache.lookup(scope, narrow) == ITEMS[:2]
+        assert cache.stats()["hits"] == 1
+
+    def test_values_compare_ignoring_case(self):
+        cache = SubsumptionCache()
+        scope, broad = split_query({"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines'"})
+        cache.add(scope, broad, ITEMS)
+
+        _, narrow = split_query(
+            {"currencyCode": "USD", "$filter": "serviceName eq 'virtual machines' and armRegionName eq 'WestEurope'"}
+        )
+
+        assert cache.lookup(scope, narrow) == ITEMS[2:]
+
+    def test_price_type_terms_filter_on_type(self):
+        cache = SubsumptionCache()
+        items = [{**ITEMS[0], "type": "Consumption"}, {**ITEMS[0], "type": "Reservation"}]
+        scope, broad = split_query({"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines'"})
+        cache.add(scope, broad, items)
+
+        _, narrow = split_query(
+            {"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines' and priceType eq 'Consumption'"}
+        )
+
+        assert cache.lookup(scope, narrow) == items[:1]
+
+    def test_scope_must_match(self):
+        cache = SubsumptionCache()
+        scope, terms = split_query({"currencyCode": "USD", "$filter": "serviceName eq 'Virtual Machines'"})
+        cache.add(scope, terms, ITEMS)
+
+        other_scope, _ = split_query({"currencyCode": "EUR"})
+        assert cache.lookup(other_scope, terms) is None
+
+    def test_evicts_by_item_count(self):
+        cache = SubsumptionCache(max_items=4)
+        scope, first = split_query({"$filter": "skuName eq 'A'"})
+        _, second = split_query({"$filter": "skuName eq 'B'"})
+        cache.add(scope, first, ITEMS)
+        cache.add(scope, second, ITEMS)
+
+        assert cache.lookup(scope, first) is None
+        assert cache.lookup(scope, second) is not None
+
+
+@pytest.fixture
+async def pricing_server():
+    async with AzurePricingServer() as server:
+        yield server
+
+
+class TestServerSubsumption:
+    """Test the server answers subsumed queries without a request."""
+
+    @pytest.mark.asyncio
+    async def test_narrower_search_is_served_from_broader_result(self, pricing_server):
+        page = {"Items": ITEMS, "NextPageLink": None}
+        with patch.object(pricing_server, "_make_request", return_value=page) as mock_request:
+            await pricing_server.search_azure_prices(service_name="Virtual Machines", sku_name="D4s", limit=500)
+            result = await pricing_server.search_azure_prices(
+                service_name="Virtual Machines", sku_name="D4s v5", region="westeurope", limit=5
+            )
+
+        assert mock_request.call_count == 1
+        assert result["items"] == [ITEMS[2]]
+        assert result["has_more"] is False
+
+    @pytest.mark.asyncio
+    async def test_truncated_results_are_not_reused(self, pricing_server):
+        page = {"Items": ITEMS, "NextPageLink": None}
+        with patch.object(pricing_server, "_make_request", return_value=page) as mock_request:
+            # $top=3 with 3 items back may have been cut short by the API
+            await pricing_server.search_azure_prices(service_name="Virtual Machines", limit=3)
+            await pricing_server.search_azure_prices(service_name="Virtual Machines", region="eastus", limit=3)
+
+        assert mock_request.call_count == 2
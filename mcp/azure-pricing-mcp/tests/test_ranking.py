@@ -0,0 +1,185 @@
+"""Tests for the cheapest-region ranking."""
+
+import random
+
+import pytest
+
+from azure_pricing_mcp.ranking import RegionRanking, monthly_units, pricing_type, rank_workload
+
+REGIONS = ["eastus", "westus", "westeurope", "swedencentral", "japaneast", "uksouth"]
+
+
+def _item(region: str, price: float, sku: str = "D4s v5", meter: str = "D4s v5") -> dict:
+    return {
+        "armRegionName": region,
+        "location": region.upper(),
+        "retailPrice": price,
+        "skuName": sku,
+        "meterName": meter,
+        "productName": "Virtual Machines Dsv5 Series",
+        "unitOfMeasure": "1 Hour",
+    }
+
+
+def _sorted_ranking(items: list[dict], discount: float | None) -> list[dict]:
+    """Reference: per-region dicts, a full sort and a savings pass."""
+    on_demand: dict[str, dict] = {}
+    spot: dict[str, dict] = {}
+    for item in items:
+        region, price = item["armRegionName"], item["retailPrice"]
+        if not price or price <= 0:
+            continue
+        target = on_demand if pricing_type(item) == "On-Demand" else spot
+        if region not in target or price < target[region]["retail_price"]:
+            target[region] = {"region": region, "retail_price": price, "sku_name": item["skuName"]}
+    rows = list(on_demand.values())
+    for row in rows:
+        if row["region"] in spot:
+            row["spot_price"] = spot[row["region"]]["retail_price"]
+        if discount:
+            row["retail_price"] = round(row["retail_price"] * (1 - discount / 100), 6)
+    rows.sort(key=lambda row: row["retail_price"])
+    max_price = max(row["retail_price"] for row in rows)
+    for row in rows:
+        row["savings_vs_most_expensive"] = round((max_price - row["retail_price"]) / max_price * 100, 2)
+    return rows
+
+
+class TestRegionRanking:
+    """Test the ranking matches sorting every region."""
+
+    def test_pricing_type(self):
+        assert pricing_type(_item("eastus", 1, sku="D4s v5 Spot")) == "Spot"
+        assert pricing_type(_item("eastus", 1, meter="D4s v5 Low Priority")) == "Low Priority"
+        assert pricing_type({"skuName": None}) == "On-Demand"
+
+    @pytest.mark.parametrize("discount", [None, 12.5])
+    def test_matches_a_full_sort(self, discount):
+        rng = random.Random(7)
+        items = [
+            _item(rng.choice(REGIONS), rng.choice([0, 0.5, 1.0, 1.25, 2.0]), sku=rng.choice(["D4s v5", "D4s v5 Spot"]))
+            for _ in range(300)
+        ]
+        ranking = RegionRanking()
+        ranking.add_items(items)
+        expected = _sorted_ranking(items, discount)
+
+        recommendations, summary = ranking.rank(3, discount)
+
+        assert len(ranking) == len(expected)
+        assert [
+            {
+                key: row[key]
+                for key in ("region", "retail_price", "spot_price", "savings_vs_most_expensive")
+                if key in row
+            }
+            for row in recommendations
+        ] == [{key: value for key, value in row.items() if key != "sku_name"} for row in expected[:3]]
+        assert summary["cheapest_region"] == expected[0]["region"]
+        assert summary["most_expensive_region"] == expected[-1]["region"]
+        assert summary["most_expensive_price"] == expected[-1]["retail_price"]
+        assert summary["max_savings_percentage"] == expected[0]["savings_vs_most_expensive"]
+
+    def test_rows(self):
+        ranking = RegionRanking()
+        ranking.add_items(
+            [_item("eastus", 1.0), _item("eastus", 0.3, sku="D4s v5 Spot"), _item("westus", 2.0), _item("uksouth", 0)]
+        )
+
+        recommendations, summary = ranking.rank(10, discount_percentage=50)
+
+        assert ranking.items_seen == 4
+        assert recommendations[0] == {
+            "region": "eastus",
+            "location": "EASTUS",
+            "retail_price": 0.5,
+            "sku_name": "D4s v5",
+            "product_name": "Virtual Machines Dsv5 Series",
+            "unit_of_measure": "1 Hour",
+            "meter_name": "D4s v5",
+            "pricing_type": "On-Demand",
+            "spot_price": 0.3,
+            "spot_sku_name": "D4s v5 Spot",
+            "original_price": 1.0,
+            "savings_vs_most_expensive": 50.0,
+        }
+        assert [row["region"] for row in recommendations] == ["eastus", "westus"]
+        assert summary["most_expensive_location"] == "WESTUS"
+
+    def test_empty_and_top_zero(self):
+        ranking = RegionRanking()
+        assert ranking.rank(5) == ([], {})
+
+        ranking.add(_item("eastus", 1.0))
+        recommendations, summary = ranking.rank(0)
+        assert recommendations == []
+        assert summary["cheapest_region"] == "eastus"
+
+    def test_regions_not_permitted_are_not_ranked(self):
+        ranking = RegionRanking(permits=lambda region: region != "westus")
+        ranking.add_items([_item("eastus", 2.0), _item("westus", 1.0), _item("westus", 0.5, sku="D4s v5 Spot")])
+
+        recommendations, summary = ranking.rank(5)
+
+        assert [row["region"] for row in recommendations] == ["eastus"]
+        assert "spot_price" not in recommendations[0]
+        assert (ranking.items_seen, ranking.items_excluded) == (3, 2)
+
+
+class TestWorkloadRanking:
+    """Test ranking regions by the total of a cost matrix."""
+
+    def test_monthly_units(self):
+        assert monthly_units("1 Hour", 730) == 730
+        assert monthly_units("100 Hours", 730) == 7.3
+        assert monthly_units("1/Day", 720) == 30
+        assert monthly_units("1/Month", 730) == 1
+        assert monthly_units("1 GB/Month", 730) == 1
+        assert monthly_units("10K", 730) == 1
+        assert monthly_units(None, 730) == 1
+
+    def test_complete_regions_ranked_and_partial_listed(self):
+        line_costs = [
+            {"eastus": 100.0, "westus": 90.0, "uksouth": 50.0},
+            {"eastus": 10.0, "westus": 30.0},
+            {"eastus": 5.0, "westus": 5.0, "japaneast": 1.0},
+        ]
+
+        recommendations, partial, summary = rank_workload(line_costs, top_n=5, discount_percentage=10)
+
+        assert recommendations == [
+            {
+                "region": "eastus",
+                "monthly_cost": 103.5,
+                "line_costs": [90.0, 9.0, 4.5],
+                "savings_vs_most_expensive": 8.0,
+            },
+            {
+                "region": "westus",
+                "monthly_cost": 112.5,
+                "line_costs": [81.0, 27.0, 4.5],
+                "savings_vs_most_expensive": 0.0,
+            },
+        ]
+        assert partial == [
+            {"region": "japaneast", "monthly_cost_available": 0.9, "missing_lines": [0, 1]},
+            {"region": "uksouth", "monthly_cost_available": 45.0, "missing_lines": [1, 2]},
+        ]
+        assert summary["cheapest_region"] == "eastus"
+        assert summary["max_monthly_savings"] == 9.0
+
+    def test_matches_summing_every_column(self):
+        rng = random.Random(3)
+        line_costs = [{region: rng.uniform(1, 100) for region in REGIONS if rng.random() > 0.1} for _ in range(50)]
+        complete = [region for region in REGIONS if all(region in costs for costs in line_costs)]
+        expected = sorted(complete, key=lambda region: sum(costs[region] for costs in line_costs))
+
+        recommendations, partial, _ = rank_workload(line_costs, top_n=3)
+
+        assert [row["region"] for row in recommendations] == expected[:3]
+        assert len(partial) == len(REGIONS) - len(complete)
+
+    def test_no_complete_region(self):
+        recommendations, partial, summary = rank_workload([{"eastus": 1.0}, {"westus": 1.0}], top_n=5)
+        assert recommendations == [] and summary == {}
+        assert [row["region"] for row in partial] == ["eastus", "westus"]
@@ -0,0 +1,150 @@
+"""Tests for the adaptive rate limiter."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.rate_limit import AdaptiveRateLimiter, parse_retry_after
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+class FakeClock:
+    """Monotonic clock advanced manually (or by patched sleeps)."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+class TestParseRetryAfter:
+    """Test Retry-After header parsing."""
+
+    def test_delay_seconds(self):
+        assert parse_retry_after("12") == 12.0
+
+    def test_http_date_in_the_past(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @pytest.mark.parametrize("value", [None, "", "soon", 42])
+    def test_invalid_values(self, value):
+        assert parse_retry_after(value) is None
+
+
+class TestAdaptiveRateLimiter:
+    """Test token bucket and AIMD behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_served_without_waiting(self, clock):
+        limiter = AdaptiveRateLimiter(rate=1.0, burst=3, clock=clock)
+
+        with patch("asyncio.sleep", side_effect=clock.sleep) as mock_sleep:
+            for _ in range(3):
+                await limiter.acquire()
+
+        mock_sleep.assert_not_called()
+        assert limiter.stats()["throttled_acquires"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_for_refill_when_bucket_is_empty(self, clock):
+        limiter = AdaptiveRateLimiter(rate=2.0, burst=1, jitter=0.0, clock=clock)
+
+        with patch("asyncio.sleep", side_effect=clock.sleep):
+            await limiter.acquire()
+            await limiter.acquire()
+
+        assert clock.now == pytest.approx(1000.5)
+        assert limiter.stats()["throttled_acquires"] == 1
+        assert limiter.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_every_caller(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10.0, burst=10, jitter=0.0, clock=clock)
+
+        assert limiter.on_rate_limited(retry_after=7.0) == 7.0
+        with patch("asyncio.sleep", side_effect=clock.sleep):
+            await limiter.acquire()
+
+        assert clock.now >= 1007.0
+
+    def test_bucket_does_not_refill_during_a_pause(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10.0, burst=10, clock=clock)
+
+        limiter.on_rate_limited(retry_after=5.0)
+        clock.now += 5.01
+
+        # One request resumes at once; the rest are paced by the halved rate
+        waits = [limiter._try_acquire() for _ in range(10)]
+        assert waits[0] == 0.0
+        assert waits[1] == pytest.approx((1 - 0.05) / 5.0)
+        assert all(wait > 0 for wait in waits[1:])
+
+    def test_multiplicative_decrease_once_per_pause(self, clock):
+        limiter = AdaptiveRateLimiter(rate=8.0, min_rate=1.0, clock=clock)
+
+        limiter.on_rate_limited(retry_after=5.0)
+        # Further 429s from the same burst do not compound the decrease
+        limiter.on_rate_limited(retry_after=5.0)
+        assert limiter.rate == 4.0
+
+        clock.now += 10
+        limiter.on_rate_limited(retry_after=5.0)
+        assert limiter.rate == 2.0
+
+    def test_additive_increase_is_capped(self, clock):
+        limiter = AdaptiveRateLimiter(rate=1.0, max_rate=1.25, increase_step=0.1, clock=clock)
+
+        for _ in range(5):
+            limiter.on_success()
+
+        assert limiter.rate == 1.25
+
+    def test_backoff_without_retry_after_grows_exponentially(self, clock):
+        limiter = AdaptiveRateLimiter(base_backoff=2.0, clock=clock)
+
+        assert limiter.on_rate_limited() == 2.0
+        assert limiter.on_rate_limited() == 4.0
+        limiter.on_success()
+        assert limiter.on_rate_limited() == 2.0
+
+
+class TestServerRateLimiting:
+    """Test the shared limiter is wired into request retries."""
+
+    @pytest.mark.asyncio
+    async def test_429_retry_honours_retry_after(self, clock, caplog):
+        limiter = AdaptiveRateLimiter(rate=10.0, jitter=0.0, clock=clock)
+        server = AzurePricingServer()
+
+        response_429 = MagicMock(status=429, headers={"Retry-After": "3"})
+        response_200 = MagicMock(status=200)
+        response_200.json = AsyncMock(return_value={"Items": []})
+
+        session = MagicMock()
+        session.get.return_value.__aenter__ = AsyncMock(side_effect=[response_429, response_200])
+        session.get.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with (
+            patch.object(AzurePricingServer, "_rate_limiter", limiter),
+            patch.object(server, "get_session", AsyncMock(return_value=session)),
+            patch("asyncio.sleep", side_effect=clock.sleep),
+        ):
+            result = await server._fetch("https://test.com/limited", None, "rate-limit-test")
+
+        assert result == {"Items": []}
+        assert session.get.call_count == 2
+        assert clock.now >= 1003.0
+        assert limiter.stats()["rate_limited_responses"] == 1
+        # Logged once, by the limiter
+        assert [record.message for record in caplog.records if "429" in record.message] == [
+            "Rate limited (429). Pausing requests for 3.0s, rate now 5.00 req/s"
+        ]
@@ -0,0 +1,91 @@
+"""Tests for the service name registry."""
+
+from unittest.mock import patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PriceCatalog
+from azure_pricing_mcp.server import SERVICE_NAME_MAPPINGS, AzurePricingServer
+from azure_pricing_mcp.service_registry import SERVICE_FAMILIES, ServiceRegistry
+
+ITEMS = [
+    {"serviceName": "Virtual Machines", "serviceFamily": "Compute", "productName": "Virtual Machines Dsv5 Series"},
+    {
+        "serviceName": "Azure App Service",
+        "serviceFamily": "Compute",
+        "productName": "Azure App Service Premium v3 Plan",
+    },
+    {"serviceName": "Azure Cosmos DB", "serviceFamily": "Databases", "productName": "Azure Cosmos DB"},
+    {"serviceName": "Storage", "serviceFamily": "Storage", "productName": "Premium SSD Managed Disks"},
+    {"serviceName": "Azure Database for PostgreSQL", "serviceFamily": "Databases", "productName": "Flexible Server"},
+]
+
+
+@pytest.fixture
+def registry() -> ServiceRegistry:
+    registry = ServiceRegistry(aliases=SERVICE_NAME_MAPPINGS)
+    registry.add_items(ITEMS)
+    return registry
+
+
+class TestServiceRegistry:
+    """Test resolving free-text service hints."""
+
+    def test_exact_name_and_alias_score_one(self, registry):
+        assert registry.resolve("virtual machines")[0] == {
+            "service_name": "Virtual Machines",
+            "service_family": "Compute",
+            "score": 1.0,
+            "matched_on": "service",
+        }
+        assert registry.resolve("AKS")[0]["service_name"] == "Azure Kubernetes Service"
+
+    def test_partial_and_misspelt_hints(self, registry):
+        assert registry.resolve("cosmos")[0]["service_name"] == "Azure Cosmos DB"
+        assert registry.resolve("postgres")[0]["service_name"] == "Azure Database for PostgreSQL"
+        assert registry.resolve("azure app servce")[0]["service_name"] == "Azure App Service"
+
+    def test_product_names_point_at_their_service(self, registry):
+        match = registry.resolve("premium ssd managed disks")[0]
+        assert (match["service_name"], match["matched_on"]) == ("Storage", "product")
+
+    def test_unrelated_hint_has_no_match(self, registry):
+        assert registry.resolve("xyzzy") == []
+
+    def test_families_include_defaults_and_observed(self, registry):
+        registry.add("Quantum", "Quantum Computing")
+        assert set(SERVICE_FAMILIES) <= set(registry.families())
+        assert "Quantum Computing" in registry.families()
+
+    def test_add_catalog(self):
+        catalog = PriceCatalog()
+        catalog.extend(ITEMS)
+        registry = ServiceRegistry()
+
+        registry.add_catalog(catalog)
+
+        assert registry.services() == sorted(item["serviceName"] for item in ITEMS)
+
+
+class TestServiceRegistryRefresh:
+    """Test the registry refresh sweeps service families through the normal request path."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_learns_services_from_sampled_pages(self):
+        server = AzurePricingServer()
+        requested = []
+
+        async def fake_request(url, params=None, fields=None):
+            family = params["$filter"].split("'")[1]
+            requested.append(family)
+            items = [item for item in ITEMS if item["serviceFamily"] == family]
+            return {"Items": items, "NextPageLink": None}
+
+        with patch.object(server, "_make_request", side_effect=fake_request):
+            known = await server.refresh_service_registry()
+
+        assert known == len(ITEMS)
+        assert set(SERVICE_FAMILIES) <= set(requested)
+        assert AzurePricingServer._service_registry.resolve("postgres")[0]["service_name"] == (
+            "Azure Database for PostgreSQL"
+        )
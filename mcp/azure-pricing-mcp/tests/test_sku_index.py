@@ -0,0 +1,99 @@
+"""Tests for the SKU name index."""
+
+from unittest.mock import patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PriceCatalog
+from azure_pricing_mcp.server import AzurePricingServer
+from azure_pricing_mcp.sku_index import SkuIndex, compact, edit_distance
+
+
+def _item(sku: str, service: str = "Virtual Machines", price: float = 0.1) -> dict:
+    return {
+        "serviceName": service,
+        "skuName": sku,
+        "productName": f"{service} {sku}",
+        "retailPrice": price,
+        "unitOfMeasure": "1 Hour",
+        "armRegionName": "eastus",
+    }
+
+
+VM_SKUS = ["D2s v5", "D4s v5", "D8s v5", "D4as v5", "E4s v5", "B2ms", "F4s v2", "D4s v3", "NC24ads A100 v4"]
+
+
+@pytest.fixture
+def index() -> SkuIndex:
+    index = SkuIndex()
+    index.add_items(_item(sku) for sku in VM_SKUS)
+    index.add_items([_item("Hot LRS", service="Storage")])
+    return index
+
+
+class TestNormalisation:
+    """Test SKU name normalisation helpers."""
+
+    def test_compact_ignores_case_separators_and_standard_prefix(self):
+        assert compact("Standard_D4s_v5") == compact("D4s v5") == compact("d4sv5") == "d4sv5"
+
+    def test_edit_distance(self):
+        assert edit_distance("d4sv5", "d4sv5") == 0
+        assert edit_distance("d4sv5", "d4asv5") == 1
+        assert edit_distance("", "abc") == 3
+
+
+class TestSkuIndex:
+    """Test ranked, typo-tolerant suggestions."""
+
+    def test_exact_name_in_any_spelling_ranks_first(self, index):
+        assert index.suggest("Virtual Machines", "Standard_D4s_v5")[0]["sku_name"] == "D4s v5"
+
+    def test_typo_still_finds_the_sku(self, index):
+        suggestions = [s["sku_name"] for s in index.suggest("Virtual Machines", "D4sv 5s")]
+        assert "D4s v5" in suggestions[:2]
+
+    def test_substring_matches_rank_above_loose_ones(self, index):
+        suggestions = [s["sku_name"] for s in index.suggest("virtual machines", "A100", limit=3)]
+        assert suggestions[0] == "NC24ads A100 v4"
+
+    def test_suggestions_carry_sample_prices_and_are_scoped_by_service(self, index):
+        suggestion = index.suggest("Storage", "hot lrs")[0]
+        assert suggestion["sku_name"] == "Hot LRS"
+        assert suggestion["price"] == 0.1
+        assert suggestion["unit"] == "1 Hour"
+        assert index.suggest("Storage", "D4s v5") == []
+        assert index.suggest("Unknown Service", "D4s") == []
+
+    def test_respects_size_limit(self):
+        index = SkuIndex(max_skus=2)
+        index.add_items(_item(sku) for sku in VM_SKUS)
+        assert len(index) == 2
+
+    def test_add_catalog(self):
+        catalog = PriceCatalog()
+        catalog.extend([_item("D4s v5"), {**_item("D4s v5"), "armRegionName": "westus"}, _item("Hot LRS", "Storage")])
+        index = SkuIndex()
+
+        index.add_catalog(catalog)
+
+        assert index.skus("Virtual Machines") == ["D4s v5"]
+        assert index.skus("Storage") == ["Hot LRS"]
+
+
+class TestServerSkuValidation:
+    """Test SKU validation answers from the index."""
+
+    @pytest.mark.asyncio
+    async def test_fetched_pages_feed_the_index_and_validation_needs_no_request(self):
+        server = AzurePricingServer()
+        page = {"Items": [_item(sku) for sku in VM_SKUS], "NextPageLink": None}
+
+        with patch.object(server, "_make_request", return_value=page):
+            await server.search_azure_prices(service_name="Virtual Machines", validate_sku=False)
+
+        with patch.object(server, "search_azure_prices") as mock_search:
+            result = await server._validate_and_suggest_skus("Virtual Machines", "D4sv5")
+
+        mock_search.assert_not_called()
+        assert result["sku_validation"]["suggestions"][0]["sku_name"] == "D4s v5"
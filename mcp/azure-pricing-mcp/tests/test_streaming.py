@@ -0,0 +1,68 @@
+"""Tests for incremental parsing of streamed price pages."""
+
+import json
+
+import pytest
+
+from azure_pricing_mcp.models import PriceItem
+from azure_pricing_mcp.streaming import ItemStreamParser
+
+PAGE = {
+    "BillingCurrency": "USD",
+    "CustomerEntityId": "Default",
+    "Items": [
+        {"skuName": "D4s v5", "location": "Sweden Central → ÅÄÖ", "retailPrice": 0.192, "savingsPlan": []},
+        {"skuName": "D8s v5", "location": "US East", "retailPrice": 0.384, "meterName": 'D8s v5 {"}'},
+    ],
+    "NextPageLink": "https://prices.azure.com/api/retail/prices?$skip=1000",
+    "Count": 2,
+}
+
+
+def _parse(body: bytes, chunk_size: int, fields=None) -> tuple[list[list[PriceItem]], dict]:
+    parser = ItemStreamParser(fields)
+    batches = [parser.feed(body[i : i + chunk_size]) for i in range(0, len(body), chunk_size)]
+    return batches, parser.close()
+
+
+class TestItemStreamParser:
+    """Test that pages parse the same however the body is split."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+    def test_any_chunking_gives_the_decoded_page(self, chunk_size):
+        body = json.dumps(PAGE, ensure_ascii=False, indent=1).encode()
+
+        batches, envelope = _parse(body, chunk_size)
+
+        assert [item for batch in batches for item in batch] == PAGE["Items"]
+        assert envelope == {**PAGE, "Items": []}
+
+    def test_items_are_returned_as_soon_as_they_complete(self):
+        body = json.dumps(PAGE).encode()
+        first_end = body.index(b"}") + 1
+
+        parser = ItemStreamParser()
+
+        assert parser.feed(body[: first_end - 1]) == []
+        assert [item["skuName"] for item in parser.feed(body[first_end - 1 : first_end])] == ["D4s v5"]
+        assert isinstance(parser.feed(body[first_end:])[0], PriceItem)
+        assert parser.items_parsed == 2
+
+    def test_projection(self):
+        batches, _ = _parse(json.dumps(PAGE).encode(), 16, frozenset({"skuName", "unitPrice"}))
+        assert [dict(item) for batch in batches for item in batch] == [{"skuName": "D4s v5"}, {"skuName": "D8s v5"}]
+
+    def test_empty_and_missing_items(self):
+        batches, envelope = _parse(b'{"Items": [], "NextPageLink": null}', 5)
+        assert not any(batches)
+        assert envelope == {"Items": [], "NextPageLink": None}
+        assert _parse(b'{"Count": 0}', 4)[1] == {"Count": 0}
+
+    def test_truncated_body(self):
+        body = json.dumps(PAGE).encode()
+        with pytest.raises(ValueError, match="Truncated price page: Items ended after 1 items"):
+            _parse(body[: body.index(b"D8s")], 32)
+
+    def test_malformed_items(self):
+        with pytest.raises(ValueError, match="expected an item object"):
+            ItemStreamParser().feed(b'{"Items": [1, 2]}')